@@ -0,0 +1,316 @@
+"""
+Benchmark suite: load, clean, insert, query and analyse synthetic datasets
+(see benchmarks/synthetic.py) at several scales, recording the best wall time
+and the peak traced memory of each step.
+
+Results are written as JSON and compared with a stored baseline; any step that
+got slower or hungrier than the thresholds allow is reported, and the exit
+status is 1.
+
+Run from the project root:
+    python benchmarks/run_benchmarks.py --scales 1 10
+    python benchmarks/run_benchmarks.py --scales 1 10 --update-baseline
+
+Scales of 100 and 1000 are supported but need a lot of time and memory,
+especially for the to_records/bulk_insert (ORM) steps; use --skip to leave
+those out, e.g. --skip to_records bulk_insert.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from benchmarks.synthetic import write_covid_csv
+from src import analysis
+from src.analysis import (
+    build_filter_index,
+    filter_data,
+    get_summary_stats,
+    get_trend_over_time,
+    get_top_countries,
+    get_summary_stats_from_rollups,
+    get_trend_over_time_from_rollups,
+    get_top_countries_from_rollups,
+)
+from src.cleaning import clean_covid_df, to_records
+from src.dashboard_utils import load_data_from_db
+from src.data_access import load_csv
+from src.db.crud_orm import bulk_insert
+from src.db.crud_sql import bulk_insert_df, get_reports_sql
+from src.db.engine import get_engine, get_session_maker
+from src.db.migrations import upgrade_schema
+from src.db.rollups import refresh_rollups
+from src.metrics import compute_metrics
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_SCALES = [1, 10]
+DEFAULT_REPEAT = 3
+# Timings vary between runs and machines, so only flag clear slowdowns
+TIME_THRESHOLD = 1.5
+MEMORY_THRESHOLD = 1.2
+
+
+def measure(func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None, repeat: int = DEFAULT_REPEAT, memory: bool = True) -> Dict[str, Any]:
+    """
+    Time func (best and mean of `repeat` runs), then run it once more under
+    tracemalloc for the peak memory it allocates. setup runs untimed before
+    every call; if it returns something, that is passed to func.
+    """
+    def call():
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = func(state) if setup is not None else func()
+        return time.perf_counter() - start, result
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        elapsed, result = call()
+        timings.append(elapsed)
+        del result
+
+    peak_mb = None
+    if memory:
+        state = setup() if setup is not None else None
+        tracemalloc.start()
+        try:
+            result = func(state) if setup is not None else func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        peak_mb = round(peak / 1024 ** 2, 3)
+
+    return {
+        "seconds": round(min(timings), 6),
+        "mean_seconds": round(sum(timings) / len(timings), 6),
+        "peak_mb": peak_mb,
+    }
+
+
+def _fresh_engine(workdir: Path, name: str):
+    """A new, empty database with the current schema."""
+    db_path = workdir / f"{name}.db"
+    if db_path.exists():
+        db_path.unlink()
+    engine = get_engine(str(db_path), profile="bulk-load")
+    upgrade_schema(engine)
+    return engine
+
+
+def run_scale(scale: float, workdir: Path, seed: int, repeat: int, memory: bool, skip: List[str]) -> List[Dict[str, Any]]:
+    """Run every benchmark for one scale and return one result per step."""
+    csv_path = workdir / f"covid_{scale:g}x_seed{seed}.csv"
+    if not csv_path.exists():
+        write_covid_csv(str(csv_path), scale, seed)
+
+    results = []
+
+    def bench(name: str, func, setup=None):
+        if name in skip:
+            return
+        record = measure(func, setup, repeat, memory)
+        record.update({"scale": scale, "name": name})
+        results.append(record)
+        print(f"  {name:38s} {record['seconds'] * 1000:10.1f} ms  "
+              f"peak {record['peak_mb'] if record['peak_mb'] is not None else '-':>10} MB")
+
+    # Load and clean
+    raw = load_csv(str(csv_path))
+    n_rows = len(raw)
+    print(f"scale {scale:g}x: {n_rows} rows")
+    bench("load_csv", lambda: load_csv(str(csv_path)))
+
+    bench("clean_covid_df", lambda: clean_covid_df(raw))
+    clean = clean_covid_df(raw)
+    del raw
+
+    # Insert: ORM path (to_records + bulk_insert) and the columnar path init_db uses
+    if "to_records" not in skip or "bulk_insert" not in skip:
+        bench("to_records", lambda: to_records(clean))
+        records = to_records(clean)
+
+        def orm_setup():
+            return get_session_maker(_fresh_engine(workdir, "orm"))()
+
+        def orm_insert(session):
+            try:
+                return bulk_insert(session, records)
+            finally:
+                session.close()
+
+        bench("bulk_insert", orm_insert, setup=orm_setup)
+        del records
+
+    def sql_setup():
+        return _fresh_engine(workdir, "columnar")
+
+    def sql_insert(engine):
+        with engine.connect() as conn:
+            return bulk_insert_df(conn, clean)
+
+    bench("bulk_insert_df", sql_insert, setup=sql_setup)
+
+    # Read and analyse from a fully loaded database
+    engine = _fresh_engine(workdir, "read")
+    with engine.connect() as conn:
+        bulk_insert_df(conn, clean)
+        refresh_rollups(conn)
+
+    top_country = clean["country_region"].value_counts().index[0]
+    mid_date = clean["observation_date"].min() + (clean["observation_date"].max() - clean["observation_date"].min()) / 2
+    end_date = clean["observation_date"].max()
+    del clean
+
+    with engine.connect() as conn:
+        bench("get_reports_sql", lambda: get_reports_sql(conn))
+        bench("get_reports_sql[country]", lambda: get_reports_sql(conn, country=top_country))
+        bench("load_data_from_db", lambda: load_data_from_db(conn))
+        df = load_data_from_db(conn)
+
+        bench("build_filter_index", lambda: build_filter_index(df))
+        index = build_filter_index(df)
+        bench("filter_data", lambda: filter_data(df, top_country, mid_date, end_date))
+        bench("filter_data[index]", lambda: filter_data(df, top_country, mid_date, end_date, index=index))
+
+        # The latest-per-location pass is memoized per frame; measure it cold
+        bench("get_summary_stats", lambda _: get_summary_stats(df), setup=analysis._latest_cache.clear)
+        bench("get_trend_over_time", lambda: get_trend_over_time(df))
+        bench("get_top_countries", lambda _: get_top_countries(df), setup=analysis._latest_cache.clear)
+        bench("compute_metrics", lambda: compute_metrics(df))
+        bench("compute_metrics[country]", lambda: compute_metrics(df, level="country"))
+
+        bench("get_summary_stats_from_rollups", lambda: get_summary_stats_from_rollups(conn))
+        bench("get_trend_over_time_from_rollups",
+              lambda: get_trend_over_time_from_rollups(conn, top_country, mid_date, end_date))
+        bench("get_top_countries_from_rollups", lambda: get_top_countries_from_rollups(conn))
+
+    engine.dispose()
+    for record in results:
+        record["rows"] = n_rows
+    return results
+
+
+def compare_results(
+    current: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    time_threshold: float = TIME_THRESHOLD,
+    memory_threshold: float = MEMORY_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline, matched on (scale, name).
+
+    Returns:
+        List[Dict[str, Any]]: One entry per regression, with the metric
+        ("seconds" or "peak_mb"), both values and their ratio. Steps missing
+        from either side are ignored.
+    """
+    reference = {(r["scale"], r["name"]): r for r in baseline}
+    regressions = []
+
+    for record in current:
+        base = reference.get((record["scale"], record["name"]))
+        if base is None:
+            continue
+        for metric, threshold in [("seconds", time_threshold), ("peak_mb", memory_threshold)]:
+            new, old = record.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            ratio = new / old
+            if ratio > threshold:
+                regressions.append({
+                    "scale": record["scale"],
+                    "name": record["name"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "ratio": round(ratio, 3),
+                })
+
+    return regressions
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline on synthetic data.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="Dataset sizes relative to the real file, e.g. 1 10 100 1000.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per step (best is kept).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each step.")
+    parser.add_argument("--skip", nargs="*", default=[], help="Step names to leave out.")
+    parser.add_argument("--workdir", help="Directory for generated CSVs and databases (default: a temporary one).")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results.")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline results to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to the baseline file.")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    args = parser.parse_args(argv)
+    if args.repeat <= 0:
+        parser.error("--repeat must be positive")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir) if args.workdir else Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+
+        results = []
+        for scale in args.scales:
+            results.extend(run_scale(scale, workdir, args.seed, args.repeat, not args.no_memory, args.skip))
+
+    report = {
+        "environment": _environment(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2))
+        print(f"Updated baseline {args.baseline}")
+        return 0
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; nothing to compare")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare_results(results, baseline["results"], args.time_threshold, args.memory_threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['name']} @ {r['scale']:g}x: {r['metric']} "
+              f"{r['baseline']} -> {r['current']} ({r['ratio']:.2f}x)")
+    if not regressions:
+        print(f"No regressions against {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
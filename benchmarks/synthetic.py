@@ -0,0 +1,170 @@
+"""
+Deterministic synthetic data shaped like Dataset/covid_19_data.csv.
+
+Scale 1 gives roughly as many rows as the real file (~40k). Larger scales grow
+both the number of locations and the number of days by sqrt(scale), so row
+counts grow linearly while the location/date cardinality stays plausible
+(1000x is ~12,600 locations over ~12 years of daily reports).
+
+Like the real file, rows are ordered by date, each location starts reporting on
+its own day and then reports daily, counts are cumulative floats, most
+countries have a single location with no Province/State, and Last Update uses
+the same mix of date formats.
+
+Run from the project root to write a CSV:
+    python benchmarks/synthetic.py --scale 10 --output covid_10x.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from src.cleaning import REQUIRED_RAW_COLUMNS
+
+BASE_LOCATIONS = 400
+BASE_DAYS = 141
+N_COUNTRIES = 220
+FIRST_DAY = pd.Timestamp("2020-01-22")
+
+# Share of the days that are already over when a location starts reporting, at most
+MAX_START_FRACTION = 0.6
+DAYS_PER_CHUNK = 32
+
+
+def dataset_shape(scale: float) -> tuple[int, int]:
+    """Return (n_locations, n_days) for a scale factor."""
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale}")
+    factor = np.sqrt(scale)
+    return max(1, round(BASE_LOCATIONS * factor)), max(1, round(BASE_DAYS * factor))
+
+
+def _locations(rng: np.random.Generator, n_locations: int) -> tuple[np.ndarray, np.ndarray]:
+    """Country and province names per location; a few countries get most of the provinces."""
+    n_countries = min(N_COUNTRIES, n_locations)
+    weights = 1.0 / np.arange(1, n_countries + 1) ** 1.2
+    extra = rng.choice(n_countries, size=n_locations - n_countries, p=weights / weights.sum())
+    country_ids = np.sort(np.concatenate([np.arange(n_countries), extra]))
+
+    # Number each country's locations 0, 1, 2, ...
+    first = np.searchsorted(country_ids, country_ids)
+    rank = np.arange(n_locations) - first
+    has_provinces = np.bincount(country_ids, minlength=n_countries)[country_ids] > 1
+
+    countries = np.array([f"Country {i:03d}" for i in range(n_countries)], dtype=object)[country_ids]
+    provinces = np.where(
+        has_provinces, np.char.add("Province ", rank.astype(str)).astype(object), None
+    )
+    return countries, provinces
+
+
+def _date_strings(n_days: int) -> tuple[np.ndarray, np.ndarray]:
+    """ObservationDate and Last Update strings per day, in the formats the real file mixes."""
+    days = pd.date_range(FIRST_DAY, periods=n_days, freq="D")
+    observation = days.strftime("%m/%d/%Y").to_numpy(dtype=object)
+
+    updated = days + pd.Timedelta(hours=23, minutes=45, seconds=32)
+    phase = np.arange(n_days) * 3 // n_days
+    last_update = np.where(
+        phase == 0,
+        [f"{d.month}/{d.day}/{d.year} {d.hour}:{d.minute:02d}" for d in updated],
+        np.where(
+            phase == 1,
+            [f"{d.month}/{d.day}/{d.year % 100:02d} {d.hour}:{d.minute:02d}" for d in updated],
+            updated.strftime("%Y-%m-%dT%H:%M:%S").to_numpy(dtype=object),
+        ),
+    ).astype(object)
+    return observation, last_update
+
+
+def iter_synthetic_chunks(scale: float = 1, seed: int = 0, days_per_chunk: int = DAYS_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """
+    Yield the synthetic dataset as raw (uncleaned) frames with the columns of
+    covid_19_data.csv, a block of days at a time, so large scales can be
+    written without holding the whole dataset in memory.
+
+    The same (scale, seed) always produces the same rows.
+    """
+    rng = np.random.default_rng(seed)
+    n_locations, n_days = dataset_shape(scale)
+    countries, provinces = _locations(rng, n_locations)
+    observation, last_update = _date_strings(n_days)
+
+    start_day = rng.integers(0, max(1, int(n_days * MAX_START_FRACTION)), size=n_locations)
+    start_day[rng.random(n_locations) < 0.05] = 0
+    rate = rng.lognormal(mean=1.0, sigma=1.5, size=n_locations)
+
+    cumulative = np.zeros((3, n_locations), dtype=np.int64)
+    sno = 1
+
+    for first in range(0, n_days, days_per_chunk):
+        day = np.arange(first, min(first + days_per_chunk, n_days))
+        active = day[:, None] >= start_day[None, :]          # (days, locations)
+
+        # Case growth ramps up after a location starts reporting
+        age = np.clip(day[:, None] - start_day[None, :], 0, None)
+        expected = rate[None, :] * np.log1p(age) * active
+        new_confirmed = rng.poisson(expected)
+        new_deaths = rng.binomial(new_confirmed, 0.03)
+        new_recovered = rng.binomial(new_confirmed, 0.6)
+
+        counts = []
+        for i, new in enumerate([new_confirmed, new_deaths, new_recovered]):
+            running = np.cumsum(new, axis=0) + cumulative[i]
+            cumulative[i] = running[-1]
+            counts.append(running[active].astype(np.float64))
+
+        day_idx, loc_idx = np.nonzero(active)
+        n_rows = len(day_idx)
+        yield pd.DataFrame({
+            "SNo": np.arange(sno, sno + n_rows),
+            "ObservationDate": observation[day[day_idx]],
+            "Province/State": provinces[loc_idx],
+            "Country/Region": countries[loc_idx],
+            "Last Update": last_update[day[day_idx]],
+            "Confirmed": counts[0],
+            "Deaths": counts[1],
+            "Recovered": counts[2],
+        }, columns=REQUIRED_RAW_COLUMNS)
+        sno += n_rows
+
+
+def generate_covid_df(scale: float = 1, seed: int = 0) -> pd.DataFrame:
+    """Return the whole synthetic dataset as one raw frame."""
+    return pd.concat(iter_synthetic_chunks(scale, seed), ignore_index=True)
+
+
+def write_covid_csv(path: str, scale: float = 1, seed: int = 0) -> int:
+    """
+    Write the synthetic dataset to a CSV in the layout of covid_19_data.csv.
+
+    Returns:
+        int: Number of rows written.
+    """
+    n_rows = 0
+    with open(path, "w", newline="") as f:
+        for i, chunk in enumerate(iter_synthetic_chunks(scale, seed)):
+            chunk.to_csv(f, header=i == 0, index=False)
+            n_rows += len(chunk)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic covid_19_data.csv-shaped dataset.")
+    parser.add_argument("--scale", type=float, default=1, help="Size relative to the real file (1, 10, 100, 1000).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="covid_synthetic.csv")
+    args = parser.parse_args(argv)
+
+    n_rows = write_covid_csv(args.output, args.scale, args.seed)
+    print(f"Wrote {n_rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,283 @@
+import argparse
 import sys
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
 
 # Add src to path so imports work
 sys.path.append(str(Path(__file__).parent))
 
-from src.data_access import load_csv
-from src.cleaning import clean_covid_df, to_records
+from src.data_access import (
+    load_csv, iter_csv_chunks, DEFAULT_CHUNKSIZE, snapshot_dir_for, write_snapshot_batches, load_snapshot,
+    load_time_series_locations, iter_time_series_blocks, DEFAULT_DATE_BLOCK
+)
+from src.cleaning import (
+    clean_covid_df, clean_covid_chunks, compact_types, clean_time_series_locations, melt_time_series_block
+)
+from src.parallel_cleaning import clean_covid_df_parallel, clean_covid_chunks_parallel
 from src.db.engine import get_engine
-from src.db.models import Base
-from src.db.crud_orm import bulk_insert
-from sqlalchemy.orm import sessionmaker
+from src.db.migrations import upgrade_schema, analyze
+from src.db.crud_sql import (
+    bulk_insert_df, upsert_df, get_high_water_mark, set_high_water_mark, SQLITE_DATETIME_FORMAT,
+    get_dataset_version, bump_dataset_version, sync_locations, upsert_time_series_df,
+    count_reports, get_reports_dtype_sample, iter_reports_frames
+)
+from src.db.rollups import refresh_rollups, get_dates_for_snos
+from sqlalchemy.engine import Engine
+
+def rows_past_mark(df: pd.DataFrame, mark: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Keep the rows that are new (sno above the mark) or revised (last_update
+    after the mark). With no mark every row is kept.
+    """
+    if not mark or mark["last_sno"] is None:
+        return df
+
+    keep = (df["sno"] > mark["last_sno"]).fillna(False)
+    if mark["last_update"] is not None:
+        keep |= (df["last_update"] > mark["last_update"]).fillna(False)
+
+    return df[keep]
+
+def _advance_mark(mark: Dict[str, Any], df: pd.DataFrame) -> None:
+    """Raise the running high-water mark to cover the rows in df."""
+    for key, col in [("last_sno", "sno"), ("last_update", "last_update")]:
+        value = df[col].max()
+        if pd.isna(value):
+            continue
+        if mark[key] is None or value > mark[key]:
+            mark[key] = value
+
+def write_dataset_snapshot(engine: Engine, snapshot_dir: str, version: str) -> Path:
+    """
+    Write the covid_reports table as a snapshot of its compact_types form,
+    streamed from the database so peak memory stays at one batch rather
+    than the whole table.
+    """
+    with engine.connect() as conn:
+        n_rows = count_reports(conn)
+        dtypes = compact_types(get_reports_dtype_sample(conn)).dtypes
+        return write_snapshot_batches(iter_reports_frames(conn), dtypes, n_rows, snapshot_dir, version)
+
+def publish_dataset(engine: Engine, changed: bool = True, snapshot_dir: Optional[str] = None) -> str:
+    """
+    Finish an ingest: bump the data version if anything changed, refresh the
+    planner statistics and (re)write the columnar snapshot if it is missing
+    or does not carry the current version.
+
+    Returns:
+        str: The current data version.
+    """
+    with engine.connect() as conn:
+        version = bump_dataset_version(conn) if changed else get_dataset_version(conn)
+
+    if changed:
+        analyze(engine)
+
+    if snapshot_dir is not None and version is not None:
+        if load_snapshot(snapshot_dir, expected_version=version) is None:
+            write_dataset_snapshot(engine, snapshot_dir, version)
+            print(f"Wrote snapshot version {version} to {snapshot_dir}")
+
+    return version
+
+def ingest_csv_stream(
+    engine: Engine,
+    csv_path: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    incremental: bool = False,
+    snapshot_dir: Optional[str] = None,
+    workers: int = 1
+) -> int:
+    """
+    Stream a CSV into 'covid_reports' chunk by chunk.
+
+    Each chunk is read, cleaned and inserted in its own transaction, so peak
+    memory depends on the chunk size rather than on the size of the file.
+    The largest sno / last_update seen is recorded in 'ingest_state' once
+    every chunk has been written.
+
+    In incremental mode only rows past the recorded mark are kept, and they
+    are upserted on sno, so re-running over the same file is safe. The rollup
+    tables are then refreshed for the affected days only.
+
+    Args:
+        engine: SQLAlchemy engine for the target database.
+        csv_path: Path to the raw CSV file.
+        chunksize: Number of rows per chunk.
+        incremental: Upsert only rows past the high-water mark.
+        snapshot_dir: Where to write the columnar snapshot (see publish_dataset).
+        workers: Processes used to clean chunks; above 1 chunks are cleaned
+            ahead on a process pool while earlier ones are being inserted.
+
+    Returns:
+        int: Total number of records inserted or updated.
+    """
+    source = Path(csv_path).name
+    with engine.connect() as conn:
+        previous = get_high_water_mark(conn, source)
+
+    mark = dict(previous) if previous else {"last_sno": None, "last_update": None}
+    changed_dates = set() if incremental else None
+    total = 0
+
+    raw_chunks = iter_csv_chunks(csv_path, chunksize)
+    if workers > 1:
+        clean_chunks = clean_covid_chunks_parallel(raw_chunks, workers)
+    else:
+        clean_chunks = clean_covid_chunks(raw_chunks)
+
+    for df_clean in clean_chunks:
+        _advance_mark(mark, df_clean)
+        with engine.connect() as conn:
+            if incremental:
+                rows = rows_past_mark(df_clean, previous)
+                # Days a revised row moves away from need recomputing as well
+                changed_dates.update(get_dates_for_snos(conn, rows["sno"].dropna()))
+                changed_dates.update(rows["observation_date"].dropna().dt.strftime(SQLITE_DATETIME_FORMAT))
+                total += upsert_df(conn, rows)
+            else:
+                total += bulk_insert_df(conn, df_clean)
+        print(f"  ...{total} records written")
+
+    # Only move the mark once everything up to it has been committed
+    with engine.connect() as conn:
+        refresh_rollups(conn, changed_dates)
+        set_high_water_mark(conn, source, mark["last_sno"], mark["last_update"])
+
+    publish_dataset(engine, changed=total > 0, snapshot_dir=snapshot_dir)
+
+    return total
+
+def ingest_time_series(engine: Engine, csv_path: str, block_size: int = DEFAULT_DATE_BLOCK) -> int:
+    """
+    Load a wide time-series CSV (one column per date) into 'time_series_confirmed'.
+
+    Locations are synced into the 'locations' dimension first; the date
+    columns are then read, melted and upserted one block at a time, so a file
+    with thousands of dates never has to be melted in memory at once.
+
+    Args:
+        engine: SQLAlchemy engine for the target database.
+        csv_path: Path to the wide CSV file.
+        block_size: Number of date columns per block.
+
+    Returns:
+        int: Total number of (location, date) rows inserted or updated.
+    """
+    locations = clean_time_series_locations(load_time_series_locations(csv_path))
+    with engine.connect() as conn:
+        location_ids = sync_locations(conn, locations)
+
+    total = 0
+    for block in iter_time_series_blocks(csv_path, block_size):
+        with engine.connect() as conn:
+            total += upsert_time_series_df(conn, melt_time_series_block(block, location_ids))
+    return total
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load the COVID-19 CSV into the SQLite database.")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Rows per streamed chunk. Use 0 to load the whole file in one go.",
+    )
+    parser.add_argument(
+        "--date-block",
+        type=int,
+        default=DEFAULT_DATE_BLOCK,
+        help="Date columns per block when loading the wide time-series file.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for cleaning. 1 cleans in this process.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only upsert rows past the last recorded sno/last_update instead of inserting everything.",
+    )
+    args = parser.parse_args(argv)
+    if args.incremental and args.chunksize <= 0:
+        parser.error("--incremental requires a positive --chunksize")
+    if args.workers <= 0:
+        parser.error("--workers must be positive")
+    if args.date_block <= 0:
+        parser.error("--date-block must be positive")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     # Define paths
-    dataset_path = Path("dataset/covid_19_data.csv")
+    dataset_path = Path(__file__).parent / "Dataset" / "covid_19_data.csv"
+    time_series_path = Path(__file__).parent / "Dataset" / "time_series_covid_19_confirmed.csv"
     db_path = "covid_data.db"  # This will be created in the root folder
+    snapshot_dir = snapshot_dir_for(db_path)
 
-    print(f"Loading data from {dataset_path}...")
-    try:
-        df_raw = load_csv(str(dataset_path))
-    except FileNotFoundError:
+    if not dataset_path.exists():
         print(f"Error: Dataset not found at {dataset_path}")
         return
 
+    print(f"Creating database at {db_path}...")
+    engine = get_engine(db_path, profile="bulk-load")
+
+    # Create tables, and add any indexes an older database is missing
+    created = upgrade_schema(engine)
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+
+    if time_series_path.exists():
+        print(f"Loading time series from {time_series_path} in blocks of {args.date_block} dates...")
+        try:
+            count = ingest_time_series(engine, str(time_series_path), args.date_block)
+            print(f"Successfully wrote {count} records into 'time_series_confirmed'.")
+        except Exception as e:
+            print(f"Error loading time series: {e}")
+
+    if args.chunksize > 0:
+        mode = "Incrementally streaming" if args.incremental else "Streaming"
+        print(f"{mode} data from {dataset_path} in chunks of {args.chunksize} rows...")
+        try:
+            count = ingest_csv_stream(
+                engine, str(dataset_path), args.chunksize, args.incremental, str(snapshot_dir), args.workers
+            )
+            print(f"Successfully wrote {count} records into 'covid_reports'.")
+        except Exception as e:
+            print(f"Error inserting data: {e}")
+        return
+
+    print(f"Loading data from {dataset_path}...")
+    df_raw = load_csv(str(dataset_path))
+
     print("Cleaning data...")
-    df_clean = clean_covid_df(df_raw)
-    records = to_records(df_clean)
-    print(f"Prepared {len(records)} records.")
+    if args.workers > 1:
+        df_clean = clean_covid_df_parallel(df_raw, args.workers)
+    else:
+        df_clean = clean_covid_df(df_raw)
+    print(f"Prepared {len(df_clean)} records.")
 
-    print(f"Creating database at {db_path}...")
-    engine = get_engine(db_path)
-    
-    # Create tables
-    Base.metadata.create_all(engine)
-    
-    # Create session
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
-
-    try:
-        print("Inserting records (this might take a moment)...")
-        # Clear existing data to avoid duplicates if run multiple times
-        # session.execute("DELETE FROM covid_reports") 
-        # session.commit()
-        
-        count = bulk_insert(session, records)
-        print(f"Successfully inserted {count} records into 'covid_reports'.")
-    except Exception as e:
-        print(f"Error inserting data: {e}")
-        session.rollback()
-    finally:
-        session.close()
+    with engine.connect() as conn:
+        try:
+            print("Inserting records (this might take a moment)...")
+            # Clear existing data to avoid duplicates if run multiple times
+            # conn.execute(text("DELETE FROM covid_reports"))
+            # conn.commit()
+
+            count = bulk_insert_df(conn, df_clean)
+            refresh_rollups(conn)
+            set_high_water_mark(conn, dataset_path.name, df_clean["sno"].max(), df_clean["last_update"].max())
+            print(f"Successfully inserted {count} records into 'covid_reports'.")
+        except Exception as e:
+            print(f"Error inserting data: {e}")
+            conn.rollback()
+            return
+
+    publish_dataset(engine, snapshot_dir=str(snapshot_dir))
 
 if __name__ == "__main__":
     main()
@@ -1,19 +1,129 @@
 """
 Analysis module for processing and summarizing COVID-19 data.
 """
+import weakref
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
+from sqlalchemy.engine import Connection
+from src.db import rollups
+from src.instrumentation import timed
 
+COUNT_COLUMNS = ["confirmed", "deaths", "recovered"]
+
+class FilterIndex:
+    """
+    Lookup index over a loaded dataset, built once and reused by filter_data.
+
+    The index keeps a reference to the frame, not a copy. It stores the row
+    permutation that orders the frame by (country_region, observation_date),
+    the row range of each country in that order, and a date ordering for
+    date-only filters. A country plus date-range filter is then two binary
+    searches and one take of the matching rows.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        # A view of the frame's own date column where possible (any datetime64 unit)
+        dates = df["observation_date"].to_numpy()
+        if dates.dtype.kind != "M":
+            dates = dates.astype("datetime64[ns]")
+        countries = df["country_region"]
+        if isinstance(countries.dtype, pd.CategoricalDtype):
+            country_codes = countries.cat.codes.to_numpy()
+            labels = countries.cat.categories
+        else:
+            country_codes, labels = pd.factorize(countries, sort=True)
+
+        # Missing countries and dates sort last, like DataFrame.sort_values
+        country_key = np.where(country_codes < 0, len(labels), country_codes)
+        date_key = np.where(np.isnat(dates), np.iinfo(np.int64).max, dates.view(np.int64))
+        index_dtype = np.int32 if len(df) < np.iinfo(np.int32).max else np.int64
+        self._order = np.lexsort((date_key, country_key)).astype(index_dtype)
+        self._dates = dates
+
+        # Row ranges per country in the sorted order (missing countries are not indexed)
+        sorted_keys = country_key[self._order]
+        present = np.unique(sorted_keys[sorted_keys < len(labels)])
+        starts = np.searchsorted(sorted_keys, present, side="left")
+        stops = np.searchsorted(sorted_keys, present, side="right")
+        self.country_ranges = {
+            labels[code]: (int(start), int(stop)) for code, start, stop in zip(present, starts, stops)
+        }
+
+        # Date order over the sorted positions, for filters without a country
+        sorted_dates = dates[self._order]
+        self._date_order = np.argsort(sorted_dates, kind="stable").astype(index_dtype)
+        self._dates_sorted = sorted_dates[self._date_order]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @staticmethod
+    def _bounds(dates: np.ndarray, start_date, end_date) -> Tuple[int, int]:
+        """Positions of the [start_date, end_date] range in a sorted date array (NaT sorts last)."""
+        lo = 0
+        hi = int(np.searchsorted(dates, np.datetime64("NaT"), side="left"))
+        if start_date:
+            lo = int(np.searchsorted(dates[:hi], pd.Timestamp(start_date).to_datetime64(), side="left"))
+        if end_date:
+            hi = int(np.searchsorted(dates[:hi], pd.Timestamp(end_date).to_datetime64(), side="right"))
+        return lo, max(lo, hi)
+
+    @timed
+    def filter(
+        self,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Same rows as filter_data(df, country, start_date, end_date), ordered by
+        (country_region, observation_date) instead of the original row order.
+        Without any filter the indexed frame itself is returned, so treat the
+        result as read-only.
+        """
+        if country:
+            if country not in self.country_ranges:
+                return self.df.iloc[0:0]
+            start, stop = self.country_ranges[country]
+            rows = self._order[start:stop]
+            if start_date or end_date:
+                lo, hi = self._bounds(self._dates[rows], start_date, end_date)
+                rows = rows[lo:hi]
+            return self.df.take(rows)
+
+        if not (start_date or end_date):
+            return self.df
+
+        lo, hi = self._bounds(self._dates_sorted, start_date, end_date)
+        return self.df.take(self._order[np.sort(self._date_order[lo:hi])])
+
+@timed
+def build_filter_index(df: pd.DataFrame) -> FilterIndex:
+    """
+    Build a FilterIndex for a loaded dataset.
+    """
+    return FilterIndex(df)
+
+@timed
 def filter_data(
     df: pd.DataFrame, 
     country: Optional[str] = None, 
     start_date: Optional[datetime] = None, 
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    index: Optional[FilterIndex] = None
 ) -> pd.DataFrame:
     """
     Filter the DataFrame based on country and date range.
+
+    If an index built from df is given (see build_filter_index), the filter is
+    answered from it with binary searches and a slice instead of boolean masks.
     """
+    if index is not None:
+        return index.filter(country, start_date, end_date)
+
     out = df.copy()
     
     if country:
@@ -27,20 +137,59 @@ def filter_data(
         
     return out
 
+# Latest-per-location results keyed by id() of the frame they were computed from.
+# The weak reference confirms the id still belongs to that frame and drops the
+# entry once the frame is garbage collected.
+_latest_cache: Dict[int, Tuple[weakref.ref, pd.DataFrame]] = {}
+
+def _location_codes(df: pd.DataFrame, group_cols: list) -> np.ndarray:
+    """Integer code per row identifying its location; missing values form their own group."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in group_cols:
+        col_codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        codes = codes * len(uniques) + col_codes
+    return codes
+
+def _compute_latest_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One O(n) pass: reduce each location's maximum observation_date with a
+    vectorised group max, then keep the first row that reaches it.
+    """
+    group_cols = ["country_region"]
+    if "province_state" in df.columns:
+        group_cols.append("province_state")
+
+    codes, _ = pd.factorize(_location_codes(df, group_cols))
+    n_locations = int(codes.max()) + 1
+
+    # NaT is the smallest int64, so a location only keeps a NaT row if it has no dates
+    dates = df["observation_date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    latest_date = np.full(n_locations, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(latest_date, codes, dates)
+
+    candidates = np.flatnonzero(dates == latest_date[codes])
+    first = ~pd.Series(codes[candidates]).duplicated().to_numpy()
+    return df.iloc[candidates[first]]
+
 def _get_latest_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Helper to get the latest data for each region.
+    Memoized per DataFrame object, so callers working on the same filtered
+    view share one computation. Treat both the input and the result as read-only.
     """
     if df.empty:
         return df
-        
-    group_cols = ["country_region"]
-    if "province_state" in df.columns:
-        group_cols.append("province_state")
-        
-    # Sort by date descending and keep the first (latest) for each location
-    return df.sort_values("observation_date", ascending=False).drop_duplicates(subset=group_cols)
 
+    key = id(df)
+    cached = _latest_cache.get(key)
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+
+    latest = _compute_latest_data(df)
+    _latest_cache[key] = (weakref.ref(df, lambda _, key=key: _latest_cache.pop(key, None)), latest)
+    return latest
+
+@timed
 def get_summary_stats(df: pd.DataFrame) -> Dict[str, int]:
     """
     Calculate total confirmed, deaths, and recovered cases.
@@ -54,12 +203,14 @@ def get_summary_stats(df: pd.DataFrame) -> Dict[str, int]:
         "total_recovered": int(latest_df["recovered"].sum())
     }
 
+@timed
 def get_trend_over_time(df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate data by observation_date to show trends over time.
     """
     return df.groupby("observation_date")[["confirmed", "deaths", "recovered"]].sum().reset_index()
 
+@timed
 def get_top_countries(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
     """
     Get the top n countries by total confirmed cases.
@@ -68,7 +219,50 @@ def get_top_countries(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
     latest_df = _get_latest_data(df)
     
     # Group by country and sum
-    grouped = latest_df.groupby("country_region")[["confirmed", "deaths", "recovered"]].sum().reset_index()
+    # observed=True: with a categorical country_region only countries present in the data are listed
+    grouped = latest_df.groupby("country_region", observed=True)[["confirmed", "deaths", "recovered"]].sum().reset_index()
     
     # Sort by confirmed descending and take top n
     return grouped.sort_values("confirmed", ascending=False).head(n)
+
+
+# Rollup-backed entry points. These read the pre-aggregated tables maintained at
+# ingest time (src/db/rollups.py) and return the same shapes as the functions above
+# applied to the unfiltered dataset, so they can be used whenever no finer filter is active.
+
+@timed
+def get_summary_stats_from_rollups(conn: Connection) -> Dict[str, int]:
+    """
+    Equivalent of get_summary_stats over the whole dataset.
+    """
+    totals = rollups.get_latest_totals(conn)
+
+    return {
+        "total_confirmed": int(totals["confirmed"]),
+        "total_deaths": int(totals["deaths"]),
+        "total_recovered": int(totals["recovered"])
+    }
+
+@timed
+def get_trend_over_time_from_rollups(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Equivalent of get_trend_over_time(filter_data(df, country, start_date, end_date)).
+    Daily totals are additive, so any country/date filter can be served.
+    """
+    rows = rollups.get_daily_totals(conn, country, start_date, end_date)
+    trend = pd.DataFrame(rows, columns=["observation_date"] + COUNT_COLUMNS)
+    trend["observation_date"] = pd.to_datetime(trend["observation_date"])
+    return trend
+
+@timed
+def get_top_countries_from_rollups(conn: Connection, n: int = 10) -> pd.DataFrame:
+    """
+    Equivalent of get_top_countries over the whole dataset.
+    """
+    rows = rollups.get_latest_country_totals(conn, n)
+    return pd.DataFrame(rows, columns=["country_region"] + COUNT_COLUMNS)
@@ -8,31 +8,167 @@ root_path = Path(__file__).parent.parent
 sys.path.append(str(root_path))
 
 from src.db.engine import get_engine
-from src.dashboard_utils import load_data_from_db
+from src.db.crud_sql import SORTABLE_COLUMNS, get_reports_page, estimate_reports_count
+from src.dashboard_utils import DatasetCache
+from src.data_access import snapshot_dir_for
+from src.result_cache import ResultCache
+from src.instrumentation import timed
+from src.metrics import get_metrics
 from src.analysis import (
+    FilterIndex,
+    build_filter_index,
     filter_data,
     get_summary_stats,
-    get_trend_over_time,
-    get_top_countries
+    get_top_countries,
+    get_summary_stats_from_rollups,
+    get_trend_over_time_from_rollups,
+    get_top_countries_from_rollups
 )
 
 # Constants
 DB_PATH = root_path / "covid_data.db"
+SNAPSHOT_DIR = snapshot_dir_for(str(DB_PATH))
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PAGE_SIZES = [50, 100, 250, 500]
+
+@st.cache_resource
+def get_dataset_cache() -> DatasetCache:
+    """
+    The dataset shared by all sessions, kept at the database's data version.
+    """
+    # Memory-maps the snapshot written by init_db when it is current,
+    # otherwise reads the database. Either way the frame is compact.
+    return DatasetCache(str(SNAPSHOT_DIR))
 
-@st.cache_data
 def get_data():
     """
-    Load data from the database. Cached to improve performance.
+    Load data from the database, or return the cached frame.
+
+    Every rerun checks the data version stamp (one indexed lookup). After an
+    ingest or a write bumped it, the new and revised rows are read and merged
+    into the cached frame where possible instead of reloading the whole table
+    (see dashboard_utils.refresh_dataset).
     """
     if not DB_PATH.exists():
         st.error(f"Database file not found at {DB_PATH}. Please run init_db.py first.")
         return pd.DataFrame()
-        
-    # Pass the path string to get_engine, which handles the sqlite:/// prefix
-    engine = get_engine(str(DB_PATH))
-    with engine.connect() as conn:
-        df = load_data_from_db(conn)
-    return df
+
+    with get_read_engine().connect() as conn:
+        return get_dataset_cache().get(conn)
+
+@st.cache_resource(max_entries=2)
+def get_filter_index(_df: pd.DataFrame, data_version) -> FilterIndex:
+    """
+    Lookup index over the cached dataset, built once per data version and
+    shared across reruns and sessions (cache_resource does not copy it).
+    """
+    return build_filter_index(_df)
+
+@st.cache_resource
+def get_read_engine():
+    """
+    Read-only engine for the dashboard's queries, shared across reruns.
+    get_engine handles the sqlite:/// prefix. The dashboard only reads,
+    so the database is opened read-only with the read-serving pragmas.
+    """
+    return get_engine(str(DB_PATH), profile="read-serving")
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """
+    Per-filter result cache, shared across reruns and sessions.
+    """
+    return ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+
+@timed
+def compute_view(df, country, start_date, end_date, full_range):
+    """
+    The aggregates the page shows for one filter: summary statistics, trend,
+    daily new cases and top countries.
+    """
+    filtered_df = filter_data(
+        df,
+        country=country,
+        start_date=start_date,
+        end_date=end_date,
+        index=get_filter_index(df, df.attrs.get("data_version"))
+    )
+
+    with get_read_engine().connect() as conn:
+        # Latest-per-location views can only come from the rollups over the full date range
+        if full_range and country is None:
+            stats = get_summary_stats_from_rollups(conn)
+        else:
+            stats = get_summary_stats(filtered_df)
+
+        trend_df = get_trend_over_time_from_rollups(conn, country, start_date, end_date)
+
+        top_countries = None
+        if country is None:
+            if full_range:
+                top_countries = get_top_countries_from_rollups(conn, 10)
+            else:
+                top_countries = get_top_countries(filtered_df, n=10)
+
+    # Daily new cases of the selected country, or worldwide
+    daily_df = get_metrics(
+        df, country, start_date, end_date, level="country" if country else "global"
+    )
+
+    # The filtered rows are not returned: the raw data viewer pages through
+    # the database, and a whole-dataset copy would crowd the aggregates out
+    # of the result cache.
+    return {
+        "stats": stats,
+        "trend": trend_df,
+        "top_countries": top_countries,
+        "daily": daily_df,
+    }
+
+def show_raw_data(country, start_date, end_date):
+    """
+    Page through the filtered reports straight from the database.
+
+    Pages are fetched with a keyset cursor, so only the visible rows are read
+    and rendered. The cursors of the pages already visited are kept in the
+    session state for "Previous"; changing the filter or sort starts over.
+    """
+    col1, col2, col3 = st.columns(3)
+    sort_by = col1.selectbox("Sort by", SORTABLE_COLUMNS)
+    descending = col2.checkbox("Descending")
+    page_size = col3.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+    view_key = (country, start_date, end_date, sort_by, descending, page_size)
+    if st.session_state.get("raw_view_key") != view_key:
+        st.session_state["raw_view_key"] = view_key
+        # Cursor each visited page starts after; None for the first page
+        st.session_state["raw_cursors"] = [None]
+    cursors = st.session_state["raw_cursors"]
+
+    with get_read_engine().connect() as conn:
+        page, next_cursor = get_reports_page(
+            conn, country, start_date, end_date,
+            sort_by=sort_by, descending=descending, after=cursors[-1], page_size=page_size
+        )
+        count, exact = estimate_reports_count(conn, country, start_date, end_date)
+
+    first_row = (len(cursors) - 1) * page_size + 1
+    if exact:
+        total = f"{count:,}"
+    elif country or start_date or end_date:
+        total = f"more than {count:,}"  # counting stopped at the cap
+    else:
+        total = f"about {count:,}"  # planner statistics
+    st.caption(f"Rows {first_row:,}-{first_row + len(page) - 1:,} of {total}")
+    st.dataframe(page, hide_index=True)
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
 
 def main():
     st.set_page_config(page_title="Public Health Dashboard", layout="wide")
@@ -74,17 +210,20 @@ def main():
     countries = sorted(df["country_region"].unique())
     selected_country = st.sidebar.selectbox("Select Country", ["All"] + countries)
     
-    # Apply Filters
-    filtered_df = filter_data(
-        df, 
-        country=selected_country if selected_country != "All" else None,
-        start_date=pd.to_datetime(start_date),
-        end_date=pd.to_datetime(end_date)
+    # Apply Filters. Results are cached per (data version, filter), so the
+    # frame itself is never hashed and repeated filters are served from memory.
+    country = selected_country if selected_country != "All" else None
+    full_range = start_date <= min_date and end_date >= max_date
+    cache = get_result_cache()
+    key = (df.attrs.get("data_version"), country, start_date, end_date)
+    view = cache.get_or_compute(
+        key,
+        lambda: compute_view(df, country, pd.to_datetime(start_date), pd.to_datetime(end_date), full_range)
     )
     
     # Display Summary Stats
     st.header("Summary Statistics")
-    stats = get_summary_stats(filtered_df)
+    stats = view["stats"]
     
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Confirmed", f"{stats['total_confirmed']:,}")
@@ -93,18 +232,37 @@ def main():
     
     # Display Trends
     st.header("Trends Over Time")
-    trend_df = get_trend_over_time(filtered_df)
+    trend_df = view["trend"]
     st.line_chart(trend_df.set_index("observation_date")[["confirmed", "deaths", "recovered"]])
     
+    st.header("Daily New Cases")
+    daily_df = view["daily"].rename(columns={"new_confirmed": "new cases", "new_confirmed_avg": "7-day average"})
+    st.line_chart(daily_df.set_index("observation_date")[["new cases", "7-day average"]])
+
     # Display Top Countries (only if no specific country is selected)
     if selected_country == "All":
         st.header("Top 10 Countries by Confirmed Cases")
-        top_countries = get_top_countries(filtered_df, n=10)
+        top_countries = view["top_countries"]
         st.bar_chart(top_countries.set_index("country_region")["confirmed"])
     
-    # Show Raw Data
+    # Show Raw Data, a page at a time
     if st.checkbox("Show Raw Data"):
-        st.dataframe(filtered_df)
+        # Over the full range the date bounds filter nothing; leaving them out
+        # lets the row count come from the planner statistics
+        if full_range:
+            show_raw_data(country, None, None)
+        else:
+            show_raw_data(country, pd.to_datetime(start_date), pd.to_datetime(end_date))
+
+    with st.sidebar.expander("Debug: result cache"):
+        refresh = get_dataset_cache().last_refresh
+        if refresh:
+            st.write(f"Data version {refresh['version']}: {refresh['how']} load, {refresh['rows']:,} rows")
+        cache_stats = cache.stats()
+        st.write(f"Hits: {cache_stats['hits']:,} / Misses: {cache_stats['misses']:,} "
+                 f"({cache_stats['hit_rate']:.0%} hit rate)")
+        st.write(f"Entries: {cache_stats['entries']:,}, evictions: {cache_stats['evictions']:,}")
+        st.write(f"Memory: {cache_stats['bytes'] / 1024**2:.1f} MiB of {cache_stats['max_bytes'] / 1024**2:.0f} MiB")
 
 if __name__ == "__main__":
     main()
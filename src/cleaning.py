@@ -4,8 +4,10 @@ Cleaning module - standardises, validates, and converts raw COVID-19 CSV data.
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterable, Iterator
+import numpy as np
 import pandas as pd
+from src.instrumentation import timed
 
 REQUIRED_RAW_COLUMNS = [
     "SNo",
@@ -35,6 +37,7 @@ def validate_schema(df: pd.DataFrame) -> None:
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
+@timed
 def standardise_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Rename dataset columns to a consistent internal schema."""
     validate_schema(df)
@@ -42,6 +45,18 @@ def standardise_columns(df: pd.DataFrame) -> pd.DataFrame:
     out = out.rename(columns=RENAME_MAP)
     return out
 
+@timed
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of date strings in any of the export's layouts
+    (01/22/2020, 1/23/20 17:00, ISO timestamps); unparseable values become NaT.
+
+    format="mixed" infers the layout per value, and pandas' unique-value
+    cache means each distinct string is only parsed once.
+    """
+    return pd.to_datetime(values, errors="coerce", format="mixed")
+
+@timed
 def convert_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     Convert:
@@ -50,10 +65,9 @@ def convert_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     out = df.copy()
 
-    # Dates: handle mixed formats (01/22/2020) and (1/23/20 17:00)
-    # format='mixed' allows pandas to infer different formats row-by-row
-    out["observation_date"] = pd.to_datetime(out["observation_date"], errors="coerce", format="mixed")
-    out["last_update"] = pd.to_datetime(out["last_update"], errors="coerce", format="mixed")
+    # Dates: handle mixed formats (01/22/2020), (1/23/20 17:00) and ISO timestamps
+    out["observation_date"] = parse_dates(out["observation_date"])
+    out["last_update"] = parse_dates(out["last_update"])
 
     # Counts: numeric -> nullable integer
     for col in ["confirmed", "deaths", "recovered"]:
@@ -64,6 +78,7 @@ def convert_types(df: pd.DataFrame) -> pd.DataFrame:
 
     return out
 
+@timed
 def handle_missing(df: pd.DataFrame) -> pd.DataFrame:
     """
     Handle missing values:
@@ -74,6 +89,58 @@ def handle_missing(df: pd.DataFrame) -> pd.DataFrame:
     # so we don't need to do anything here if we want NULLs.
     return out
 
+LOCATION_COLUMNS = ["country_region", "province_state"]
+COUNT_COLUMNS = ["confirmed", "deaths", "recovered"]
+DATE_COLUMNS = ["observation_date", "last_update"]
+
+_INT32_MIN, _INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+def _narrow_int(col: pd.Series) -> pd.Series:
+    """
+    Narrow an integer column to 32 bits when every value fits: plain int32 when
+    nothing is missing, otherwise nullable Int32 (int32 values plus a validity mask).
+    """
+    if col.empty or col.isna().all():
+        return col.astype("Int32")
+    if col.min() < _INT32_MIN or col.max() > _INT32_MAX:
+        return col
+    return col.astype("int32" if not col.isna().any() else "Int32")
+
+def _narrow_datetime(col: pd.Series) -> pd.Series:
+    """Store a datetime column at second resolution when no sub-second part would be lost."""
+    values = col.dropna()
+    if not values.empty and (values != values.dt.floor("s")).any():
+        return col
+    return col.astype("datetime64[s]")
+
+@timed
+def compact_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a cleaned or loaded frame to a compact in-memory representation:
+    - country_region/province_state -> category
+    - sno and counts -> int32 / nullable Int32 when the values fit
+    - observation_date/last_update -> datetime64[s] when nothing is lost
+
+    Useful for frames that are cached and pickled (e.g. by st.cache_data).
+    Columns that are not present are left alone.
+    """
+    out = df.copy()
+
+    for col in LOCATION_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("category")
+
+    for col in ["sno"] + COUNT_COLUMNS:
+        if col in out.columns and pd.api.types.is_integer_dtype(out[col]):
+            out[col] = _narrow_int(out[col])
+
+    for col in DATE_COLUMNS:
+        if col in out.columns and pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = _narrow_datetime(out[col])
+
+    return out
+
+@timed
 def clean_covid_df(raw_df: pd.DataFrame) -> pd.DataFrame:
     """End-to-end cleaning pipeline for the COVID dataset."""
     df = standardise_columns(raw_df)
@@ -81,6 +148,76 @@ def clean_covid_df(raw_df: pd.DataFrame) -> pd.DataFrame:
     df = handle_missing(df)
     return df
 
+def clean_covid_chunks(raw_chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Lazily clean a stream of raw chunks (e.g. from data_access.iter_csv_chunks).
+    Each chunk is cleaned independently, so only one chunk is held in memory at a time.
+    """
+    for raw_chunk in raw_chunks:
+        yield clean_covid_df(raw_chunk)
+
+TIME_SERIES_RENAME_MAP = {
+    "Province/State": "province_state",
+    "Country/Region": "country_region",
+    "Lat": "lat",
+    "Long": "long",
+}
+
+@timed
+def clean_time_series_locations(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename the location columns of a wide time-series export
+    (see data_access.load_time_series_locations) and coerce Lat/Long to float.
+    """
+    missing = [c for c in TIME_SERIES_RENAME_MAP if c not in raw_df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    out = raw_df[list(TIME_SERIES_RENAME_MAP)].rename(columns=TIME_SERIES_RENAME_MAP)
+    for col in ["lat", "long"]:
+        out[col] = pd.to_numeric(out[col], errors="coerce").astype("float64")
+    return out
+
+@timed
+def parse_date_headers(headers: Iterable[str]) -> pd.DatetimeIndex:
+    """
+    Parse the date column headers of a wide time-series export (e.g. "1/22/20").
+    Raises ValueError if a header is not a date.
+    """
+    headers = pd.Series(list(headers), dtype=object)
+    dates = parse_dates(headers)
+    bad = headers[dates.isna()]
+    if not bad.empty:
+        raise ValueError(f"Unparseable date columns: {bad.tolist()}")
+    return pd.DatetimeIndex(dates)
+
+@timed
+def melt_time_series_block(block: pd.DataFrame, location_ids: np.ndarray, column: str = "confirmed") -> pd.DataFrame:
+    """
+    Turn one block of date columns (locations x dates, see
+    data_access.iter_time_series_blocks) into long format:
+    location_id, observation_date, <column> (nullable Int64).
+
+    The headers are parsed once per block and the values are reshaped with
+    NumPy: rows come out location-major, dates in column order.
+    """
+    dates = parse_date_headers(block.columns)
+    values = block.to_numpy(dtype=np.float64)
+    n_locations, n_dates = values.shape
+    if len(location_ids) != n_locations:
+        raise ValueError(f"Expected {n_locations} location ids, got {len(location_ids)}")
+
+    flat = values.ravel()
+    mask = np.isnan(flat)
+    counts = np.where(mask, 0, np.round(flat)).astype(np.int64)
+
+    return pd.DataFrame({
+        "location_id": np.repeat(np.asarray(location_ids, dtype=np.int64), n_dates),
+        "observation_date": np.tile(dates.values, n_locations),
+        column: pd.arrays.IntegerArray(counts, mask),
+    })
+
+@timed
 def to_records(df: pd.DataFrame) -> list[dict[str, Any]]:
     """
     Convert cleaned DataFrame to list[dict] (useful for bulk insert into DB).
@@ -1,9 +1,16 @@
 """
 Utility functions for the Streamlit dashboard.
 """
+import threading
 import pandas as pd
 from sqlalchemy.engine import Connection
-from src.db.crud_sql import get_reports_sql
+from typing import Any, Dict, Optional, Tuple
+from src.db.crud_sql import (
+    get_reports_frame, get_dataset_version, get_revised_version, get_reports_changed_since, count_reports
+)
+from src.data_access import load_snapshot
+from src.cleaning import compact_types
+from src.instrumentation import timed
 
 def load_data_from_db(conn: Connection) -> pd.DataFrame:
     """
@@ -13,19 +20,157 @@ def load_data_from_db(conn: Connection) -> pd.DataFrame:
         conn: SQLAlchemy database connection.
         
     Returns:
-        pd.DataFrame: DataFrame containing the report data.
+        pd.DataFrame: DataFrame containing the report data, with datetime64
+        dates and nullable Int64 counts. Empty if there are no reports.
     """
-    # Fetch all reports
-    reports = get_reports_sql(conn)
+    # Fetch all reports column by column, already typed
+    df = get_reports_frame(conn)
     
-    if not reports:
+    if df.empty:
         return pd.DataFrame()
         
-    # Convert to DataFrame
-    df = pd.DataFrame(reports)
-    
-    # Ensure observation_date is datetime
-    if "observation_date" in df.columns:
-        df["observation_date"] = pd.to_datetime(df["observation_date"])
-        
     return df
+
+
+def load_dataset(conn: Connection, snapshot_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load the dashboard dataset, preferring the memory-mapped snapshot.
+
+    The snapshot is only used when its version stamp matches the one recorded
+    in the database; otherwise the data is read from the database. The version
+    the frame was loaded at is kept in df.attrs["data_version"], so results
+    derived from it can be cached per version.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        snapshot_dir: Snapshot directory written at ingest time, if any.
+
+    Returns:
+        pd.DataFrame: The dataset in the compact representation (see cleaning.compact_types).
+    """
+    version = get_dataset_version(conn)
+    df = None
+    if snapshot_dir is not None and version is not None:
+        df = load_snapshot(snapshot_dir, expected_version=version)
+
+    if df is None:
+        df = compact_types(load_data_from_db(conn))
+
+    df.attrs["data_version"] = version
+    return df
+
+
+def merge_changed_rows(df: pd.DataFrame, changed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge rows fetched with get_reports_changed_since into a loaded frame.
+
+    Rows of df whose sno appears in changed are replaced, new rows are added,
+    and the result is in sno order like a fresh load. Category columns keep
+    being categories (over the union of both sides' values), and the result
+    is compacted again, so it matches what load_dataset would now return.
+    """
+    if changed.empty:
+        return df
+
+    changed = compact_types(changed)
+    keep = ~df["sno"].isin(changed["sno"]).to_numpy()
+    kept = df[keep]
+
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and col in changed.columns:
+            # Cast both sides to one dtype, with the categories inferred from
+            # the values like a fresh load does: an all-missing changed column
+            # would otherwise get object categories that cannot join str ones
+            values = list(kept[col].cat.categories) + list(changed[col].dropna().unique())
+            dtype = pd.CategoricalDtype(pd.Index(values).unique().sort_values())
+            columns[col] = pd.concat([kept[col].astype(dtype), changed[col].astype(dtype)], ignore_index=True)
+        else:
+            columns[col] = pd.concat([kept[col], changed[col]], ignore_index=True)
+    out = pd.DataFrame(columns)
+
+    # Revised rows sit out of order; appended rows already follow the old ones
+    if not keep.all() or (len(kept) and changed["sno"].min() < kept["sno"].max()):
+        out = out.sort_values("sno", kind="stable", ignore_index=True)
+    return compact_types(out)
+
+@timed
+def refresh_dataset(conn: Connection, df: pd.DataFrame, snapshot_dir: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Bring a frame from load_dataset up to the database's current data version.
+
+    The version check is a single lookup in dataset_metadata. When the
+    version moved on, a snapshot at the new version is memory-mapped if
+    there is one; otherwise only the rows added or revised since the frame
+    was loaded are fetched and merged in. Everything is reloaded instead if
+    a write since then changed or deleted rows in place (see
+    crud_sql.bump_dataset_version), or if the merged frame does not have as
+    many rows as the table.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        df: Frame previously returned by load_dataset or refresh_dataset.
+        snapshot_dir: Snapshot directory written at ingest time, if any.
+
+    Returns:
+        Tuple[pd.DataFrame, str]: The current frame (df itself when nothing
+        changed) and how it was obtained: "unchanged", "snapshot", "delta" or "full".
+    """
+    version = get_dataset_version(conn)
+    if version == df.attrs.get("data_version"):
+        return df, "unchanged"
+
+    if snapshot_dir is not None and version is not None:
+        snapshot = load_snapshot(snapshot_dir, expected_version=version)
+        if snapshot is not None:
+            snapshot.attrs["data_version"] = version
+            return snapshot, "snapshot"
+
+    loaded = df.attrs.get("data_version")
+    revised = get_revised_version(conn)
+    if df.empty or loaded is None or (revised is not None and int(revised) > int(loaded)):
+        return load_dataset(conn, snapshot_dir), "full"
+
+    last_sno = df["sno"].max()
+    last_update = df["last_update"].max()
+    changed = get_reports_changed_since(
+        conn,
+        None if pd.isna(last_sno) else int(last_sno),
+        None if pd.isna(last_update) else last_update
+    )
+    merged = merge_changed_rows(df, changed)
+    if len(merged) != count_reports(conn):
+        return load_dataset(conn, snapshot_dir), "full"
+
+    if merged is df:
+        merged = df.copy(deep=False)
+    merged.attrs["data_version"] = version
+    return merged, "delta"
+
+class DatasetCache:
+    """
+    Holds the dashboard dataset and keeps it at the database's data version.
+
+    get() is meant to be called on every rerun: it loads the dataset the
+    first time and afterwards only checks the version stamp, merging in
+    changed rows when an ingest or a write has bumped it (see refresh_dataset). Frames
+    are replaced, never modified, so a frame handed out earlier stays valid.
+    Thread-safe; share one instance between sessions.
+    """
+
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        self.snapshot_dir = snapshot_dir
+        self._df: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+        self.last_refresh: Dict[str, Any] = {}
+
+    def get(self, conn: Connection) -> pd.DataFrame:
+        """Return the current dataset, loading or refreshing it as needed."""
+        with self._lock:
+            if self._df is None:
+                self._df, how = load_dataset(conn, self.snapshot_dir), "full"
+            else:
+                self._df, how = refresh_dataset(conn, self._df, self.snapshot_dir)
+            if how != "unchanged":
+                self.last_refresh = {"how": how, "version": self._df.attrs.get("data_version"), "rows": len(self._df)}
+            return self._df
@@ -1,10 +1,19 @@
 """
 Data access module - handles loading and exporting data.
 """
+import json
+import shutil
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from src.instrumentation import timed
 
+# Rows per chunk when streaming a CSV; keeps peak memory bounded regardless of file size.
+DEFAULT_CHUNKSIZE = 50_000
 
+
+@timed
 def load_csv(path: str) -> pd.DataFrame:
     """
     Load a CSV file into a pandas DataFrame.
@@ -24,3 +33,289 @@ def load_csv(path: str) -> pd.DataFrame:
         raise FileNotFoundError(f"File not found: {path}")
 
     return pd.read_csv(path)
+
+
+def iter_csv_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file as a sequence of DataFrames of at most `chunksize` rows.
+
+    Args:
+        path: Path to the CSV file.
+        chunksize: Maximum number of rows per chunk.
+
+    Returns:
+        Iterator[pd.DataFrame]: Iterator over the chunks, in file order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If chunksize is not positive.
+    """
+    file_path = Path(path)
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    if chunksize <= 0:
+        raise ValueError(f"chunksize must be positive, got {chunksize}")
+
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+# Wide time-series exports (time_series_covid_19_*.csv): these identifying columns,
+# then one column per date. Dates are read this many columns at a time.
+TIME_SERIES_ID_COLUMNS = ["Province/State", "Country/Region", "Lat", "Long"]
+DEFAULT_DATE_BLOCK = 256
+
+
+def _time_series_date_columns(path: str) -> list[str]:
+    """Read the header of a wide time-series CSV and return its date columns."""
+    file_path = Path(path)
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    missing = [c for c in TIME_SERIES_ID_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    return [c for c in header if c not in TIME_SERIES_ID_COLUMNS]
+
+
+@timed
+def load_time_series_locations(path: str) -> pd.DataFrame:
+    """
+    Load only the location columns (Province/State, Country/Region, Lat, Long)
+    of a wide time-series CSV, one row per location in file order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If a location column is missing.
+    """
+    _time_series_date_columns(path)
+    return pd.read_csv(path, usecols=TIME_SERIES_ID_COLUMNS)[TIME_SERIES_ID_COLUMNS]
+
+
+def iter_time_series_blocks(path: str, block_size: int = DEFAULT_DATE_BLOCK) -> Iterator[pd.DataFrame]:
+    """
+    Stream the date columns of a wide time-series CSV in blocks of at most
+    `block_size` columns, as float64 frames (missing cells are NaN) whose
+    rows line up with load_time_series_locations.
+
+    Each block is a separate pass that only converts its own columns, so peak
+    memory depends on the number of locations times the block size rather
+    than on how many dates the file has.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If block_size is not positive or a location column is missing.
+    """
+    if block_size <= 0:
+        raise ValueError(f"block_size must be positive, got {block_size}")
+
+    date_columns = _time_series_date_columns(path)
+
+    def blocks():
+        for start in range(0, len(date_columns), block_size):
+            columns = date_columns[start:start + block_size]
+            block = pd.read_csv(path, usecols=columns, dtype=np.float64)
+            yield block[columns]
+
+    return blocks()
+
+
+# Columnar snapshot: one .npy file per array plus a JSON manifest, written next to
+# the SQLite database so dashboard processes can memory-map it instead of querying.
+SNAPSHOT_MANIFEST = "manifest.json"
+
+
+def snapshot_dir_for(db_path: str) -> Path:
+    """
+    Return the snapshot directory that belongs to a database file,
+    e.g. covid_data.db -> covid_data.snapshot.
+    """
+    return Path(db_path).with_suffix(".snapshot")
+
+
+def _snapshot_arrays(col: pd.Series) -> tuple[dict, dict]:
+    """Split one column into plain NumPy arrays plus the metadata needed to rebuild it."""
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            col = col.astype("category")
+
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        meta = {"kind": "categorical", "categories": [str(c) for c in col.cat.categories]}
+        return meta, {"codes": col.cat.codes.to_numpy()}
+
+    if isinstance(col.dtype, pd.api.extensions.ExtensionDtype):
+        # Nullable integers (Int32/Int64): values plus validity mask
+        meta = {"kind": "masked", "dtype": str(col.dtype)}
+        values = col.to_numpy(dtype=col.dtype.numpy_dtype, na_value=0)
+        return meta, {"values": values, "mask": col.isna().to_numpy()}
+
+    return {"kind": "numpy"}, {"values": col.to_numpy()}
+
+
+def _begin_snapshot(snapshot_dir: str) -> tuple[Path, Path]:
+    """Return (target, fresh temporary directory) for writing a snapshot."""
+    target = Path(snapshot_dir)
+    tmp = target.with_name(target.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    return target, tmp
+
+
+def _finish_snapshot(target: Path, tmp: Path, version: str, n_rows: int, columns: list) -> Path:
+    """Write the manifest and swap the temporary directory into place."""
+    manifest = {"version": str(version), "n_rows": n_rows, "columns": columns}
+    (tmp / SNAPSHOT_MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    if target.exists():
+        shutil.rmtree(target)
+    tmp.rename(target)
+    return target
+
+
+@timed
+def write_snapshot(df: pd.DataFrame, snapshot_dir: str, version: str) -> Path:
+    """
+    Write df as a memory-mappable columnar snapshot.
+
+    The snapshot is written to a temporary directory first and swapped into
+    place, so readers never see a half-written snapshot under the final name.
+
+    Args:
+        df: The frame to store (typically cleaning.compact_types output).
+        snapshot_dir: Target directory.
+        version: Version stamp recorded in the manifest; load_snapshot only
+            accepts the snapshot when the caller expects the same stamp.
+
+    Returns:
+        Path: The snapshot directory.
+    """
+    target, tmp = _begin_snapshot(snapshot_dir)
+
+    columns = []
+    for name in df.columns:
+        meta, arrays = _snapshot_arrays(df[name])
+        files = {}
+        for part, array in arrays.items():
+            file_name = f"{len(columns)}_{part}.npy"
+            np.save(tmp / file_name, np.ascontiguousarray(array))
+            files[part] = file_name
+        columns.append({"name": name, **meta, "files": files})
+
+    return _finish_snapshot(target, tmp, version, len(df), columns)
+
+
+@timed
+def write_snapshot_batches(
+    batches: Iterable[pd.DataFrame],
+    dtypes: pd.Series,
+    n_rows: int,
+    snapshot_dir: str,
+    version: str
+) -> Path:
+    """
+    Write a snapshot from consecutive row batches without holding them all.
+
+    Every .npy file is preallocated for n_rows with np.lib.format.open_memmap
+    and filled batch by batch, so memory stays at about one batch. Each batch
+    is cast to dtypes first (categorical dtypes must list every category), so
+    the result loads exactly like write_snapshot(pd.concat(batches).astype(dtypes)).
+
+    Args:
+        batches: Frames with the columns of dtypes, in row order.
+        dtypes: Column name -> dtype of the stored frame.
+        n_rows: Total number of rows in batches.
+        snapshot_dir: Target directory.
+        version: Version stamp recorded in the manifest.
+
+    Returns:
+        Path: The snapshot directory.
+
+    Raises:
+        ValueError: If the batches do not add up to n_rows.
+    """
+    target, tmp = _begin_snapshot(snapshot_dir)
+
+    columns, outputs = [], []
+    for name, dtype in dtypes.items():
+        # The layout of an empty column of the final dtype fixes the array dtypes
+        meta, arrays = _snapshot_arrays(pd.Series([], dtype=dtype))
+        files, maps = {}, {}
+        for part, array in arrays.items():
+            file_name = f"{len(columns)}_{part}.npy"
+            maps[part] = np.lib.format.open_memmap(tmp / file_name, mode="w+", dtype=array.dtype, shape=(n_rows,))
+            files[part] = file_name
+        columns.append({"name": name, **meta, "files": files})
+        outputs.append(maps)
+
+    start = 0
+    for batch in batches:
+        stop = start + len(batch)
+        if stop > n_rows:
+            raise ValueError(f"Snapshot batches hold more than the expected {n_rows} rows")
+        for (name, dtype), maps in zip(dtypes.items(), outputs):
+            _, arrays = _snapshot_arrays(batch[name].astype(dtype))
+            for part, array in arrays.items():
+                maps[part][start:stop] = array
+        start = stop
+
+    if start != n_rows:
+        raise ValueError(f"Snapshot batches hold {start} rows, expected {n_rows}")
+
+    for maps in outputs:
+        for array in maps.values():
+            array.flush()
+    del outputs
+
+    return _finish_snapshot(target, tmp, version, n_rows, columns)
+
+
+@timed
+def load_snapshot(snapshot_dir: str, expected_version: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Memory-map a snapshot written by write_snapshot, without copying the data.
+
+    Columns are backed by read-only memory maps, so several processes opening
+    the same snapshot share the OS page cache. Treat the frame as read-only.
+
+    Args:
+        snapshot_dir: Snapshot directory.
+        expected_version: If given, the snapshot is only used when its manifest
+            carries this version stamp (e.g. the one recorded in the database).
+
+    Returns:
+        Optional[pd.DataFrame]: The frame, or None if the snapshot is missing,
+        incomplete or stale.
+    """
+    directory = Path(snapshot_dir)
+    manifest_path = directory / SNAPSHOT_MANIFEST
+    if not manifest_path.exists():
+        return None
+
+    manifest = json.loads(manifest_path.read_text())
+    if expected_version is not None and manifest["version"] != str(expected_version):
+        return None
+
+    data = {}
+    try:
+        for column in manifest["columns"]:
+            arrays = {
+                part: np.load(directory / file_name, mmap_mode="r")
+                for part, file_name in column["files"].items()
+            }
+            if column["kind"] == "categorical":
+                dtype = pd.CategoricalDtype(column["categories"])
+                data[column["name"]] = pd.Categorical.from_codes(arrays["codes"], dtype=dtype, validate=False)
+            elif column["kind"] == "masked":
+                data[column["name"]] = pd.arrays.IntegerArray(arrays["values"], arrays["mask"])
+            else:
+                data[column["name"]] = arrays["values"]
+    except FileNotFoundError:
+        # Snapshot replaced while we were reading it
+        return None
+
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,114 @@
+"""
+SQL pushdown versions of the functions in src/analysis.py.
+
+Each function takes the same filters as analysis.filter_data and lets SQLite
+do the filtering, grouping and latest-per-location selection, so only the
+aggregated result is brought into Python.
+"""
+from typing import Dict, Optional
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from src.db.crud_sql import report_filter_clause
+from src.instrumentation import timed
+
+COUNT_COLUMNS = ["confirmed", "deaths", "recovered"]
+
+_COUNT_SUMS = """
+    COALESCE(SUM(confirmed), 0) AS confirmed,
+    COALESCE(SUM(deaths), 0) AS deaths,
+    COALESCE(SUM(recovered), 0) AS recovered
+"""
+
+def latest_per_location_query(where: str = "") -> str:
+    """
+    Subquery with the latest filtered row per (country_region, province_state).
+    Mirrors analysis._get_latest_data: NULL provinces form one location,
+    rows without a date sort last, and of several rows on a location's latest
+    date the first one (lowest sno) is kept.
+
+    Only columns of ix_covid_reports_location_latest are read, and the window
+    order matches it, so the rows come from the index without a sort.
+    """
+    return f"""
+        SELECT country_region, province_state, observation_date, confirmed, deaths, recovered
+        FROM (
+            SELECT country_region, province_state, observation_date, confirmed, deaths, recovered,
+                ROW_NUMBER() OVER (
+                    PARTITION BY country_region, province_state
+                    ORDER BY observation_date DESC, sno ASC
+                ) AS rn
+            FROM covid_reports
+            {where}
+        )
+        WHERE rn = 1
+    """
+
+@timed
+def get_summary_stats_sql(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Same result as analysis.get_summary_stats(filter_data(df, country, start_date, end_date)).
+    """
+    where, params = report_filter_clause(country, start_date, end_date)
+    sql = text(f"SELECT {_COUNT_SUMS} FROM ({latest_per_location_query(where)})")
+    row = conn.execute(sql, params).mappings().one()
+
+    return {
+        "total_confirmed": int(row["confirmed"]),
+        "total_deaths": int(row["deaths"]),
+        "total_recovered": int(row["recovered"])
+    }
+
+@timed
+def get_trend_over_time_sql(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Same result as analysis.get_trend_over_time(filter_data(df, country, start_date, end_date)).
+    """
+    where, params = report_filter_clause(country, start_date, end_date)
+    sql = text(f"""
+        SELECT observation_date, {_COUNT_SUMS}
+        FROM covid_reports
+        {where} AND observation_date IS NOT NULL
+        GROUP BY observation_date
+        ORDER BY observation_date
+    """)
+    rows = conn.execute(sql, params).mappings().all()
+
+    trend = pd.DataFrame(rows, columns=["observation_date"] + COUNT_COLUMNS)
+    trend["observation_date"] = pd.to_datetime(trend["observation_date"], format="mixed")
+    return trend
+
+@timed
+def get_top_countries_sql(
+    conn: Connection,
+    n: int = 10,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Same result as analysis.get_top_countries(filter_data(df, country, start_date, end_date), n).
+    """
+    where, params = report_filter_clause(country, start_date, end_date)
+    sql = text(f"""
+        SELECT country_region, {_COUNT_SUMS}
+        FROM ({latest_per_location_query(where)})
+        WHERE country_region IS NOT NULL
+        GROUP BY country_region
+        ORDER BY confirmed DESC
+        LIMIT :n
+    """)
+    rows = conn.execute(sql, {**params, "n": n}).mappings().all()
+
+    return pd.DataFrame(rows, columns=["country_region"] + COUNT_COLUMNS)
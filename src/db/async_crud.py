@@ -0,0 +1,166 @@
+"""
+Asyncio facade over the CRUD and aggregate queries.
+
+SQLite drivers are synchronous, so each call runs the existing crud_sql /
+crud_orm / analysis_sql function on a worker thread with its own pooled
+connection. The event loop is never blocked, and many reads can be in
+flight at once (up to max_readers). Writes go through a single writer
+thread, because SQLite allows one writer at a time anyway. Every write
+refreshes the rollups it affects and bumps the data version in its own
+transaction, so dashboards reading the same file see it.
+
+Usage:
+    async with AsyncCrud("covid_data.db") as db:
+        results = await asyncio.gather(*(db.get_reports(country=c) for c in countries))
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import pandas as pd
+from src.db import analysis_sql, crud_orm, crud_sql
+from src.db.engine import get_engine, get_session_maker
+
+DEFAULT_MAX_READERS = 4
+
+class AsyncCrud:
+    """
+    Async access to one SQLite database file.
+
+    Args:
+        db_path: Path to the SQLite database file.
+        max_readers: Threads (and pooled connections) available to reads.
+        profile: Optional SQLite profile for get_engine (e.g. "bulk-load").
+    """
+
+    def __init__(self, db_path: str, max_readers: int = DEFAULT_MAX_READERS, profile: Optional[str] = None):
+        if max_readers <= 0:
+            raise ValueError(f"max_readers must be positive, got {max_readers}")
+        # One connection per reader thread plus one for the writer
+        self.engine = get_engine(db_path, profile=profile, pool_size=max_readers + 1)
+        self._session_maker = get_session_maker(self.engine)
+        self._readers = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="crud-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crud-write")
+
+    async def __aenter__(self) -> "AsyncCrud":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Wait for running calls, then release the threads and connections."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        self.engine.dispose()
+
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    def _with_connection(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.engine.connect() as conn:
+            return func(conn, *args, **kwargs)
+
+    def _with_session(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._session_maker() as session:
+            return func(session, *args, **kwargs)
+
+    async def _read(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._run(self._readers, self._with_connection, func, *args, **kwargs)
+
+    async def _write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._run(self._writer, self._with_connection, func, *args, **kwargs)
+
+    # Reads
+
+    async def get_reports(
+        self,
+        country: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """See crud_sql.get_reports_sql."""
+        return await self._read(crud_sql.get_reports_sql, country, start_date, end_date)
+
+    async def get_reports_frame(
+        self,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """See crud_sql.get_reports_frame."""
+        return await self._read(crud_sql.get_reports_frame, country, start_date, end_date)
+
+    async def get_summary_stats(
+        self,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """See analysis_sql.get_summary_stats_sql."""
+        return await self._read(analysis_sql.get_summary_stats_sql, country, start_date, end_date)
+
+    async def get_trend_over_time(
+        self,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """See analysis_sql.get_trend_over_time_sql."""
+        return await self._read(analysis_sql.get_trend_over_time_sql, country, start_date, end_date)
+
+    async def get_top_countries(
+        self,
+        n: int = 10,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """See analysis_sql.get_top_countries_sql."""
+        return await self._read(analysis_sql.get_top_countries_sql, n, country, start_date, end_date)
+
+    # Writes
+
+    async def create_report(self, report: Dict[str, Any]) -> None:
+        """See crud_sql.create_report_sql."""
+        await self._write(crud_sql.create_report_sql, report)
+
+    async def update_report(self, sno: int, updates: Dict[str, Any]) -> bool:
+        """See crud_sql.update_report_sql."""
+        return await self._write(crud_sql.update_report_sql, sno, updates)
+
+    async def delete_report(self, sno: int) -> bool:
+        """See crud_sql.delete_report_sql."""
+        return await self._write(crud_sql.delete_report_sql, sno)
+
+    async def bulk_insert(self, records: List[Dict[str, Any]]) -> int:
+        """See crud_orm.bulk_insert."""
+        return await self._run(self._writer, self._with_session, crud_orm.bulk_insert, records, track_changes=True)
+
+    async def bulk_insert_df(self, df: pd.DataFrame) -> int:
+        """See crud_sql.bulk_insert_df."""
+        return await self._write(crud_sql.bulk_insert_df, df, track_changes=True)
+
+    async def upsert_df(self, df: pd.DataFrame) -> int:
+        """See crud_sql.upsert_df."""
+        return await self._write(crud_sql.upsert_df, df, track_changes=True)
+
+    async def bulk_update(self, updates: Union[List[Dict[str, Any]], pd.DataFrame]) -> int:
+        """See crud_sql.bulk_update_sql."""
+        return await self._write(crud_sql.bulk_update_sql, updates)
+
+    async def bulk_delete(
+        self,
+        snos: Optional[Iterable[int]] = None,
+        country: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> int:
+        """See crud_sql.bulk_delete_sql."""
+        return await self._write(crud_sql.bulk_delete_sql, snos, country, start_date, end_date)
@@ -0,0 +1,253 @@
+"""
+Write-behind batching for single-row report creates.
+
+create_report_sql commits every row, which on SQLite means one journal sync
+per record. BatchedReportWriter accepts records one at a time, returns a
+Future for each, and a background thread inserts them in batched
+transactions. A batch is written when it reaches max_batch records, when
+its oldest record has waited max_delay seconds, on flush() and on close().
+
+Each Future resolves to the record's sno once its batch is committed (the
+key SQLite generated, for records without one), or raises the error that
+record caused. A batch is first sent as one executemany; if that fails it
+is retried row by row in a single transaction, so only the failing records
+see an error and the rest of the batch is still written. Every batch
+refreshes the rollups of its days and locations and bumps the data version
+before it commits.
+
+If the writer cannot go on (e.g. the database cannot be opened), every
+pending Future fails with that error and submit() raises from then on.
+
+Usage:
+    with BatchedReportWriter(engine) as writer:
+        futures = [writer.submit(report) for report in feed]
+    errors = [f.exception() for f in futures if f.exception()]
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from src.db.crud_sql import REPORT_COLUMNS, RowKey, _value_to_sql
+from src.db.rollups import record_changes
+from src.instrumentation import span
+
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_DELAY = 0.05  # seconds
+
+_INSERT_SQL = (
+    f"INSERT INTO covid_reports ({', '.join(REPORT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in REPORT_COLUMNS)})"
+)
+_STOP = object()
+_SNO_INDEX = REPORT_COLUMNS.index("sno")
+_KEY_INDEXES = [REPORT_COLUMNS.index(c) for c in ("observation_date", "country_region", "province_state")]
+
+def _row_key(row: tuple) -> RowKey:
+    return tuple(row[i] for i in _KEY_INDEXES)
+
+def _insert_rows(conn, rows: List[tuple]) -> List[int]:
+    """
+    Insert rows and return their snos. Rows without one are inserted one by
+    one, since executemany cannot report the keys SQLite generates.
+    """
+    snos = [row[_SNO_INDEX] for row in rows]
+    given = [row for row, sno in zip(rows, snos) if sno is not None]
+    if given:
+        conn.exec_driver_sql(_INSERT_SQL, given)
+    for i, row in enumerate(rows):
+        if snos[i] is None:
+            snos[i] = conn.exec_driver_sql(_INSERT_SQL, row).lastrowid
+    return snos
+
+class _FlushRequest:
+    """Queue marker: write everything received before it, then resolve done."""
+    def __init__(self):
+        self.done: Future = Future()
+
+class BatchedReportWriter:
+    """
+    Buffer single-report creates and insert them in batched transactions.
+
+    Usable as a context manager or as a long-lived object (call close() when
+    done). submit() is thread-safe.
+
+    Args:
+        engine: Engine for the database to write to. The writer holds one
+            of its connections while open.
+        max_batch: Records per transaction, at most.
+        max_delay: Seconds a record may wait before its batch is written.
+        max_pending: Records queued but not yet written before submit()
+            blocks (default: 10 batches), so a fast producer cannot run the
+            process out of memory.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_pending: Optional[int] = None
+    ):
+        if max_batch <= 0:
+            raise ValueError(f"max_batch must be positive, got {max_batch}")
+        if max_delay < 0:
+            raise ValueError(f"max_delay must not be negative, got {max_delay}")
+
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending or 10 * max_batch)
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="batch-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BatchedReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def submit(self, report: Dict[str, Any]) -> Future:
+        """
+        Queue one report (same keys as create_report_sql; missing ones are
+        stored as NULL).
+
+        Returns:
+            Future: Resolves to the report's sno once it is committed, or
+            raises the database error the report caused.
+
+        Raises:
+            ValueError: If the report has keys that are not covid_reports columns.
+            RuntimeError: If the writer is closed or stopped on an error.
+        """
+        unknown = set(report) - set(REPORT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown report fields: {sorted(unknown)}")
+        row = tuple(_value_to_sql(report.get(column)) for column in REPORT_COLUMNS)
+        future: Future = Future()
+        # Under the lock so nothing can be queued behind the stop marker
+        with self._close_lock:
+            if self._error is not None:
+                raise RuntimeError("BatchedReportWriter stopped on an error") from self._error
+            if self._closed:
+                raise RuntimeError("BatchedReportWriter is closed")
+            self._queue.put((row, future))
+        return future
+
+    def flush(self) -> None:
+        """
+        Block until every report submitted so far has been written (or failed).
+        Raises the writer's error if it stopped.
+        """
+        request = _FlushRequest()
+        with self._close_lock:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                return
+            self._queue.put(request)
+        request.done.result()
+
+    def close(self) -> None:
+        """Write the remaining reports and stop the writer thread. Safe to call twice."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Writer thread: gather batches from the queue and write them."""
+        batch: List[Tuple[tuple, Future]] = []
+        try:
+            with self.engine.connect() as conn:
+                deadline = None
+                while True:
+                    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        item = None  # max_delay reached
+
+                    if isinstance(item, tuple):
+                        batch.append(item)
+                        if deadline is None:
+                            deadline = time.monotonic() + self.max_delay
+                        if len(batch) < self.max_batch:
+                            continue
+
+                    if batch:
+                        self._write_batch(conn, batch)
+                        batch = []
+                    deadline = None
+
+                    if isinstance(item, _FlushRequest):
+                        item.done.set_result(None)
+                    elif item is _STOP:
+                        return
+        except Exception as e:
+            self._fail(e, batch)
+
+    def _fail(self, error: Exception, batch: List[Tuple[tuple, Future]]) -> None:
+        """Stop accepting reports and fail everything pending with error."""
+        # Not under _close_lock: a producer may hold it while blocked on a full queue
+        self._error = error
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+        # Keep draining until close(), so producers blocked on a full queue
+        # and flush() callers are released
+        while True:
+            item = self._queue.get()
+            if isinstance(item, tuple):
+                item[1].set_exception(error)
+            elif isinstance(item, _FlushRequest):
+                item.done.set_exception(error)
+            elif item is _STOP:
+                return
+
+    def _write_batch(self, conn, batch: List[Tuple[tuple, Future]]) -> None:
+        """Insert one batch in a transaction and resolve its futures."""
+        with span("src.db.batch_writer.BatchedReportWriter.write_batch", rows=len(batch)):
+            rows = [row for row, _ in batch]
+            try:
+                snos = _insert_rows(conn, rows)
+                record_changes(conn, [_row_key(row) for row in rows], revised=False)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+            else:
+                for (_, future), sno in zip(batch, snos):
+                    future.set_result(sno)
+                return
+
+            # Some record is bad: retry one by one. A failed INSERT only undoes
+            # itself in SQLite, so the good rows still share one commit.
+            outcomes = []
+            try:
+                for row in rows:
+                    try:
+                        outcomes.append(_insert_rows(conn, [row])[0])
+                    except Exception as e:
+                        outcomes.append(e)
+                written = [row for row, outcome in zip(rows, outcomes) if not isinstance(outcome, Exception)]
+                if written:
+                    record_changes(conn, [_row_key(row) for row in written], revised=False)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+
+            for (_, future), outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
@@ -1,14 +1,21 @@
 """
 CRUD operations using SQLAlchemy ORM.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 from datetime import datetime
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
+from src.db.crud_sql import get_row_keys, get_row_keys_for_snos, report_filter_clause, report_row_key
 from src.db.models import CovidReport
+from src.db.rollups import record_changes
+from src.instrumentation import timed
 
+@timed
 def create_report(session: Session, report_dict: Dict[str, Any]) -> int:
     """
-    Create a new COVID report.
+    Create a new COVID report. The rollups and the data version are
+    updated in the same transaction.
     
     Args:
         session: Database session.
@@ -19,10 +26,32 @@ def create_report(session: Session, report_dict: Dict[str, Any]) -> int:
     """
     report = CovidReport(**report_dict)
     session.add(report)
+    session.flush()
+    record_changes(session.connection(), [report_row_key(report_dict)], revised=False)
     session.commit()
     session.refresh(report)
     return report.sno
 
+def _report_filters(
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> list:
+    """WHERE criteria shared by get_reports, iter_reports and bulk_delete."""
+    criteria = []
+    
+    if country:
+        criteria.append(CovidReport.country_region == country)
+    
+    if start_date:
+        criteria.append(CovidReport.observation_date >= start_date)
+        
+    if end_date:
+        criteria.append(CovidReport.observation_date <= end_date)
+
+    return criteria
+
+@timed
 def get_reports(
     session: Session, 
     country: Optional[str] = None, 
@@ -41,22 +70,60 @@ def get_reports(
     Returns:
         List[CovidReport]: List of matching reports.
     """
-    query = session.query(CovidReport)
-    
-    if country:
-        query = query.filter(CovidReport.country_region == country)
-    
-    if start_date:
-        query = query.filter(CovidReport.observation_date >= start_date)
-        
-    if end_date:
-        query = query.filter(CovidReport.observation_date <= end_date)
-        
-    return query.all()
+    return session.query(CovidReport).filter(*_report_filters(country, start_date, end_date)).all()
+
+# Rows fetched per round-trip by iter_reports
+DEFAULT_STREAM_BATCH_SIZE = 5_000
+
+def iter_reports(
+    session: Session,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    as_objects: bool = True
+) -> Iterator[Union[CovidReport, Row]]:
+    """
+    Stream the reports get_reports would return, batch_size rows at a time
+    (yield_per), so memory does not grow with the result.
+
+    Args:
+        session: Database session.
+        country, start_date, end_date: Same filters as get_reports.
+        batch_size: Rows fetched and, for ORM objects, built per batch.
+        as_objects: Yield CovidReport objects; with False yield lightweight
+            read-only Rows (named tuples of the columns) without the ORM
+            identity map.
+
+    Returns:
+        Iterator over the matching reports. Drop references to rows you are
+        done with; the session only holds them weakly.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    criteria = _report_filters(country, start_date, end_date)
+    if as_objects:
+        stmt = select(CovidReport).where(*criteria)
+    else:
+        stmt = select(*CovidReport.__table__.columns).where(*criteria)
+
+    def rows():
+        result = session.execute(stmt, execution_options={"yield_per": batch_size})
+        try:
+            source = result.scalars() if as_objects else result
+            for partition in source.partitions(batch_size):
+                yield from partition
+        finally:
+            result.close()
+
+    return rows()
 
+@timed
 def update_report(session: Session, sno: int, updates: Dict[str, Any]) -> bool:
     """
-    Update an existing report.
+    Update an existing report. The rollups and the data version are
+    updated in the same transaction.
     
     Args:
         session: Database session.
@@ -70,16 +137,21 @@ def update_report(session: Session, sno: int, updates: Dict[str, Any]) -> bool:
     if not report:
         return False
         
+    keys = get_row_keys_for_snos(session.connection(), [sno])
     for key, value in updates.items():
         if hasattr(report, key):
             setattr(report, key, value)
             
+    session.flush()
+    record_changes(session.connection(), keys | get_row_keys_for_snos(session.connection(), [sno]))
     session.commit()
     return True
 
+@timed
 def delete_report(session: Session, sno: int) -> bool:
     """
-    Delete a report by ID.
+    Delete a report by ID. The rollups and the data version are updated in
+    the same transaction.
     
     Args:
         session: Database session.
@@ -92,22 +164,147 @@ def delete_report(session: Session, sno: int) -> bool:
     if not report:
         return False
         
+    keys = get_row_keys_for_snos(session.connection(), [sno])
     session.delete(report)
+    session.flush()
+    record_changes(session.connection(), keys)
     session.commit()
     return True
 
-def bulk_insert(session: Session, records: List[Dict[str, Any]]) -> int:
+@timed
+def bulk_insert(session: Session, records: List[Dict[str, Any]], track_changes: bool = False) -> int:
     """
     Insert multiple records efficiently.
     
     Args:
         session: Database session.
         records: List of dictionaries containing report data.
+        track_changes: Also refresh the rollups of the written days and
+            locations and bump the data version, in the same transaction.
+            Ingests leave this off and refresh once at the end.
         
     Returns:
         int: Number of records inserted.
     """
     # Use bulk_insert_mappings for performance
     session.bulk_insert_mappings(CovidReport, records)
+    if track_changes and records:
+        record_changes(session.connection(), [report_row_key(r) for r in records], revised=False)
     session.commit()
     return len(records)
+
+# Bound names must differ from column names in UPDATE ... SET col = :col
+_SNO_PARAM = "_sno"
+
+@timed
+def bulk_update(session: Session, updates: List[Dict[str, Any]]) -> int:
+    """
+    Update many reports in one transaction.
+
+    Each dict holds a "sno" plus the fields to change for that report. Dicts
+    that change the same set of fields are sent as one executemany UPDATE.
+    The rollups of the affected days and locations are refreshed and the
+    data version bumped in the same transaction.
+
+    Args:
+        session: Database session.
+        updates: e.g. [{"sno": 1, "confirmed": 10}, {"sno": 2, "deaths": 0}].
+
+    Returns:
+        int: Number of reports updated (unknown snos are skipped).
+
+    Raises:
+        ValueError: If a dict has no "sno" or names an unknown field.
+    """
+    columns = set(CovidReport.__table__.columns.keys())
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for changes in updates:
+        if "sno" not in changes:
+            raise ValueError(f"Update is missing 'sno': {changes}")
+        fields = tuple(sorted(k for k in changes if k != "sno"))
+        unknown = set(fields) - columns
+        if unknown:
+            raise ValueError(f"Unknown report fields: {sorted(unknown)}")
+        if fields:
+            params = {k: changes[k] for k in fields}
+            params[_SNO_PARAM] = changes["sno"]
+            groups.setdefault(fields, []).append(params)
+
+    snos = {params[_SNO_PARAM] for rows in groups.values() for params in rows}
+    conn = session.connection()
+    count = 0
+    try:
+        # Keys before and after, so rows moved to another day or location
+        # are taken out of the old one's rollups too
+        keys = get_row_keys_for_snos(conn, snos)
+        for fields, params in groups.items():
+            stmt = (
+                update(CovidReport)
+                .where(CovidReport.sno == bindparam(_SNO_PARAM))
+                .values({field: bindparam(field) for field in fields})
+            )
+            count += conn.execute(stmt, params).rowcount
+        if count:
+            record_changes(conn, keys | get_row_keys_for_snos(conn, snos))
+    except Exception:
+        session.rollback()
+        raise
+
+    session.commit()
+    return count
+
+@timed
+def bulk_delete(
+    session: Session,
+    snos: Optional[Iterable[int]] = None,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> int:
+    """
+    Delete many reports in one transaction: either the given snos, or every
+    report matching a filter (same filters as get_reports). The rollups of
+    the affected days and locations are refreshed and the data version
+    bumped in the same transaction.
+
+    Args:
+        session: Database session.
+        snos: Serial numbers to delete.
+        country: Delete reports of this country/region.
+        start_date: ...observed on or after this date.
+        end_date: ...observed on or before this date.
+
+    Returns:
+        int: Number of reports deleted.
+
+    Raises:
+        ValueError: If snos are combined with a filter, or nothing is given
+            (use an explicit filter to delete everything).
+    """
+    has_filter = bool(country or start_date or end_date)
+    if snos is not None and has_filter:
+        raise ValueError("Delete either by snos or by a filter, not both")
+    if snos is None and not has_filter:
+        raise ValueError("bulk_delete needs snos or a filter")
+
+    conn = session.connection()
+    try:
+        if snos is not None:
+            params = [{_SNO_PARAM: int(sno)} for sno in snos]
+            keys = get_row_keys_for_snos(conn, (p[_SNO_PARAM] for p in params))
+            stmt = delete(CovidReport).where(CovidReport.sno == bindparam(_SNO_PARAM))
+            count = conn.execute(stmt, params).rowcount if params else 0
+        else:
+            # The SQL filter matches both stored date layouts, so it covers
+            # at least the rows the ORM criteria delete
+            keys = get_row_keys(conn, *report_filter_clause(country, start_date, end_date))
+            stmt = delete(CovidReport).where(*_report_filters(country, start_date, end_date))
+            count = conn.execute(stmt).rowcount
+        if count:
+            record_changes(conn, keys)
+    except Exception:
+        session.rollback()
+        raise
+
+    session.commit()
+    return count
@@ -1,13 +1,72 @@
 """
 CRUD operations using Raw SQL.
 """
-from typing import List, Dict, Any, Optional
-from sqlalchemy import text
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple, Union
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection
+from src.instrumentation import timed
 
+# Column order of the covid_reports table, used by the columnar loader
+REPORT_COLUMNS = [
+    "sno", "observation_date", "province_state", "country_region",
+    "last_update", "confirmed", "deaths", "recovered",
+]
+
+# Same text layout SQLAlchemy's SQLite DateTime type writes and parses
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# (observation_date, country_region, province_state) of a row as stored: what
+# a change to the row affects in the rollup tables (see rollups.record_changes)
+RowKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+def format_datetime_bound(value: Any, upper: bool = False) -> str:
+    """
+    Format a date filter bound for comparison against stored datetime text.
+
+    Every write path stores 'YYYY-MM-DD HH:MM:SS.ffffff', but rows written
+    with a plain sqlite3 datetime parameter by older versions (or by hand)
+    hold 'YYYY-MM-DD HH:MM:SS' until migrations.normalize_datetimes runs.
+    A whole-second lower bound is written without the fraction and an upper
+    bound with it, so both layouts of the boundary instant are included.
+    """
+    ts = pd.Timestamp(value)
+    if upper or ts.microsecond:
+        return ts.strftime(SQLITE_DATETIME_FORMAT)
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
+
+def report_filter_clause(
+    country: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the WHERE clause and parameters matching analysis.filter_data."""
+    clause = "WHERE 1=1"
+    params = {}
+
+    if country:
+        clause += " AND country_region = :country"
+        params["country"] = country
+
+    if start_date:
+        clause += " AND observation_date >= :start_date"
+        params["start_date"] = format_datetime_bound(start_date)
+
+    if end_date:
+        clause += " AND observation_date <= :end_date"
+        params["end_date"] = format_datetime_bound(end_date, upper=True)
+
+    return clause, params
+
+@timed
 def create_report_sql(conn: Connection, report: Dict[str, Any]) -> None:
     """
-    Create a new report using raw SQL INSERT.
+    Create a new report using raw SQL INSERT. The rollups and the data
+    version are updated in the same transaction.
     """
     sql = text("""
         INSERT INTO covid_reports (
@@ -18,18 +77,17 @@ def create_report_sql(conn: Connection, report: Dict[str, Any]) -> None:
             :last_update, :confirmed, :deaths, :recovered
         )
     """)
-    conn.execute(sql, report)
+    # Dates are stored in the same text layout as every other write path
+    conn.execute(sql, {key: _value_to_sql(value) for key, value in report.items()})
+    _record_changes(conn, [report_row_key(report)], revised=False)
     conn.commit()
 
-def get_reports_sql(
-    conn: Connection, 
-    country: Optional[str] = None, 
-    start_date: Optional[str] = None, 
+def _reports_query(
+    country: Optional[str] = None,
+    start_date: Optional[str] = None,
     end_date: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """
-    Retrieve reports using raw SQL SELECT with dynamic filtering.
-    """
+) -> Tuple[str, Dict[str, Any]]:
+    """SELECT over covid_reports with the optional filters of get_reports_sql."""
     query_str = "SELECT * FROM covid_reports WHERE 1=1"
     params = {}
     
@@ -44,13 +102,400 @@ def get_reports_sql(
     if end_date:
         query_str += " AND observation_date <= :end_date"
         params["end_date"] = end_date
-        
+
+    return query_str, params
+
+@timed
+def get_reports_sql(
+    conn: Connection, 
+    country: Optional[str] = None, 
+    start_date: Optional[str] = None, 
+    end_date: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve reports using raw SQL SELECT with dynamic filtering.
+    """
+    query_str, params = _reports_query(country, start_date, end_date)
     result = conn.execute(text(query_str), params)
     return [dict(row) for row in result.mappings()]
 
+# Rows fetched per round-trip by the streaming readers
+DEFAULT_STREAM_BATCH_SIZE = 5_000
+
+def iter_reports_sql(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    as_dicts: bool = True
+) -> Iterator[Union[Dict[str, Any], tuple]]:
+    """
+    Stream the reports get_reports_sql would return, batch_size rows at a time
+    (stream_results + fetchmany), so memory does not grow with the result.
+
+    Rows are dicts like get_reports_sql's, or plain tuples in REPORT_COLUMNS
+    order with as_dicts=False. The query stays open on conn until the
+    iterator is exhausted or closed.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    query_str, params = _reports_query(country, start_date, end_date)
+    query_str = query_str.replace("SELECT *", f"SELECT {', '.join(REPORT_COLUMNS)}", 1)
+
+    def rows():
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(query_str), params)
+        try:
+            source = result.mappings() if as_dicts else result
+            while True:
+                batch = source.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield dict(row) if as_dicts else tuple(row)
+        finally:
+            result.close()
+
+    return rows()
+
+# Column dtypes produced by get_reports_frame, matching cleaning.convert_types
+REPORT_DTYPES = {
+    "sno": "Int64",
+    "observation_date": "datetime64",
+    "province_state": object,
+    "country_region": object,
+    "last_update": "datetime64",
+    "confirmed": "Int64",
+    "deaths": "Int64",
+    "recovered": "Int64",
+}
+
+def _to_typed_series(values: tuple, dtype: Any) -> pd.Series:
+    """Convert one fetched column batch to a typed Series (None -> NA/NaT)."""
+    if dtype == "datetime64":
+        # Stored text is either 'YYYY-MM-DD HH:MM:SS.ffffff' or 'YYYY-MM-DD HH:MM:SS'
+        return pd.Series(pd.to_datetime(pd.Series(values, dtype=object), format="ISO8601"))
+    return pd.Series(pd.array(values, dtype=dtype))
+
+@timed
+def get_reports_frame(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[Any] = None,
+    end_date: Optional[Any] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    """
+    Retrieve reports straight into a typed DataFrame.
+
+    Rows are fetched from the cursor batch_size at a time and each batch is
+    converted column by column (nullable Int64 counts, datetime64 dates), so
+    no per-row dicts are built and dates need no reparsing afterwards.
+    """
+    where, params = report_filter_clause(country, start_date, end_date)
+    return _read_reports_frame(conn, where, params, batch_size)
+
+def _read_reports_frame(conn: Connection, where: str, params: Dict[str, Any], batch_size: int) -> pd.DataFrame:
+    """Fetch the reports matching a WHERE (and optional ORDER BY) clause into a typed frame."""
+    result = conn.execute(text(f"SELECT {', '.join(REPORT_COLUMNS)} FROM covid_reports {where}"), params)
+    pieces = {name: [] for name in REPORT_COLUMNS}
+
+    while True:
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            break
+        for name, values in zip(REPORT_COLUMNS, zip(*rows)):
+            pieces[name].append(_to_typed_series(values, REPORT_DTYPES[name]))
+
+    if not pieces["sno"]:
+        return pd.DataFrame({name: _to_typed_series((), REPORT_DTYPES[name]) for name in REPORT_COLUMNS})
+
+    return pd.DataFrame({
+        name: pd.concat(series, ignore_index=True) for name, series in pieces.items()
+    })
+
+def iter_reports_frames(conn: Connection, batch_size: int = DEFAULT_STREAM_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream the whole table as frames of up to batch_size rows, typed like
+    get_reports_frame and in the order it returns them.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    sql = text(f"SELECT {', '.join(REPORT_COLUMNS)} FROM covid_reports")
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(sql)
+    try:
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield pd.DataFrame({
+                name: _to_typed_series(values, REPORT_DTYPES[name])
+                for name, values in zip(REPORT_COLUMNS, zip(*rows))
+            })
+    finally:
+        result.close()
+
+@timed
+def get_reports_dtype_sample(conn: Connection) -> pd.DataFrame:
+    """
+    Return a few rows, typed like get_reports_frame, that carry what
+    cleaning.compact_types looks at in the whole table: each count's and
+    date's extremes, whether it has missing values, whether a date has a
+    sub-second part, and every distinct location. compact_types picks the
+    same dtypes for this sample as for the full table, without loading it.
+    """
+    int_columns = [c for c in REPORT_COLUMNS if REPORT_DTYPES[c] == "Int64"]
+    date_columns = [c for c in REPORT_COLUMNS if REPORT_DTYPES[c] == "datetime64"]
+
+    aggregates = ["COUNT(*)"]
+    for c in int_columns + date_columns:
+        aggregates += [f"MIN({c})", f"MAX({c})", f"COUNT({c})"]
+    for c in date_columns:
+        # Any value with a non-zero fraction ('...SS.ffffff' past character 20)
+        aggregates.append(f"MAX(CASE WHEN substr({c}, 21) NOT IN ('', '000000') THEN {c} END)")
+    stats = iter(conn.execute(text(f"SELECT {', '.join(aggregates)} FROM covid_reports")).one())
+
+    n_rows = next(stats)
+    values = {}
+    for c in int_columns + date_columns:
+        low, high, present = next(stats), next(stats), next(stats)
+        values[c] = [v for v in (low, high) if v is not None] + ([None] if present < n_rows else [])
+    for c in date_columns:
+        fraction = next(stats)
+        if fraction is not None:
+            values[c].append(fraction)
+    for c in REPORT_COLUMNS:
+        if c not in values:
+            values[c] = list(conn.execute(text(f"SELECT DISTINCT {c} FROM covid_reports")).scalars())
+
+    # Pad every column to a common length with its own first value
+    length = max(len(v) for v in values.values())
+    if length == 0:
+        return pd.DataFrame({name: _to_typed_series((), REPORT_DTYPES[name]) for name in REPORT_COLUMNS})
+    return pd.DataFrame({
+        name: _to_typed_series(tuple(v + v[:1] * (length - len(v))), REPORT_DTYPES[name])
+        for name, v in values.items()
+    })[REPORT_COLUMNS]
+
+@timed
+def get_reports_changed_since(
+    conn: Connection,
+    last_sno: Optional[int],
+    last_update: Optional[Any],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    """
+    Retrieve the reports an ingest has added or revised since a frame was
+    loaded: sno above last_sno, or last_update after last_update. These are
+    the rows init_db's incremental mode writes (see init_db.rows_past_mark).
+
+    Args:
+        conn: SQLAlchemy database connection.
+        last_sno: Largest sno already held, or None.
+        last_update: Latest last_update already held, or None.
+        batch_size: Rows fetched per round-trip.
+
+    Returns:
+        pd.DataFrame: The changed rows, typed like get_reports_frame, in sno order.
+    """
+    conditions = []
+    params = {}
+    if last_sno is not None:
+        conditions.append("sno > :last_sno")
+        params["last_sno"] = int(last_sno)
+    if last_update is not None:
+        # Strictly after the latest held value, whatever its fraction
+        conditions.append("last_update > :last_update")
+        params["last_update"] = format_datetime_bound(last_update, upper=True)
+
+    where = f"WHERE {' OR '.join(conditions)}" if conditions else ""
+    return _read_reports_frame(conn, where + " ORDER BY sno", params, batch_size)
+
+@timed
+def count_reports(conn: Connection) -> int:
+    """
+    Return the number of rows in covid_reports.
+    """
+    return conn.execute(text("SELECT COUNT(*) FROM covid_reports")).scalar()
+
+@timed
+def get_row_keys(conn: Connection, where: str = "", params: Optional[Dict[str, Any]] = None) -> Set[RowKey]:
+    """
+    Return the distinct (observation_date, country_region, province_state)
+    of the reports matching a WHERE clause, as stored.
+    """
+    sql = text(f"SELECT DISTINCT observation_date, country_region, province_state FROM covid_reports {where}")
+    return {tuple(row) for row in conn.execute(sql, params or {})}
+
+def get_row_keys_for_snos(conn: Connection, snos: Iterable[int]) -> Set[RowKey]:
+    """get_row_keys for the reports with the given snos (unknown ones are skipped)."""
+    snos = [int(sno) for sno in snos]
+    sql = text(
+        "SELECT DISTINCT observation_date, country_region, province_state FROM covid_reports WHERE sno IN :snos"
+    ).bindparams(bindparam("snos", expanding=True))
+    keys = set()
+    # Stay well below SQLite's bound-parameter limit
+    for start in range(0, len(snos), 10_000):
+        keys.update(tuple(row) for row in conn.execute(sql, {"snos": snos[start:start + 10_000]}))
+    return keys
+
+def report_row_key(report: Dict[str, Any]) -> RowKey:
+    """The RowKey a report dict will be stored under (missing fields are NULL)."""
+    return tuple(_value_to_sql(report.get(c)) for c in ("observation_date", "country_region", "province_state"))
+
+def _record_changes(conn: Connection, keys: Iterable[RowKey], revised: bool = True) -> None:
+    """
+    Refresh the rollups for the rows a write touched and bump the data
+    version, in the write's own transaction (see rollups.record_changes).
+    """
+    # rollups builds on this module, so it is imported once both are loaded
+    from src.db.rollups import record_changes
+    record_changes(conn, keys, revised)
+
+# Columns the raw data viewer can sort by. observation_date and sno are
+# index-backed; the others are sorted per page (still independent of depth).
+SORTABLE_COLUMNS = [
+    "observation_date", "sno", "country_region", "province_state",
+    "last_update", "confirmed", "deaths", "recovered",
+]
+DEFAULT_PAGE_SIZE = 100
+
+def _keyset_clause(sort_by: str, descending: bool, after: Optional[Tuple[Any, int]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Condition selecting the rows after a (sort value, sno) cursor in
+    ORDER BY sort_by, sno (both ASC or both DESC). SQLite sorts NULLs
+    first ascending and last descending, and row-value comparisons with
+    NULL are never true, so NULL sort values get their own branch.
+    """
+    if after is None:
+        return "", {}
+
+    last_value, last_sno = after
+    op = "<" if descending else ">"
+    params: Dict[str, Any] = {"last_sno": int(last_sno)}
+
+    if sort_by == "sno":
+        return f" AND sno {op} :last_sno", params
+
+    if last_value is None:
+        if descending:
+            # NULLs come last: only the remaining NULL rows are left
+            return f" AND {sort_by} IS NULL AND sno < :last_sno", params
+        return f" AND (({sort_by} IS NULL AND sno > :last_sno) OR {sort_by} IS NOT NULL)", params
+
+    params["last_value"] = last_value
+    clause = f"({sort_by} IS NOT NULL AND ({sort_by}, sno) {op} (:last_value, :last_sno))"
+    if descending:
+        clause = f"({clause} OR {sort_by} IS NULL)"
+    return f" AND {clause}", params
+
+@timed
+def get_reports_page(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    sort_by: str = "observation_date",
+    descending: bool = False,
+    after: Optional[Tuple[Any, int]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Tuple[pd.DataFrame, Optional[Tuple[Any, int]]]:
+    """
+    Fetch one page of reports using keyset pagination.
+
+    Rows are ordered by (sort_by, sno) and the page starts right after the
+    `after` cursor, so every page costs the same however deep it is (unlike
+    OFFSET, which reads and discards all earlier rows).
+
+    Args:
+        conn: SQLAlchemy database connection.
+        country, start_date, end_date: Same filters as analysis.filter_data.
+        sort_by: One of SORTABLE_COLUMNS.
+        descending: Sort descending instead of ascending.
+        after: Cursor returned with the previous page, or None for the first page.
+        page_size: Maximum number of rows per page.
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[Tuple[Any, int]]]: The page, typed like
+        get_reports_frame, and the cursor for the next page (None on the last page).
+
+    Raises:
+        ValueError: If sort_by is not sortable or page_size is not positive.
+    """
+    if sort_by not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort_by!r}. Choose from {SORTABLE_COLUMNS}")
+    if page_size <= 0:
+        raise ValueError(f"page_size must be positive, got {page_size}")
+
+    where, params = report_filter_clause(country, start_date, end_date)
+    keyset, keyset_params = _keyset_clause(sort_by, descending, after)
+    direction = "DESC" if descending else "ASC"
+    order = f"sno {direction}" if sort_by == "sno" else f"{sort_by} {direction}, sno {direction}"
+
+    # One extra row tells whether there is a next page
+    sql = text(f"""
+        SELECT {', '.join(REPORT_COLUMNS)} FROM covid_reports
+        {where}{keyset}
+        ORDER BY {order}
+        LIMIT :limit
+    """)
+    rows = conn.execute(sql, {**params, **keyset_params, "limit": page_size + 1}).all()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    columns = list(zip(*rows)) if rows else [()] * len(REPORT_COLUMNS)
+    page = pd.DataFrame({
+        name: _to_typed_series(values, REPORT_DTYPES[name]) for name, values in zip(REPORT_COLUMNS, columns)
+    })
+
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = (last[REPORT_COLUMNS.index(sort_by)], last[0])
+    return page, next_cursor
+
+@timed
+def estimate_reports_count(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cap: int = 100_000
+) -> Tuple[int, bool]:
+    """
+    Cheap row count for the raw data viewer.
+
+    Without filters the table size comes from the planner statistics written
+    by ANALYZE (sampled, so approximate). With filters the matching rows are
+    counted through the indexes, stopping at `cap`.
+
+    Returns:
+        Tuple[int, bool]: The count and whether it is exact. An inexact count
+        is either a statistics estimate or a lower bound of `cap`.
+    """
+    if not (country or start_date or end_date):
+        has_stats = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )).scalar()
+        # The first number of every sqlite_stat1 row is the table's row count
+        stat = conn.execute(text(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = 'covid_reports' LIMIT 1"
+        )).scalar() if has_stats else None
+        if stat:
+            return int(stat.split()[0]), False
+
+    where, params = report_filter_clause(country, start_date, end_date)
+    sql = text(f"SELECT COUNT(*) FROM (SELECT 1 FROM covid_reports {where} LIMIT :cap)")
+    count = conn.execute(sql, {**params, "cap": cap}).scalar()
+    return count, count < cap
+
+@timed
 def update_report_sql(conn: Connection, sno: int, updates: Dict[str, Any]) -> bool:
     """
-    Update a report using raw SQL UPDATE.
+    Update a report using raw SQL UPDATE. The rollups and the data version
+    are updated in the same transaction.
     """
     if not updates:
         return False
@@ -60,21 +505,456 @@ def update_report_sql(conn: Connection, sno: int, updates: Dict[str, Any]) -> bo
     
     for key, value in updates.items():
         set_clauses.append(f"{key} = :{key}")
-        params[key] = value
+        params[key] = _value_to_sql(value)
         
     query_str = f"UPDATE covid_reports SET {', '.join(set_clauses)} WHERE sno = :sno"
     
+    keys = get_row_keys_for_snos(conn, [sno])
     result = conn.execute(text(query_str), params)
+    if result.rowcount:
+        _record_changes(conn, keys | get_row_keys_for_snos(conn, [sno]))
     conn.commit()
     
     return result.rowcount > 0
 
+def _value_to_sql(value: Any) -> Any:
+    """Convert one Python/pandas value the way _column_to_sql_values converts a column."""
+    if value is None or (not isinstance(value, (str, bytes)) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value.strftime(SQLITE_DATETIME_FORMAT)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+@timed
+def bulk_update_sql(
+    conn: Connection,
+    updates: Union[List[Dict[str, Any]], pd.DataFrame],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Update many reports in one transaction with executemany UPDATEs. The
+    rollups of the affected days and locations are refreshed and the data
+    version bumped in the same transaction.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        updates: Either a list of dicts, each a "sno" plus the fields to change
+            (dicts changing the same fields are batched together), or a
+            DataFrame with a "sno" column whose other columns are written to
+            every listed report (missing values become NULL).
+        batch_size: Number of rows sent per executemany call.
+
+    Returns:
+        int: Number of reports updated (unknown snos are skipped).
+
+    Raises:
+        ValueError: If batch_size is not positive, "sno" is missing or a field is unknown.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    groups: Dict[Tuple[str, ...], List[tuple]] = {}
+    if isinstance(updates, pd.DataFrame):
+        if "sno" not in updates.columns:
+            raise ValueError("Update frame is missing the 'sno' column")
+        fields = tuple(c for c in updates.columns if c != "sno")
+        if fields:
+            values = [_column_to_sql_values(updates[c]) for c in fields + ("sno",)]
+            groups[fields] = list(zip(*values))
+    else:
+        for changes in updates:
+            if "sno" not in changes:
+                raise ValueError(f"Update is missing 'sno': {changes}")
+            fields = tuple(sorted(k for k in changes if k != "sno"))
+            if fields:
+                row = tuple(_value_to_sql(changes[k]) for k in fields + ("sno",))
+                groups.setdefault(fields, []).append(row)
+
+    for fields in groups:
+        unknown = [f for f in fields if f not in REPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown report fields: {unknown}")
+
+    snos = {row[-1] for rows in groups.values() for row in rows}
+    count = 0
+    try:
+        # Keys before and after, so rows moved to another day or location
+        # are taken out of the old one's rollups too
+        keys = get_row_keys_for_snos(conn, snos)
+        for fields, rows in groups.items():
+            sql = f"UPDATE covid_reports SET {', '.join(f'{f} = ?' for f in fields)} WHERE sno = ?"
+            for start in range(0, len(rows), batch_size):
+                count += conn.exec_driver_sql(sql, rows[start:start + batch_size]).rowcount
+        if count:
+            _record_changes(conn, keys | get_row_keys_for_snos(conn, snos))
+    except Exception:
+        conn.rollback()
+        raise
+
+    conn.commit()
+    return count
+
+@timed
+def bulk_delete_sql(
+    conn: Connection,
+    snos: Optional[Iterable[int]] = None,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Delete many reports in one transaction: either the given snos (executemany
+    DELETE by primary key), or every report matching a country / date range.
+    The rollups of the affected days and locations are refreshed and the
+    data version bumped in the same transaction.
+
+    Returns:
+        int: Number of reports deleted.
+
+    Raises:
+        ValueError: If snos are combined with a filter, nothing is given
+            (use an explicit filter to delete everything) or batch_size is
+            not positive.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    has_filter = bool(country or start_date or end_date)
+    if snos is not None and has_filter:
+        raise ValueError("Delete either by snos or by a filter, not both")
+    if snos is None and not has_filter:
+        raise ValueError("bulk_delete_sql needs snos or a filter")
+
+    try:
+        if snos is not None:
+            snos = [int(sno) for sno in snos]
+            keys = get_row_keys_for_snos(conn, snos)
+            rows = [(sno,) for sno in snos]
+            count = 0
+            for start in range(0, len(rows), batch_size):
+                count += conn.exec_driver_sql(
+                    "DELETE FROM covid_reports WHERE sno = ?", rows[start:start + batch_size]
+                ).rowcount
+        else:
+            where, params = report_filter_clause(country, start_date, end_date)
+            keys = get_row_keys(conn, where, params)
+            count = conn.execute(text(f"DELETE FROM covid_reports {where}"), params).rowcount
+        if count:
+            _record_changes(conn, keys)
+    except Exception:
+        conn.rollback()
+        raise
+
+    conn.commit()
+    return count
+
+@timed
 def delete_report_sql(conn: Connection, sno: int) -> bool:
     """
-    Delete a report using raw SQL DELETE.
+    Delete a report using raw SQL DELETE. The rollups and the data version
+    are updated in the same transaction.
     """
     sql = text("DELETE FROM covid_reports WHERE sno = :sno")
+    keys = get_row_keys_for_snos(conn, [sno])
     result = conn.execute(sql, {"sno": sno})
+    if result.rowcount:
+        _record_changes(conn, keys)
     conn.commit()
     
     return result.rowcount > 0
+
+def _column_to_sql_values(col: pd.Series) -> List[Any]:
+    """
+    Convert one DataFrame column slice to DBAPI-ready Python values.
+    Missing values (NaN, NaT, pd.NA, None) become None so they are stored as NULL.
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        values = col.dt.strftime(SQLITE_DATETIME_FORMAT).to_numpy(dtype=object)
+    elif pd.api.types.is_integer_dtype(col):
+        # Covers both numpy int64 and nullable Int64; astype(object) yields Python ints
+        values = col.to_numpy(dtype="int64", na_value=0).astype(object)
+    elif pd.api.types.is_float_dtype(col):
+        values = col.to_numpy(dtype="float64", na_value=float("nan")).astype(object)
+    else:
+        values = col.to_numpy(dtype=object, copy=True)
+
+    values[col.isna().to_numpy()] = None
+    return values.tolist()
+
+def _executemany_df(
+    conn: Connection,
+    df: pd.DataFrame,
+    sql_suffix: str,
+    batch_size: int,
+    table: str = "covid_reports",
+    columns: List[str] = REPORT_COLUMNS,
+    key_columns: Tuple[str, ...] = ("sno",),
+    commit: bool = True
+) -> int:
+    """
+    Send df to a table in batches of plain tuples via the DBAPI executemany.
+    sql_suffix is appended to the INSERT statement (e.g. an ON CONFLICT clause);
+    its {updates} placeholder expands to "col = excluded.col" for the non-key columns.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    columns = [c for c in columns if c in df.columns]
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if sql_suffix:
+        sql += " " + sql_suffix.format(
+            updates=", ".join(f"{c} = excluded.{c}" for c in columns if c not in key_columns)
+        )
+
+    for start in range(0, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size]
+        rows = list(zip(*(_column_to_sql_values(batch[c]) for c in columns)))
+        conn.exec_driver_sql(sql, rows)
+
+    if commit:
+        conn.commit()
+    return len(df)
+
+def _write_reports_df(conn: Connection, df: pd.DataFrame, sql_suffix: str, batch_size: int, revised: bool) -> int:
+    """
+    _executemany_df into covid_reports, refreshing the rollups and bumping
+    the data version in the same transaction. With revised, rows already
+    stored under the frame's snos are taken into account too.
+    """
+    try:
+        keys = get_row_keys_for_snos(conn, df["sno"].dropna()) if revised and "sno" in df.columns else set()
+        count = _executemany_df(conn, df, sql_suffix, batch_size, commit=False)
+        columns = [
+            _column_to_sql_values(df[c]) if c in df.columns else [None] * len(df)
+            for c in ("observation_date", "country_region", "province_state")
+        ]
+        keys.update(zip(*columns))
+        if count:
+            _record_changes(conn, keys, revised)
+    except Exception:
+        conn.rollback()
+        raise
+
+    conn.commit()
+    return count
+
+@timed
+def bulk_insert_df(
+    conn: Connection,
+    df: pd.DataFrame,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    track_changes: bool = False
+) -> int:
+    """
+    Insert a cleaned DataFrame into covid_reports column by column.
+
+    Each batch of rows is turned into plain tuples straight from the frame's
+    columns and sent with the DBAPI executemany, skipping the per-row dicts
+    of to_records and the ORM. All batches run in one transaction.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        df: Cleaned DataFrame (see cleaning.clean_covid_df).
+        batch_size: Number of rows converted and sent per executemany call.
+        track_changes: Also refresh the rollups of the written days and
+            locations and bump the data version, in the same transaction.
+            Ingests leave this off and refresh once at the end (see init_db).
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    if track_changes:
+        return _write_reports_df(conn, df, "", batch_size, revised=False)
+    return _executemany_df(conn, df, "", batch_size)
+
+@timed
+def upsert_df(
+    conn: Connection,
+    df: pd.DataFrame,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    track_changes: bool = False
+) -> int:
+    """
+    Insert or update a cleaned DataFrame in covid_reports, keyed on sno.
+
+    Uses INSERT ... ON CONFLICT(sno) DO UPDATE, so existing rows are
+    overwritten with the new values and re-running the same data is a no-op.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        df: Cleaned DataFrame (see cleaning.clean_covid_df).
+        batch_size: Number of rows converted and sent per executemany call.
+        track_changes: As for bulk_insert_df.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    suffix = "ON CONFLICT(sno) DO UPDATE SET {updates}"
+    if track_changes:
+        return _write_reports_df(conn, df, suffix, batch_size, revised=True)
+    return _executemany_df(conn, df, suffix, batch_size)
+
+@timed
+def get_high_water_mark(conn: Connection, source: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the last ingested sno and last_update recorded for a source,
+    e.g. {"last_sno": 39347, "last_update": Timestamp(...)}, or None if the
+    source has never been ingested.
+    """
+    sql = text("SELECT last_sno, last_update FROM ingest_state WHERE source = :source")
+    row = conn.execute(sql, {"source": source}).mappings().first()
+    if row is None:
+        return None
+
+    last_update = pd.Timestamp(row["last_update"]) if row["last_update"] else None
+    return {"last_sno": row["last_sno"], "last_update": last_update}
+
+@timed
+def set_high_water_mark(
+    conn: Connection,
+    source: str,
+    last_sno: Optional[int],
+    last_update: Optional[datetime]
+) -> None:
+    """
+    Record the last ingested sno and last_update for a source.
+    """
+    if last_update is not None and not pd.isna(last_update):
+        last_update = last_update.strftime(SQLITE_DATETIME_FORMAT)
+    else:
+        last_update = None
+
+    sql = text("""
+        INSERT INTO ingest_state (source, last_sno, last_update, updated_at)
+        VALUES (:source, :last_sno, :last_update, :updated_at)
+        ON CONFLICT(source) DO UPDATE SET
+            last_sno = excluded.last_sno,
+            last_update = excluded.last_update,
+            updated_at = excluded.updated_at
+    """)
+    conn.execute(sql, {
+        "source": source,
+        "last_sno": None if last_sno is None else int(last_sno),
+        "last_update": last_update,
+        "updated_at": datetime.now().strftime(SQLITE_DATETIME_FORMAT),
+    })
+    conn.commit()
+
+@timed
+def get_dataset_version(conn: Connection) -> Optional[str]:
+    """
+    Return the current data version stamp, or None if nothing has been ingested.
+    """
+    sql = text("SELECT value FROM dataset_metadata WHERE key = 'data_version'")
+    return conn.execute(sql).scalar()
+
+@timed
+def get_revised_version(conn: Connection) -> Optional[str]:
+    """
+    Return the data version of the last write that changed or deleted
+    existing reports (rather than adding new ones), or None if there was none.
+    """
+    sql = text("SELECT value FROM dataset_metadata WHERE key = 'revised_version'")
+    return conn.execute(sql).scalar()
+
+@timed
+def bump_dataset_version(conn: Connection, commit: bool = True, revised: bool = False) -> str:
+    """
+    Increment the data version stamp after the data changed, and return it.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        commit: Commit the new stamp. With False it is written in the
+            caller's open transaction.
+        revised: The write changed or deleted existing reports without
+            moving their last_update, so frames loaded earlier cannot catch
+            up from the changed rows alone (see dashboard_utils.refresh_dataset).
+    """
+    current = get_dataset_version(conn)
+    version = str(int(current) + 1) if current else "1"
+    sql = text("""
+        INSERT INTO dataset_metadata (key, value) VALUES (:key, :version)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    """)
+    conn.execute(sql, {"key": "data_version", "version": version})
+    if revised:
+        conn.execute(sql, {"key": "revised_version", "version": version})
+    if commit:
+        conn.commit()
+    return version
+
+def _location_keys(df: pd.DataFrame) -> pd.Series:
+    """(country_region, province_state) as one string, with a missing province as ''."""
+    province = df["province_state"].astype(object).where(df["province_state"].notna(), "")
+    return df["country_region"].astype(str) + "\x1f" + province.astype(str)
+
+@timed
+def sync_locations(conn: Connection, locations: pd.DataFrame) -> np.ndarray:
+    """
+    Make sure every (country_region, province_state) in locations exists in the
+    'locations' table, updating the coordinates of known ones, and return the
+    location ids aligned with the rows of locations.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        locations: Frame with country_region, province_state, lat and long
+            (see cleaning.clean_time_series_locations).
+
+    Returns:
+        np.ndarray: int64 location ids, one per row.
+    """
+    def existing_ids() -> pd.Series:
+        # locations has no unique key, so a duplicated location resolves to its first id
+        result = conn.execute(text("""
+            SELECT MIN(id), country_region, province_state FROM locations
+            GROUP BY country_region, province_state
+        """))
+        rows = pd.DataFrame(result.fetchall(), columns=["id", "country_region", "province_state"])
+        return pd.Series(rows["id"].to_numpy(dtype=np.int64), index=_location_keys(rows))
+
+    keys = _location_keys(locations)
+    known = existing_ids()
+
+    is_new = ~keys.isin(known.index)
+    new_rows = locations[is_new.to_numpy()].drop_duplicates(subset=["country_region", "province_state"])
+    _executemany_df(
+        conn, new_rows, "", DEFAULT_BATCH_SIZE,
+        table="locations", columns=["country_region", "province_state", "lat", "long"]
+    )
+
+    updates = locations[~is_new.to_numpy()]
+    if not updates.empty:
+        ids = known.loc[keys[~is_new]].to_numpy()
+        rows = list(zip(
+            _column_to_sql_values(updates["lat"]),
+            _column_to_sql_values(updates["long"]),
+            ids.tolist()
+        ))
+        conn.exec_driver_sql("UPDATE locations SET lat = ?, long = ? WHERE id = ?", rows)
+        conn.commit()
+
+    return existing_ids().loc[keys].to_numpy()
+
+@timed
+def upsert_time_series_df(conn: Connection, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Insert or update melted time-series rows (location_id, observation_date,
+    confirmed) in time_series_confirmed, keyed on (location_id, observation_date).
+
+    Args:
+        conn: SQLAlchemy database connection.
+        df: Long-format frame (see cleaning.melt_time_series_block).
+        batch_size: Number of rows converted and sent per executemany call.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    return _executemany_df(
+        conn, df, "ON CONFLICT(location_id, observation_date) DO UPDATE SET {updates}", batch_size,
+        table="time_series_confirmed",
+        columns=["location_id", "observation_date", "confirmed"],
+        key_columns=("location_id", "observation_date")
+    )
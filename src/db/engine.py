@@ -1,20 +1,64 @@
 """
 Database engine and session management.
 """
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from src.instrumentation import instrument_engine
 
-def get_engine(db_path: str) -> Engine:
+# Named PRAGMA sets applied to every new connection (see get_engine).
+# journal_mode=WAL is persistent in the database file, so a database written
+# with "bulk-load" is already in WAL mode when "read-serving" opens it read-only.
+SQLITE_PROFILES = {
+    # Ingestion: no fsync per commit, large page cache, temp b-trees in RAM
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,  # negative = KiB, i.e. ~250 MB
+        "temp_store": "MEMORY",
+    },
+    # Dashboard reads: memory-mapped I/O on a read-only, shared-cache connection
+    "read-serving": {
+        "mmap_size": 268435456,  # 256 MB
+        "cache_size": -64000,
+        "query_only": "ON",
+    },
+}
+
+# Profiles opened through a read-only URI rather than a plain file path
+READ_ONLY_PROFILES = {"read-serving"}
+
+def _apply_pragmas(engine: Engine, pragmas: dict) -> None:
+    """Register a connect listener that runs the given PRAGMAs on every new connection."""
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def get_engine(db_path: str, profile: Optional[str] = None, pool_size: Optional[int] = None) -> Engine:
     """
     Create a SQLAlchemy engine for SQLite.
     
     Args:
         db_path: Path to the SQLite database file.
+        profile: Optional name of a performance profile from SQLITE_PROFILES
+            ("bulk-load" or "read-serving"). None keeps SQLite's defaults.
+        pool_size: Optional hard cap on open connections to a database file
+            (no overflow). None keeps SQLAlchemy's default pool.
         
     Returns:
         Engine: SQLAlchemy engine instance.
+
+    Raises:
+        ValueError: If the profile name is unknown.
     """
+    if profile is not None and profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {profile!r}. Choose from {sorted(SQLITE_PROFILES)}")
+
     # SQLite URL format: sqlite:///path/to/db
     # For relative paths, 3 slashes. For absolute, 4 slashes (on Unix) or specific handling on Windows.
     # We'll assume the user passes a valid path string, and we prepend sqlite:///
@@ -22,10 +66,24 @@ def get_engine(db_path: str) -> Engine:
     # If db_path is ":memory:", use it directly
     if db_path == ":memory:":
         url = "sqlite:///:memory:"
+    elif profile in READ_ONLY_PROFILES:
+        url = f"sqlite:///file:{Path(db_path).as_posix()}?mode=ro&cache=shared&uri=true"
     else:
         url = f"sqlite:///{db_path}"
         
-    return create_engine(url, echo=False, future=True)
+    pool_args = {}
+    if pool_size is not None and db_path != ":memory:":
+        pool_args = {"pool_size": pool_size, "max_overflow": 0}
+
+    engine = create_engine(url, echo=False, future=True, **pool_args)
+
+    if profile is not None:
+        _apply_pragmas(engine, SQLITE_PROFILES[profile])
+
+    # Statement timings for src.instrumentation (no-op unless it is enabled)
+    instrument_engine(engine)
+
+    return engine
 
 def get_session_maker(engine: Engine) -> sessionmaker:
     """
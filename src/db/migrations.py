@@ -0,0 +1,87 @@
+"""
+Schema upgrades for existing databases.
+
+Base.metadata.create_all only creates missing tables; indexes added to a
+table that already exists have to be created separately.
+"""
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from src.db.models import Base
+from src.db.rollups import ROLLUP_TABLES, refresh_rollups
+
+# Indexes from earlier schema versions that are now redundant
+OBSOLETE_INDEXES = [
+    "ix_covid_reports_country_region",  # prefix of ix_covid_reports_country_date
+    "ix_covid_reports_location_date",  # replaced by ix_covid_reports_location_latest (adds sno)
+]
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Bring a database up to the current schema.
+
+    Creates missing tables, creates any index declared on the models that the
+    database lacks and drops obsolete indexes. Dates stored without a
+    fraction are normalised (see normalize_datetimes). Rollup tables that did
+    not exist yet, or whose dates were just normalised, are filled from the
+    rows already in covid_reports.
+
+    Args:
+        engine: SQLAlchemy engine for the target database.
+
+    Returns:
+        List[str]: Names of the indexes that were created.
+    """
+    with engine.connect() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+
+    Base.metadata.create_all(engine)
+    created = []
+
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created.append(index.name)
+
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.commit()
+
+        normalized = normalize_datetimes(conn)
+        if "covid_reports" in existing_tables and (normalized or not existing_tables >= set(ROLLUP_TABLES)):
+            refresh_rollups(conn)
+
+    return created
+
+def normalize_datetimes(conn) -> int:
+    """
+    Rewrite covid_reports dates stored as 'YYYY-MM-DD HH:MM:SS' (older
+    create_report_sql/update_report_sql, which bound datetimes through the
+    sqlite3 adapter) to 'YYYY-MM-DD HH:MM:SS.ffffff' like every other row,
+    so one day never appears under two keys in GROUP BY or IN filters.
+
+    Returns:
+        int: Number of values rewritten.
+    """
+    changed = 0
+    for column in ["observation_date", "last_update"]:
+        result = conn.execute(text(
+            f"UPDATE covid_reports SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+        ))
+        changed += result.rowcount
+    conn.commit()
+    return changed
+
+def analyze(engine: Engine) -> None:
+    """
+    Refresh the query planner statistics after a load.
+    analysis_limit samples each index instead of scanning it fully.
+    """
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA analysis_limit=1000"))
+        conn.execute(text("ANALYZE"))
+        conn.commit()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Index, ForeignKey
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -25,7 +25,8 @@ class CovidReport(Base):
     
     observation_date = Column(DateTime, index=True)
     province_state = Column(String, nullable=True)
-    country_region = Column(String, index=True)
+    # Lookups by country are served by the composite indexes below
+    country_region = Column(String)
     last_update = Column(DateTime)
     
     # Counts are nullable integers
@@ -35,3 +36,146 @@ class CovidReport(Base):
 
     def __repr__(self):
         return f"<CovidReport(sno={self.sno}, country={self.country_region}, date={self.observation_date})>"
+
+# Composite indexes matched to the dashboard's access patterns. The count
+# columns are included so aggregates over these scans never touch the table.
+# Per-country date-range filters (crud_sql.get_reports_sql, crud_orm.get_reports)
+Index(
+    "ix_covid_reports_country_date",
+    CovidReport.country_region,
+    CovidReport.observation_date,
+    CovidReport.confirmed,
+    CovidReport.deaths,
+    CovidReport.recovered,
+)
+# Latest row per (country, province) location (analysis._get_latest_data and
+# analysis_sql.latest_per_location_query). sno follows the date so the window's
+# "observation_date DESC, sno ASC" order is read straight from the index.
+Index(
+    "ix_covid_reports_location_latest",
+    CovidReport.country_region,
+    CovidReport.province_state,
+    CovidReport.observation_date.desc(),
+    CovidReport.sno,
+    CovidReport.confirmed,
+    CovidReport.deaths,
+    CovidReport.recovered,
+)
+
+
+class IngestState(Base):
+    """
+    High-water mark for incremental ingestion, one row per source file.
+
+    - source: String (Primary Key), e.g. the CSV file name
+    - last_sno: Largest sno ingested so far
+    - last_update: Latest last_update ingested so far
+    - updated_at: When the mark was last written
+    """
+    __tablename__ = "ingest_state"
+
+    source = Column(String, primary_key=True)
+    last_sno = Column(Integer, nullable=True)
+    last_update = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IngestState(source={self.source}, last_sno={self.last_sno}, last_update={self.last_update})>"
+
+
+
+class DatasetMetadata(Base):
+    """
+    Key/value metadata about the loaded dataset, e.g. the 'data_version' stamp
+    bumped by every ingest and copied into the columnar snapshot.
+    """
+    __tablename__ = "dataset_metadata"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"<DatasetMetadata(key={self.key}, value={self.value})>"
+
+
+# Wide time-series exports, melted to long format (see init_db.ingest_time_series)
+
+class Location(Base):
+    """
+    Location dimension for the time-series tables: one row per
+    (country_region, province_state), with its coordinates.
+    """
+    __tablename__ = "locations"
+
+    # province_state is nullable, so the natural key cannot be the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    country_region = Column(String, index=True)
+    province_state = Column(String, nullable=True)
+    lat = Column(Float, nullable=True)
+    long = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<Location(id={self.id}, country={self.country_region}, province={self.province_state})>"
+
+class TimeSeriesConfirmed(Base):
+    """
+    Cumulative confirmed cases per location and date, from time_series_covid_19_confirmed.csv.
+    """
+    __tablename__ = "time_series_confirmed"
+
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    observation_date = Column(DateTime, primary_key=True)
+    confirmed = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<TimeSeriesConfirmed(location={self.location_id}, date={self.observation_date}, confirmed={self.confirmed})>"
+
+
+# Rollup tables, rebuilt from covid_reports at ingest time (see src/db/rollups.py)
+
+class DailyGlobalTotal(Base):
+    """
+    Global totals per observation_date (sum over every row of that date).
+    """
+    __tablename__ = "daily_global_totals"
+
+    observation_date = Column(DateTime, primary_key=True)
+    confirmed = Column(Integer, nullable=False, default=0)
+    deaths = Column(Integer, nullable=False, default=0)
+    recovered = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyGlobalTotal(date={self.observation_date}, confirmed={self.confirmed})>"
+
+class DailyCountryTotal(Base):
+    """
+    Per-country totals per observation_date (sum over the country's provinces).
+    """
+    __tablename__ = "daily_country_totals"
+
+    country_region = Column(String, primary_key=True)
+    observation_date = Column(DateTime, primary_key=True)
+    confirmed = Column(Integer, nullable=False, default=0)
+    deaths = Column(Integer, nullable=False, default=0)
+    recovered = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyCountryTotal(country={self.country_region}, date={self.observation_date}, confirmed={self.confirmed})>"
+
+class LatestLocationSnapshot(Base):
+    """
+    The most recent covid_reports row for each (country_region, province_state) location.
+    """
+    __tablename__ = "latest_location_snapshot"
+
+    # province_state is nullable, so the natural key cannot be the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    country_region = Column(String, index=True)
+    province_state = Column(String, nullable=True)
+    observation_date = Column(DateTime)
+    confirmed = Column(Integer, nullable=True)
+    deaths = Column(Integer, nullable=True)
+    recovered = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<LatestLocationSnapshot(country={self.country_region}, province={self.province_state}, date={self.observation_date})>"
@@ -0,0 +1,190 @@
+"""
+Rollup tables maintained at ingest time.
+
+The dashboard's default views (global trend, per-country trend, latest
+snapshot per location) are pre-aggregated here from covid_reports so they
+can be answered from a few thousand rows instead of the full table.
+"""
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import text, bindparam
+from sqlalchemy.engine import Connection
+from src.db.crud_sql import RowKey, bump_dataset_version, format_datetime_bound, get_row_keys_for_snos
+from src.db.analysis_sql import latest_per_location_query
+from src.instrumentation import timed
+
+ROLLUP_TABLES = ["daily_global_totals", "daily_country_totals", "latest_location_snapshot"]
+
+# pandas sums skip missing values and give 0 for an all-missing group; SUM gives NULL
+_COUNT_SUMS = """
+    COALESCE(SUM(confirmed), 0) AS confirmed,
+    COALESCE(SUM(deaths), 0) AS deaths,
+    COALESCE(SUM(recovered), 0) AS recovered
+"""
+
+def _date_clause(dates: Optional[List[str]]) -> str:
+    return " AND observation_date IN :dates" if dates is not None else ""
+
+def _execute(conn: Connection, sql: str, dates: Optional[List[str]]) -> None:
+    statement = text(sql)
+    if dates is not None:
+        statement = statement.bindparams(bindparam("dates", expanding=True))
+        conn.execute(statement, {"dates": dates})
+    else:
+        conn.execute(statement)
+
+_SNAPSHOT_COLUMNS = "country_region, province_state, observation_date, confirmed, deaths, recovered"
+
+@timed
+def refresh_rollups(
+    conn: Connection,
+    dates: Optional[Iterable[str]] = None,
+    locations: Optional[Iterable[Tuple[Optional[str], Optional[str]]]] = None,
+    commit: bool = True
+) -> None:
+    """
+    Rebuild the rollup tables from covid_reports in one transaction.
+
+    Args:
+        conn: SQLAlchemy database connection.
+        dates: Optional observation_date values (as stored, e.g.
+            '2020-01-22 00:00:00.000000') whose rows changed. Only those days are
+            recomputed in the daily tables; None recomputes every day and an
+            empty collection does nothing.
+        locations: Optional (country_region, province_state) pairs whose rows
+            changed. Only their rows of the latest-per-location snapshot are
+            rebuilt. With None the whole snapshot is rebuilt whenever
+            anything changed.
+        commit: Commit when done. With False the rollups are written in the
+            caller's open transaction.
+    """
+    if dates is not None:
+        dates = sorted(set(dates))
+    if locations is not None:
+        locations = list(set(locations))
+    if dates is not None and not dates and not locations:
+        return
+
+    if dates is None or dates:
+        _execute(conn, "DELETE FROM daily_global_totals WHERE 1=1" + _date_clause(dates), dates)
+        _execute(conn, f"""
+            INSERT INTO daily_global_totals (observation_date, confirmed, deaths, recovered)
+            SELECT observation_date, {_COUNT_SUMS}
+            FROM covid_reports
+            WHERE observation_date IS NOT NULL{_date_clause(dates)}
+            GROUP BY observation_date
+        """, dates)
+
+        _execute(conn, "DELETE FROM daily_country_totals WHERE 1=1" + _date_clause(dates), dates)
+        _execute(conn, f"""
+            INSERT INTO daily_country_totals (country_region, observation_date, confirmed, deaths, recovered)
+            SELECT country_region, observation_date, {_COUNT_SUMS}
+            FROM covid_reports
+            WHERE observation_date IS NOT NULL AND country_region IS NOT NULL{_date_clause(dates)}
+            GROUP BY country_region, observation_date
+        """, dates)
+
+    if locations is None:
+        conn.execute(text("DELETE FROM latest_location_snapshot"))
+        conn.execute(text(f"""
+            INSERT INTO latest_location_snapshot ({_SNAPSHOT_COLUMNS})
+            {latest_per_location_query()}
+        """))
+    elif locations:
+        # IS matches a NULL province like the window's partitioning does, and
+        # each location is read from ix_covid_reports_location_latest
+        location_clause = "country_region IS ? AND province_state IS ?"
+        conn.exec_driver_sql(f"DELETE FROM latest_location_snapshot WHERE {location_clause}", locations)
+        conn.exec_driver_sql(f"""
+            INSERT INTO latest_location_snapshot ({_SNAPSHOT_COLUMNS})
+            {latest_per_location_query("WHERE " + location_clause)}
+        """, locations)
+
+    if commit:
+        conn.commit()
+
+@timed
+def record_changes(conn: Connection, keys: Iterable[RowKey], revised: bool = True) -> str:
+    """
+    Bring the rollups and the data version up to date after a write, in the
+    write's own transaction (nothing is committed here).
+
+    Args:
+        conn: SQLAlchemy database connection.
+        keys: (observation_date, country_region, province_state) of every
+            written row, both before and after the write (see
+            crud_sql.get_row_keys), so days and locations a row moved away
+            from are recomputed as well.
+        revised: Existing reports were changed or deleted, not only added
+            (see crud_sql.bump_dataset_version).
+
+    Returns:
+        str: The new data version.
+    """
+    keys = set(keys)
+    dates = {date for date, _, _ in keys if date is not None}
+    locations = {(country, province) for _, country, province in keys}
+    refresh_rollups(conn, dates, locations, commit=False)
+    return bump_dataset_version(conn, commit=False, revised=revised)
+
+@timed
+def get_dates_for_snos(conn: Connection, snos: Iterable[int]) -> List[str]:
+    """
+    Return the stored observation_date values of the given rows, so days a
+    revised row is moving away from can be recomputed as well.
+    """
+    return sorted({date for date, _, _ in get_row_keys_for_snos(conn, snos) if date is not None})
+
+@timed
+def get_daily_totals(
+    conn: Connection,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Read daily totals, global or for one country, ordered by date.
+    """
+    if country:
+        query_str = "SELECT observation_date, confirmed, deaths, recovered FROM daily_country_totals WHERE country_region = :country"
+    else:
+        query_str = "SELECT observation_date, confirmed, deaths, recovered FROM daily_global_totals WHERE 1=1"
+    params = {"country": country}
+
+    if start_date:
+        query_str += " AND observation_date >= :start_date"
+        params["start_date"] = format_datetime_bound(start_date)
+
+    if end_date:
+        query_str += " AND observation_date <= :end_date"
+        params["end_date"] = format_datetime_bound(end_date, upper=True)
+
+    result = conn.execute(text(query_str + " ORDER BY observation_date"), params)
+    return [dict(row) for row in result.mappings()]
+
+@timed
+def get_latest_totals(conn: Connection) -> Dict[str, int]:
+    """
+    Sum the latest row of every location.
+    """
+    sql = text(f"SELECT {_COUNT_SUMS} FROM latest_location_snapshot")
+    confirmed, deaths, recovered = conn.execute(sql).one()
+    return {"confirmed": confirmed, "deaths": deaths, "recovered": recovered}
+
+@timed
+def get_latest_country_totals(conn: Connection, n: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Sum the latest row of every location per country, largest confirmed first.
+    """
+    query_str = f"""
+        SELECT country_region, {_COUNT_SUMS}
+        FROM latest_location_snapshot
+        WHERE country_region IS NOT NULL
+        GROUP BY country_region
+        ORDER BY confirmed DESC
+    """
+    params = {}
+    if n is not None:
+        query_str += " LIMIT :n"
+        params["n"] = n
+    return [dict(row) for row in conn.execute(text(query_str), params).mappings()]
@@ -0,0 +1,171 @@
+"""
+Lightweight instrumentation: timing spans and SQL statement timings written as
+JSON lines to logs/.
+
+Disabled by default. Enable it with configure(enabled=True) or by setting the
+DASHBOARD_INSTRUMENTATION=1 environment variable (DASHBOARD_LOG_DIR and
+DASHBOARD_SLOW_QUERY_MS override the log directory and slow-query threshold).
+While disabled, a @timed function costs one flag check per call and the SQL
+hooks return immediately.
+
+Each line is one event:
+    {"event": "span", "name": "src.cleaning.clean_covid_df", "ms": 12.3, "rows": 39347, "parent": ..., ...}
+    {"event": "query", "statement": "SELECT ...", "ms": 4.1, "rowcount": -1, "slow": false, ...}
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_LOG_DIR = Path(__file__).parent.parent / "logs"
+LOG_FILE_NAME = "instrumentation.jsonl"
+DEFAULT_SLOW_QUERY_MS = 100.0
+# Long statements (e.g. executemany INSERTs) are cut to this many characters
+MAX_STATEMENT_LENGTH = 500
+
+class _Settings:
+    enabled = False
+    log_dir = DEFAULT_LOG_DIR
+    slow_query_ms = DEFAULT_SLOW_QUERY_MS
+
+_settings = _Settings()
+_lock = threading.Lock()
+_log_file = None
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span", default=None)
+
+def configure(
+    enabled: bool = True,
+    log_dir: Optional[str] = None,
+    slow_query_ms: Optional[float] = None
+) -> None:
+    """
+    Turn instrumentation on or off and set where events go.
+
+    Args:
+        enabled: Record spans and queries.
+        log_dir: Directory for instrumentation.jsonl (default: the repo's logs/).
+        slow_query_ms: Statements at or above this many milliseconds are flagged "slow".
+    """
+    global _log_file
+    with _lock:
+        if _log_file is not None:
+            _log_file.close()
+            _log_file = None
+        _settings.enabled = enabled
+        _settings.log_dir = Path(log_dir) if log_dir is not None else DEFAULT_LOG_DIR
+        if slow_query_ms is not None:
+            _settings.slow_query_ms = float(slow_query_ms)
+
+def is_enabled() -> bool:
+    return _settings.enabled
+
+def log_path() -> Path:
+    """The file events are appended to."""
+    return _settings.log_dir / LOG_FILE_NAME
+
+def _emit(record: Dict[str, Any]) -> None:
+    """Append one event as a JSON line."""
+    global _log_file
+    record["ts"] = datetime.now().isoformat(timespec="microseconds")
+    record["thread"] = threading.current_thread().name
+    line = json.dumps(record, default=str)
+    with _lock:
+        if _log_file is None:
+            _settings.log_dir.mkdir(parents=True, exist_ok=True)
+            _log_file = open(log_path(), "a", buffering=1)
+        _log_file.write(line + "\n")
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block of code. Extra fields (and anything the block adds to the
+    yielded dict) are written with the event; nested spans record their parent.
+    """
+    if not _settings.enabled:
+        yield {}
+        return
+
+    extra = dict(fields)
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield extra
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+        record = {"event": "span", "name": name, "ms": round(elapsed_ms, 3), "parent": parent}
+        if error is not None:
+            record["error"] = error
+        record.update(extra)
+        _emit(record)
+
+def timed(func: Callable) -> Callable:
+    """
+    Decorator: record a span named after the function (module.qualname) on
+    every call, with the number of rows when the result has a length.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _settings.enabled:
+            return func(*args, **kwargs)
+        with span(name) as extra:
+            result = func(*args, **kwargs)
+            if hasattr(result, "__len__") and not isinstance(result, (str, bytes, dict)):
+                extra["rows"] = len(result)
+            return result
+
+    return wrapper
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Register cursor hooks on an engine that record each statement's latency
+    and DBAPI rowcount (-1 for SELECTs in sqlite3), flagging slow ones.
+    """
+    # The start time lives on the execution context, so a statement that
+    # fails (and never reaches after_cursor_execute) leaves nothing behind
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _settings.enabled and context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not _settings.enabled:
+            return
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            # Instrumentation was switched on mid-statement
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _emit({
+            "event": "query",
+            "statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+            "ms": round(elapsed_ms, 3),
+            "rowcount": cursor.rowcount,
+            "executemany": executemany,
+            "batch": len(parameters) if executemany else 1,
+            "slow": elapsed_ms >= _settings.slow_query_ms,
+            "span": _current_span.get(),
+        })
+
+if os.environ.get("DASHBOARD_INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on"):
+    configure(
+        enabled=True,
+        log_dir=os.environ.get("DASHBOARD_LOG_DIR"),
+        slow_query_ms=os.environ.get("DASHBOARD_SLOW_QUERY_MS"),
+    )
@@ -0,0 +1,200 @@
+"""
+Derived metrics over the cumulative counts in covid_reports: daily new cases,
+rolling means, growth factor and doubling time.
+
+Everything is computed for all series at once. Rows are sorted by
+(series, observation_date) and the per-series windows come from searches over
+one sorted (series, day) key and differences of cumulative sums, so there is
+no Python loop over locations or countries.
+
+A series is a location (country_region + province_state), a country (the
+sum of its locations) or the global total, see METRIC_LEVELS.
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional
+from src.analysis import COUNT_COLUMNS, filter_data, _location_codes
+from src.instrumentation import timed
+from src.result_cache import ResultCache
+
+DEFAULT_WINDOW = 7
+
+# Series the metrics can be computed for, and the columns that identify them
+METRIC_LEVELS = {
+    "location": ["country_region", "province_state"],
+    "country": ["country_region"],
+    "global": [],
+}
+
+# Full-dataset metrics per (data version, level, window, frame fingerprint)
+_metrics_cache = ResultCache()
+
+def _series_frame(df: pd.DataFrame, group_cols: List[str]) -> pd.DataFrame:
+    """
+    One row per (series, observation_date), sorted by series then date.
+    Duplicate reports of a location on one day keep the largest counts;
+    locations are summed into countries and the global total.
+    """
+    df = df[df["observation_date"].notna()]
+    keys = group_cols + ["observation_date"]
+    grouped = df[keys + COUNT_COLUMNS].groupby(keys, observed=True, dropna=False, sort=True)[COUNT_COLUMNS]
+    frame = grouped.max() if "province_state" in group_cols else grouped.sum(min_count=1)
+    return frame.reset_index()
+
+def _derive(codes: np.ndarray, days: np.ndarray, cumulative: Dict[str, np.ndarray], window: int) -> Dict[str, np.ndarray]:
+    """
+    Compute the metric columns for rows sorted by (series code, day), with at
+    most one row per series and day.
+
+    - new_<count>: change since the series' previous report (its first report
+      counts in full, corrections show up as negative values).
+    - new_<count>_avg: mean daily new count over the `window` calendar days
+      ending on the row's day; NaN until the series has `window` days of history.
+    - growth_factor: new_confirmed_avg over its value at the previous report.
+    - doubling_time: days for confirmed to double at the growth rate of the
+      last `window` days.
+    """
+    n = len(codes)
+    first = np.ones(n, dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    series = np.cumsum(first) - 1
+    series_start = np.flatnonzero(first)[series]
+
+    # (series, day) as one sorted integer key; the stride keeps "day - window"
+    # searches from landing on another series' rows
+    day0 = days - days.min() if n else days
+    stride = int(day0.max()) + window + 1 if n else 1
+    key = series * stride + day0
+
+    # Rows inside the window (day - window, day] and the last row at or before day - window
+    window_start = np.searchsorted(key, key - window, side="right")
+    previous = window_start - 1
+    has_previous = previous >= series_start
+    full_window = days - days[series_start] >= window - 1
+
+    out = {}
+    for name, values in cumulative.items():
+        new = np.empty(n, dtype=np.float64)
+        new[1:] = values[1:] - values[:-1]
+        new[first] = values[first]
+
+        missing = np.isnan(new)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(missing, 0.0, new))])
+        gaps = np.concatenate([[0], np.cumsum(missing)])
+        rows = np.arange(n)
+        avg = (sums[rows + 1] - sums[window_start]) / window
+        avg[~full_window | (gaps[rows + 1] - gaps[window_start] > 0)] = np.nan
+
+        out[f"new_{name}"] = new
+        out[f"new_{name}_avg"] = avg
+
+    avg = out["new_confirmed_avg"]
+    prior = np.full(n, np.nan)
+    prior[1:] = avg[:-1]
+    prior[first] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["growth_factor"] = np.where(prior > 0, avg / prior, np.nan)
+
+        confirmed = cumulative["confirmed"]
+        base = np.where(has_previous, confirmed[np.maximum(previous, 0)], np.nan)
+        elapsed = days - days[np.maximum(previous, 0)]
+        ratio = confirmed / base
+        out["doubling_time"] = np.where(
+            (base > 0) & (ratio > 1), elapsed * np.log(2) / np.log(ratio), np.nan
+        )
+    return out
+
+@timed
+def compute_metrics(df: pd.DataFrame, level: str = "location", window: int = DEFAULT_WINDOW) -> pd.DataFrame:
+    """
+    Derived metrics for every series in df.
+
+    Args:
+        df: Cleaned dataset (see cleaning.clean_covid_df or load_dataset).
+        level: "location", "country" or "global" (see METRIC_LEVELS).
+        window: Rolling window and doubling-time horizon, in days.
+
+    Returns:
+        pd.DataFrame: One row per series and observation_date, sorted by
+        series then date: the identifying columns, observation_date, the
+        cumulative counts, new_<count> and new_<count>_avg for each count,
+        growth_factor and doubling_time (derived columns are float64, NaN
+        where undefined).
+
+    Raises:
+        ValueError: If the level is unknown or the window is not positive.
+    """
+    if level not in METRIC_LEVELS:
+        raise ValueError(f"Unknown metric level: {level!r}. Choose from {sorted(METRIC_LEVELS)}")
+    if window <= 0:
+        raise ValueError(f"window must be positive, got {window}")
+
+    group_cols = [c for c in METRIC_LEVELS[level] if c in df.columns]
+    frame = _series_frame(df, group_cols)
+
+    codes = _location_codes(frame, group_cols)
+    days = frame["observation_date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    cumulative = {
+        name: frame[name].to_numpy(dtype="float64", na_value=np.nan) for name in COUNT_COLUMNS
+    }
+
+    for name, values in _derive(codes, days, cumulative, window).items():
+        frame[name] = values
+    frame.attrs = {"level": level, "window": window}
+    return frame
+
+def _cache_key(df: pd.DataFrame, level: str, window: int) -> Optional[Hashable]:
+    """
+    Key for the full-dataset metrics of df, or None if df has no data version.
+    Filtered frames inherit attrs from the frame they came from, so the row
+    count and an sno checksum make sure only the versioned frame itself hits.
+    """
+    version = df.attrs.get("data_version")
+    if version is None:
+        return None
+    checksum = int(df["sno"].sum()) if "sno" in df.columns else None
+    return (version, level, window, len(df), checksum)
+
+@timed
+def get_metrics(
+    df: pd.DataFrame,
+    country: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    level: str = "location",
+    window: int = DEFAULT_WINDOW
+) -> pd.DataFrame:
+    """
+    Derived metrics for the whole of df, filtered like filter_data.
+
+    The metrics are always computed over the full dataset, so the first days
+    of a date-filtered view still get their rolling windows. The full result
+    is cached per data version (df.attrs["data_version"], set by
+    load_dataset); frames without one are computed on every call.
+
+    Args:
+        df: Cleaned dataset, ideally as returned by load_dataset.
+        country, start_date, end_date: Same filters as analysis.filter_data.
+        level: "location", "country" or "global".
+        window: Rolling window and doubling-time horizon, in days.
+
+    Returns:
+        pd.DataFrame: The rows of compute_metrics(df, level, window) that pass
+        the filters. Treat it as read-only.
+
+    Raises:
+        ValueError: If a country filter is combined with the global level.
+    """
+    if country and level == "global":
+        raise ValueError("The global series cannot be filtered by country")
+
+    key = _cache_key(df, level, window)
+    if key is None:
+        metrics = compute_metrics(df, level, window)
+    else:
+        metrics = _metrics_cache.get_or_compute(key, lambda: compute_metrics(df, level, window))
+
+    if not (country or start_date or end_date):
+        return metrics
+    return filter_data(metrics, country, start_date, end_date)
@@ -0,0 +1,103 @@
+"""
+Bounded LRU cache for per-filter dashboard results.
+
+Entries are keyed on small hashable tuples such as
+(data_version, country, start_date, end_date), so the large DataFrame is never
+hashed. The cache evicts least recently used entries once the estimated size
+of the stored results exceeds a byte budget.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate the memory held by a cached result, in bytes.
+    DataFrames and Series use their deep memory usage; containers are summed.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a byte budget and hit/miss counters.
+    Cached values are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        A value larger than the whole budget is returned but not stored.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Compute outside the lock so other keys are not blocked
+        value = compute()
+        size = estimate_size(value)
+
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for a debug view: hits, misses, hit_rate, entries, bytes, max_bytes, evictions.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -5,11 +5,21 @@ import pytest
 import pandas as pd
 from datetime import datetime
 from src.analysis import (
+    _get_latest_data,
+    build_filter_index,
     filter_data,
     get_summary_stats,
     get_trend_over_time,
-    get_top_countries
+    get_top_countries,
+    get_summary_stats_from_rollups,
+    get_trend_over_time_from_rollups,
+    get_top_countries_from_rollups
 )
+from src.db.engine import get_engine
+from src.db.models import Base
+from src.db.crud_sql import bulk_insert_df
+from src.db.rollups import refresh_rollups
+from src.cleaning import compact_types
 
 @pytest.fixture
 def sample_df():
@@ -70,3 +80,104 @@ def test_get_top_countries(sample_df):
     assert len(top) == 1
     assert top.iloc[0]["country_region"] == "China"
     assert top.iloc[0]["confirmed"] == 150
+
+@pytest.fixture
+def rollup_connection(sample_df):
+    """Database holding sample_df with its rollup tables built."""
+    engine = get_engine(":memory:")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        df = sample_df.assign(sno=range(1, len(sample_df) + 1), province_state=None)
+        bulk_insert_df(conn, df)
+        refresh_rollups(conn)
+        yield conn
+
+def test_get_summary_stats_from_rollups_matches_pandas(sample_df, rollup_connection):
+    """Test the rollup-backed summary against the pandas version."""
+    assert get_summary_stats_from_rollups(rollup_connection) == get_summary_stats(sample_df)
+
+def test_get_trend_over_time_from_rollups_matches_pandas(sample_df, rollup_connection):
+    """Test the rollup-backed trend, with and without a country filter."""
+    trend = get_trend_over_time_from_rollups(rollup_connection)
+    expected = get_trend_over_time(sample_df)
+    assert trend["observation_date"].tolist() == expected["observation_date"].tolist()
+    assert trend["confirmed"].tolist() == expected["confirmed"].tolist()
+
+    us_trend = get_trend_over_time_from_rollups(rollup_connection, country="US", start_date=datetime(2020, 1, 2))
+    assert us_trend["confirmed"].tolist() == [70]
+
+def test_get_top_countries_from_rollups_matches_pandas(sample_df, rollup_connection):
+    """Test the rollup-backed top countries against the pandas version."""
+    top = get_top_countries_from_rollups(rollup_connection, n=2)
+    expected = get_top_countries(sample_df, n=2)
+    assert top["country_region"].tolist() == expected["country_region"].tolist()
+    assert top["confirmed"].tolist() == expected["confirmed"].tolist()
+
+def test_analysis_functions_work_on_compact_types(sample_df):
+    """Test that every analysis function gives the same answers on the compact representation."""
+    compact = compact_types(sample_df)
+
+    filtered = filter_data(compact, country="China", start_date=datetime(2020, 1, 1))
+    assert len(filtered) == 2
+    assert filter_data(compact, country="Nowhere").empty
+
+    assert get_summary_stats(compact) == get_summary_stats(sample_df)
+
+    trend = get_trend_over_time(compact)
+    assert trend["confirmed"].tolist() == get_trend_over_time(sample_df)["confirmed"].tolist()
+
+    top = get_top_countries(filter_data(compact, country="US"), n=10)
+    assert top["country_region"].tolist() == ["US"]
+    assert top["confirmed"].tolist() == [70]
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"country": "China"},
+    {"country": "Nowhere"},
+    {"start_date": datetime(2020, 1, 2)},
+    {"end_date": datetime(2020, 1, 1)},
+    {"country": "US", "start_date": datetime(2020, 1, 1), "end_date": datetime(2020, 1, 1)},
+])
+def test_filter_data_with_index_matches_mask_filtering(sample_df, filters):
+    """Test that the index returns the same rows as the boolean-mask path."""
+    # Shuffle so the index has to sort
+    df = sample_df.iloc[[3, 0, 2, 1]]
+    index = build_filter_index(df)
+
+    expected = filter_data(df, **filters)
+    result = filter_data(df, index=index, **filters)
+
+    pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+def test_filter_index_orders_rows_by_country_and_date(sample_df):
+    """Test that a country filter is a contiguous, date-ordered slice."""
+    index = build_filter_index(sample_df.iloc[::-1])
+    result = filter_data(sample_df, country="China", index=index)
+    assert result["observation_date"].is_monotonic_increasing
+    assert result["confirmed"].tolist() == [100, 150]
+
+def test_get_latest_data_one_row_per_location():
+    """Test latest-per-location with missing provinces and missing dates."""
+    df = pd.DataFrame({
+        "observation_date": [
+            datetime(2020, 1, 1), datetime(2020, 1, 3), datetime(2020, 1, 2),
+            pd.NaT, datetime(2020, 1, 1), pd.NaT,
+        ],
+        "country_region": ["China", "China", "China", "China", "US", "France"],
+        "province_state": ["Hubei", "Hubei", None, None, None, None],
+        "confirmed": [1, 3, 20, 99, 5, 7],
+    })
+
+    latest = _get_latest_data(df)
+
+    # Hubei -> Jan 3; China without province -> Jan 2 (NaT row ignored);
+    # US -> its only row; France -> only a NaT row, which is still kept
+    assert sorted(latest["confirmed"].tolist()) == [3, 5, 7, 20]
+
+def test_get_latest_data_is_shared_between_callers(sample_df):
+    """Test that the latest-per-location result is computed once per frame."""
+    first = _get_latest_data(sample_df)
+    assert _get_latest_data(sample_df) is first
+
+    # A different frame with the same contents gets its own result
+    assert _get_latest_data(sample_df.copy()) is not first
@@ -0,0 +1,108 @@
+"""
+Tests for the SQL pushdown analysis functions.
+Each one should return exactly what the pandas version returns for the same filters.
+"""
+import pytest
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+from src.db.engine import get_engine
+from src.db.models import Base
+from src.db.crud_sql import bulk_insert_df
+from src.data_access import load_csv
+from src.cleaning import clean_covid_df
+from src.dashboard_utils import load_data_from_db
+from src.analysis import filter_data, get_summary_stats, get_trend_over_time, get_top_countries
+from src.db.analysis_sql import get_summary_stats_sql, get_trend_over_time_sql, get_top_countries_sql
+
+DATASET_PATH = Path(__file__).parent.parent / "Dataset" / "covid_19_data.csv"
+
+FILTERS = [
+    {},
+    {"country": "US"},
+    {"start_date": datetime(2020, 1, 2)},
+    {"country": "China", "end_date": datetime(2020, 1, 1)},
+]
+
+def _sample_df():
+    return pd.DataFrame({
+        "sno": [1, 2, 3, 4, 5],
+        "observation_date": pd.to_datetime(["2020-01-01", "2020-01-01", "2020-01-02", "2020-01-02", "2020-01-02"]),
+        "province_state": ["Hubei", None, "Hubei", "Anhui", None],
+        "country_region": ["China", "US", "China", "China", "US"],
+        "confirmed": [100, 50, 150, 20, 70],
+        "deaths": [10, 5, 15, 0, 7],
+        "recovered": [50, 20, 80, 1, 30],
+    })
+
+def _connect(df):
+    engine = get_engine(":memory:")
+    Base.metadata.create_all(engine)
+    conn = engine.connect()
+    bulk_insert_df(conn, df)
+    return conn
+
+def _assert_matches_pandas(conn, df, filters):
+    filtered = filter_data(df, **filters)
+
+    assert get_summary_stats_sql(conn, **filters) == get_summary_stats(filtered)
+    pd.testing.assert_frame_equal(
+        get_trend_over_time_sql(conn, **filters),
+        get_trend_over_time(filtered),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        get_top_countries_sql(conn, 10, **filters),
+        get_top_countries(filtered, n=10).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_sql_analysis_matches_pandas(filters):
+    """Test each pushdown function against the pandas version on a small frame."""
+    df = _sample_df()
+    with _connect(df) as conn:
+        _assert_matches_pandas(conn, df, filters)
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_sql_analysis_matches_pandas_with_duplicate_location_dates(filters):
+    """Test that two rows for one location and date resolve to the same (first) row."""
+    df = pd.concat([_sample_df(), pd.DataFrame({
+        "sno": [6],
+        "observation_date": pd.to_datetime(["2020-01-02"]),
+        "province_state": ["Hubei"],
+        "country_region": ["China"],
+        "confirmed": [999],
+        "deaths": [99],
+        "recovered": [9],
+    })], ignore_index=True)
+    with _connect(df) as conn:
+        _assert_matches_pandas(conn, df, filters)
+        assert get_summary_stats_sql(conn)["total_confirmed"] == 150 + 20 + 70
+
+def test_sql_analysis_on_empty_filter_result():
+    """Test that a filter matching nothing gives zero totals and empty frames."""
+    with _connect(_sample_df()) as conn:
+        assert get_summary_stats_sql(conn, country="Nowhere") == {
+            "total_confirmed": 0, "total_deaths": 0, "total_recovered": 0
+        }
+        assert get_trend_over_time_sql(conn, country="Nowhere").empty
+        assert get_top_countries_sql(conn, country="Nowhere").empty
+
+def test_sql_analysis_matches_pandas_on_covid_dataset():
+    """Test the pushdown functions on the bundled dataset."""
+    if not DATASET_PATH.exists():
+        pytest.skip("COVID dataset not available")
+
+    with _connect(clean_covid_df(load_csv(str(DATASET_PATH)))) as conn:
+        df = load_data_from_db(conn)
+        for filters in [
+            {},
+            {"country": "US"},
+            {"start_date": datetime(2020, 3, 1), "end_date": datetime(2020, 4, 1)},
+            # Gansu and Hebei report twice on these days
+            {"end_date": datetime(2020, 3, 11)},
+            {"country": "Mainland China", "end_date": datetime(2020, 3, 12)},
+        ]:
+            _assert_matches_pandas(conn, df, filters)
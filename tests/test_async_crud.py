@@ -0,0 +1,113 @@
+"""
+Tests for the asyncio CRUD facade, against a local SQLite file.
+"""
+import asyncio
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.db.async_crud import AsyncCrud
+from src.db.crud_sql import get_dataset_version
+from src.db.rollups import get_daily_totals
+from src.db.engine import get_engine
+from src.db.models import Base
+
+
+def _report(sno, country, day, confirmed):
+    return {
+        "sno": sno, "observation_date": datetime(2020, 1, day), "province_state": None,
+        "country_region": country, "last_update": datetime(2020, 1, day, 17, 0, 0),
+        "confirmed": confirmed, "deaths": 0, "recovered": 0
+    }
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "async.db"
+    Base.metadata.create_all(get_engine(str(path)))
+    return str(path)
+
+
+def test_concurrent_reads_and_writes(db_path):
+    countries = ["China", "US", "Italy", "Spain", "France"]
+
+    async def scenario():
+        async with AsyncCrud(db_path, max_readers=3) as db:
+            # Writes are serialized on the writer thread, so these never collide
+            await asyncio.gather(*(
+                db.create_report(_report(i + 1, country, 22, 10 * (i + 1)))
+                for i, country in enumerate(countries)
+            ))
+            inserted = await db.bulk_insert([_report(10 + i, c, 23, 100 * (i + 1)) for i, c in enumerate(countries)])
+
+            # Fan out many filter queries at once
+            per_country = await asyncio.gather(*(db.get_reports(country=c) for c in countries * 4))
+            stats = await db.get_summary_stats()
+            top = await db.get_top_countries(n=2)
+            trend = await db.get_trend_over_time(country="US")
+            return inserted, per_country, stats, top, trend
+
+    inserted, per_country, stats, top, trend = asyncio.run(scenario())
+
+    assert inserted == 5
+    assert all(len(rows) == 2 for rows in per_country)
+    assert stats["total_confirmed"] == 1500
+    assert top["country_region"].tolist() == ["France", "Spain"]
+    assert trend["confirmed"].tolist() == [20, 200]
+
+
+def test_calls_do_not_block_the_event_loop(db_path):
+    async def scenario():
+        async with AsyncCrud(db_path) as db:
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            frame = await db.get_reports_frame()
+            task.cancel()
+            return ticks, frame
+
+    # The loop kept running other tasks while the query was on a worker thread
+    ticks, frame = asyncio.run(scenario())
+    assert ticks > 0
+    assert frame.empty
+
+
+def test_update_delete_and_invalid_pool(db_path):
+    async def scenario():
+        async with AsyncCrud(db_path) as db:
+            await db.create_report(_report(1, "China", 22, 10))
+            updated = await db.update_report(1, {"confirmed": 11})
+            assert await db.bulk_update([{"sno": 1, "confirmed": 12}]) == 1
+            assert await db.bulk_delete(country="Nowhere") == 0
+            missing = await db.update_report(99, {"confirmed": 1})
+            deleted = await db.delete_report(1)
+            remaining = await db.get_reports()
+            return updated, missing, deleted, remaining
+
+    assert asyncio.run(scenario()) == (True, False, True, [])
+
+    with pytest.raises(ValueError):
+        AsyncCrud(db_path, max_readers=0)
+
+def test_writes_keep_rollups_and_data_version_current(db_path):
+    async def scenario():
+        async with AsyncCrud(db_path) as db:
+            versions = []
+            await db.bulk_insert([_report(1, "China", 22, 10)])
+            versions.append(await db._read(get_dataset_version))
+            await db.bulk_insert_df(pd.DataFrame([_report(2, "US", 22, 5)]))
+            versions.append(await db._read(get_dataset_version))
+            await db.upsert_df(pd.DataFrame([_report(2, "US", 23, 7)]))
+            versions.append(await db._read(get_dataset_version))
+            return versions, await db._read(get_daily_totals)
+
+    versions, totals = asyncio.run(scenario())
+    assert versions == ["1", "2", "3"]
+    # The upsert moved sno 2 to the 23rd: both days were recomputed
+    assert [(t["observation_date"][:10], t["confirmed"]) for t in totals] == [("2020-01-22", 10), ("2020-01-23", 7)]
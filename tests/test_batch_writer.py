@@ -0,0 +1,140 @@
+"""
+Tests for the write-behind report writer, against a local SQLite file.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.db.batch_writer import BatchedReportWriter
+from src.db.crud_sql import get_reports_sql, get_dataset_version
+from src.db.rollups import get_daily_totals, get_latest_totals
+from src.db.engine import get_engine
+from src.db.models import Base
+
+
+def _report(sno, country="China", confirmed=1):
+    return {
+        "sno": sno, "observation_date": datetime(2020, 1, 22), "country_region": country,
+        "last_update": datetime(2020, 1, 22, 17, 0), "confirmed": confirmed,
+    }
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = get_engine(str(tmp_path / "writer.db"))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def _snos(engine):
+    with engine.connect() as conn:
+        return sorted(r["sno"] for r in get_reports_sql(conn))
+
+def test_writes_everything_on_close_in_batches(engine):
+    with BatchedReportWriter(engine, max_batch=7, max_delay=10) as writer:
+        futures = [writer.submit(_report(sno)) for sno in range(1, 51)]
+
+    assert [f.result() for f in futures] == list(range(1, 51))
+    assert _snos(engine) == list(range(1, 51))
+
+    with engine.connect() as conn:
+        row = get_reports_sql(conn)[0]
+    assert row["observation_date"] == "2020-01-22 00:00:00.000000"
+    assert row["province_state"] is None
+
+def test_failed_records_get_their_own_error(engine):
+    with BatchedReportWriter(engine, max_batch=100, max_delay=10) as writer:
+        first = writer.submit(_report(1))
+        duplicate = writer.submit(_report(1))
+        unbindable = writer.submit({**_report(2), "deaths": [1]})
+        last = writer.submit(_report(3))
+
+    assert first.result() == 1 and last.result() == 3
+    with pytest.raises(IntegrityError):
+        duplicate.result()
+    assert unbindable.exception() is not None
+    assert _snos(engine) == [1, 3]
+
+def test_flushes_on_delay_and_on_demand(engine):
+    writer = BatchedReportWriter(engine, max_batch=1000, max_delay=0.05)
+    try:
+        future = writer.submit(_report(1))
+        assert future.result(timeout=5) == 1
+
+        writer.max_delay = 60
+        writer.submit(_report(2))
+        writer.flush()
+        assert _snos(engine) == [1, 2]
+    finally:
+        writer.close()
+    writer.close()
+
+    with pytest.raises(RuntimeError):
+        writer.submit(_report(3))
+
+def test_concurrent_producers(engine):
+    with BatchedReportWriter(engine, max_batch=64, max_pending=16) as writer:
+        def produce(offset):
+            for i in range(200):
+                writer.submit(_report(offset + i))
+
+        threads = [threading.Thread(target=produce, args=(k * 1000,)) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(_snos(engine)) == 800
+
+def test_rejects_unknown_fields_and_bad_settings(engine):
+    with pytest.raises(ValueError):
+        BatchedReportWriter(engine, max_batch=0)
+    with BatchedReportWriter(engine) as writer:
+        with pytest.raises(ValueError):
+            writer.submit({"sno": 1, "cases": 3})
+
+def test_generated_keys_rollups_and_data_version(engine):
+    with BatchedReportWriter(engine, max_batch=100, max_delay=10) as writer:
+        keyed = writer.submit(_report(10, confirmed=10))
+        generated = [writer.submit(_report(None, country="US", confirmed=2)) for _ in range(2)]
+        writer.flush()
+        late = writer.submit({**_report(None, confirmed=5), "observation_date": datetime(2020, 1, 23)})
+
+    snos = [keyed.result()] + [f.result() for f in generated] + [late.result()]
+    assert snos[0] == 10 and all(isinstance(sno, int) for sno in snos)
+    assert _snos(engine) == sorted(snos)
+
+    with engine.connect() as conn:
+        # One version per committed batch
+        assert get_dataset_version(conn) == "2"
+        assert [t["confirmed"] for t in get_daily_totals(conn)] == [14, 5]
+        assert get_latest_totals(conn)["confirmed"] == 7
+
+def test_database_error_fails_pending_reports_and_stops_the_writer(engine, monkeypatch):
+    opened = threading.Event()
+    def broken_connect():
+        opened.wait(5)
+        raise sqlite3.OperationalError("unable to open database file")
+    monkeypatch.setattr(engine, "connect", broken_connect)
+
+    writer = BatchedReportWriter(engine, max_batch=2, max_pending=2)
+    futures = [writer.submit(_report(sno)) for sno in (1, 2)]
+    # A producer blocked on the full queue is released too
+    blocked = []
+    producer = threading.Thread(target=lambda: blocked.append(writer.submit(_report(3))))
+    producer.start()
+
+    opened.set()
+    producer.join(timeout=5)
+    assert not producer.is_alive()
+    for future in futures + blocked:
+        with pytest.raises(sqlite3.OperationalError):
+            future.result(timeout=5)
+
+    with pytest.raises(RuntimeError):
+        writer.submit(_report(4))
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    writer.close()
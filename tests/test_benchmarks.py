@@ -0,0 +1,63 @@
+"""
+Tests for the benchmark tooling: the synthetic data generator and the baseline comparison.
+"""
+import pytest
+
+from benchmarks.synthetic import generate_covid_df, dataset_shape, write_covid_csv
+from benchmarks.run_benchmarks import compare_results
+from src.cleaning import clean_covid_df, REQUIRED_RAW_COLUMNS
+from src.data_access import load_csv
+
+
+def test_generator_is_deterministic_per_seed():
+    first = generate_covid_df(scale=0.1, seed=7)
+    again = generate_covid_df(scale=0.1, seed=7)
+    other = generate_covid_df(scale=0.1, seed=8)
+
+    assert first.equals(again)
+    assert not first.equals(other)
+
+def test_generator_output_cleans_like_the_real_file(tmp_path):
+    csv_path = tmp_path / "synthetic.csv"
+    n_rows = write_covid_csv(str(csv_path), scale=0.1, seed=0)
+
+    raw = load_csv(str(csv_path))
+    assert list(raw.columns) == REQUIRED_RAW_COLUMNS
+    assert len(raw) == n_rows
+
+    clean = clean_covid_df(raw)
+    n_locations, n_days = dataset_shape(0.1)
+    assert clean["sno"].tolist() == list(range(1, n_rows + 1))
+    assert clean["observation_date"].is_monotonic_increasing
+    assert clean["observation_date"].nunique() == n_days
+    assert clean.groupby(["country_region", "province_state"], dropna=False).ngroups == n_locations
+    assert clean[["observation_date", "last_update", "confirmed"]].notna().all().all()
+
+    # Counts are cumulative per location
+    per_location = clean.groupby(["country_region", "province_state"], dropna=False)["confirmed"]
+    assert (per_location.diff().dropna() >= 0).all()
+
+def test_dataset_shape_grows_rows_linearly():
+    n_locations, n_days = dataset_shape(1)
+    big_locations, big_days = dataset_shape(100)
+
+    assert big_locations == 10 * n_locations
+    assert big_days == 10 * n_days
+    with pytest.raises(ValueError):
+        dataset_shape(0)
+
+def test_compare_results_flags_only_regressions_past_threshold():
+    baseline = [
+        {"scale": 1, "name": "load_csv", "seconds": 1.0, "peak_mb": 10.0},
+        {"scale": 1, "name": "clean_covid_df", "seconds": 1.0, "peak_mb": 10.0},
+    ]
+    current = [
+        {"scale": 1, "name": "load_csv", "seconds": 1.4, "peak_mb": 10.0},        # within threshold
+        {"scale": 1, "name": "clean_covid_df", "seconds": 0.5, "peak_mb": 15.0},  # memory regression
+        {"scale": 10, "name": "load_csv", "seconds": 9.0, "peak_mb": 90.0},       # no baseline
+    ]
+
+    regressions = compare_results(current, baseline, time_threshold=1.5, memory_threshold=1.2)
+
+    assert [(r["name"], r["metric"]) for r in regressions] == [("clean_covid_df", "peak_mb")]
+    assert regressions[0]["ratio"] == 1.5
@@ -8,7 +8,14 @@ from src.cleaning import (
     handle_missing,
     to_records,
     clean_covid_df,
+    clean_covid_chunks,
+    parse_dates,
+    compact_types,
+    clean_time_series_locations,
+    parse_date_headers,
+    melt_time_series_block,
 )
+import numpy as np
 
 RAW_COLUMNS = [
     "SNo",
@@ -117,3 +124,92 @@ def test_clean_covid_df_end_to_end_schema_and_types():
     assert "country_region" in df.columns
     assert pd.api.types.is_datetime64_any_dtype(df["observation_date"])
     assert str(df["confirmed"].dtype) == "Int64"
+
+def test_clean_covid_chunks_matches_whole_frame_cleaning():
+    raw = _sample_raw_df()
+    chunks = [raw.iloc[:1], raw.iloc[1:]]
+
+    out = pd.concat(list(clean_covid_chunks(chunks)))
+    expected = clean_covid_df(raw)
+
+    assert out["sno"].tolist() == expected["sno"].tolist()
+    assert out["last_update"].tolist() == expected["last_update"].tolist()
+    assert str(out["confirmed"].dtype) == "Int64"
+
+def test_parse_dates_handles_every_export_layout():
+    values = pd.Series(["01/22/2020", "1/22/2020 17:00", "1/23/20 17:00", "2020-03-22T23:45:32", "not a date", None])
+
+    out = parse_dates(values)
+
+    assert out.iloc[:4].tolist() == [
+        pd.Timestamp("2020-01-22"),
+        pd.Timestamp("2020-01-22 17:00"),
+        pd.Timestamp("2020-01-23 17:00"),
+        pd.Timestamp("2020-03-22 23:45:32"),
+    ]
+    assert pd.isna(out.iloc[4]) and pd.isna(out.iloc[5])
+
+def test_parse_dates_keeps_index_and_name():
+    values = pd.Series(["01/22/2020", "01/23/2020"], index=[10, 3], name="observation_date")
+
+    out = parse_dates(values)
+
+    assert list(out.index) == [10, 3]
+    assert out.name == "observation_date"
+
+def test_compact_types_uses_categories_and_narrow_ints():
+    df = clean_covid_df(_sample_raw_df())
+    out = compact_types(df)
+
+    assert isinstance(out["country_region"].dtype, pd.CategoricalDtype)
+    assert isinstance(out["province_state"].dtype, pd.CategoricalDtype)
+    assert str(out["confirmed"].dtype) == "int32"
+    assert str(out["sno"].dtype) == "int32"
+    assert str(out["observation_date"].dtype) == "datetime64[s]"
+    assert out["last_update"].tolist() == df["last_update"].tolist()
+
+def test_compact_types_keeps_missing_counts_and_wide_values():
+    df = clean_covid_df(_sample_raw_df())
+    df.loc[0, "confirmed"] = pd.NA
+    df.loc[1, "deaths"] = 2**40
+    out = compact_types(df)
+
+    # Missing values need the masked Int32 array; values beyond int32 stay Int64
+    assert str(out["confirmed"].dtype) == "Int32"
+    assert pd.isna(out["confirmed"].iloc[0])
+    assert str(out["deaths"].dtype) == "Int64"
+    assert out["deaths"].iloc[1] == 2**40
+
+def test_parse_date_headers_parses_short_us_dates_and_rejects_others():
+    assert parse_date_headers(["1/22/20", "12/31/20"]).tolist() == [
+        pd.Timestamp("2020-01-22"), pd.Timestamp("2020-12-31")
+    ]
+    with pytest.raises(ValueError):
+        parse_date_headers(["1/22/20", "Lat"])
+
+def test_clean_time_series_locations_renames_and_coerces_coordinates():
+    raw = pd.DataFrame({
+        "Province/State": [None, "Hubei"],
+        "Country/Region": ["Afghanistan", "China"],
+        "Lat": ["33.0", "30.97"],
+        "Long": [65.0, None],
+    })
+    out = clean_time_series_locations(raw)
+    assert list(out.columns) == ["province_state", "country_region", "lat", "long"]
+    assert out["lat"].tolist() == [33.0, 30.97]
+    assert pd.isna(out.loc[1, "long"])
+
+def test_melt_time_series_block_matches_pandas_melt():
+    block = pd.DataFrame({"1/22/20": [0.0, 444.0], "1/23/20": [np.nan, 444.0], "1/24/20": [2.0, 549.0]})
+    out = melt_time_series_block(block, np.array([7, 9]))
+
+    expected = (
+        block.assign(location_id=[7, 9])
+        .melt(id_vars="location_id", var_name="observation_date", value_name="confirmed")
+        .assign(observation_date=lambda d: pd.to_datetime(d["observation_date"], format="%m/%d/%y"))
+        .sort_values(["location_id", "observation_date"], ignore_index=True)
+    )
+    assert out["location_id"].tolist() == expected["location_id"].tolist()
+    assert out["observation_date"].tolist() == expected["observation_date"].tolist()
+    assert str(out["confirmed"].dtype) == "Int64"
+    assert out["confirmed"].tolist() == [0, pd.NA, 2, 444, 444, 549]
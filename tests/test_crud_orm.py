@@ -3,11 +3,17 @@ Tests for ORM CRUD operations.
 """
 import pytest
 from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from src.db.engine import get_engine, get_session_maker
 from src.db.models import Base, CovidReport
-from src.db.crud_orm import create_report, get_reports, update_report, delete_report, bulk_insert
+from src.db.crud_orm import (
+    create_report, get_reports, update_report, delete_report, bulk_insert, bulk_update, bulk_delete,
+    iter_reports
+)
+from src.db.crud_sql import get_dataset_version
+from src.db.rollups import refresh_rollups, get_daily_totals
 
 @pytest.fixture
 def db_session():
@@ -99,3 +105,92 @@ def test_bulk_insert(db_session: Session):
     assert count == 2
     
     assert db_session.query(CovidReport).count() == 2
+
+def _seed(session):
+    bulk_insert(session, [
+        {"sno": i, "country_region": "A" if i <= 3 else "B", "observation_date": datetime(2020, 1, i), "confirmed": i}
+        for i in range(1, 7)
+    ])
+
+def test_bulk_update(db_session: Session):
+    """Test updating many reports, with different fields per report, in one call."""
+    _seed(db_session)
+
+    count = bulk_update(db_session, [
+        {"sno": 1, "confirmed": 100},
+        {"sno": 2, "confirmed": 200},
+        {"sno": 3, "deaths": 5, "observation_date": datetime(2020, 2, 1)},
+        {"sno": 99, "confirmed": 1},  # unknown sno is skipped
+    ])
+    assert count == 3
+
+    reports = {r.sno: r for r in get_reports(db_session)}
+    assert reports[1].confirmed == 100 and reports[2].confirmed == 200
+    assert reports[3].deaths == 5 and reports[3].observation_date == datetime(2020, 2, 1)
+    assert reports[4].confirmed == 4
+
+    with pytest.raises(ValueError):
+        bulk_update(db_session, [{"sno": 1, "not_a_column": 1}])
+
+def test_bulk_delete_by_snos_and_by_filter(db_session: Session):
+    """Test deleting by a list of snos and by country plus date range."""
+    _seed(db_session)
+
+    assert bulk_delete(db_session, snos=[1, 2, 99]) == 2
+    assert bulk_delete(db_session, country="B", start_date=datetime(2020, 1, 5)) == 2
+    assert sorted(r.sno for r in get_reports(db_session)) == [3, 4]
+
+    with pytest.raises(ValueError):
+        bulk_delete(db_session)
+    with pytest.raises(ValueError):
+        bulk_delete(db_session, snos=[3], country="A")
+
+def test_bulk_writes_refresh_rollups_and_data_version(db_session: Session):
+    """Test that bulk updates and deletes keep the rollups and data version current."""
+    _seed(db_session)
+    refresh_rollups(db_session.connection(), commit=False)
+    db_session.commit()
+    versions = [get_dataset_version(db_session.connection())]
+
+    bulk_update(db_session, [{"sno": 3, "observation_date": datetime(2020, 1, 2), "confirmed": 30}])
+    bulk_delete(db_session, country="B", start_date=datetime(2020, 1, 5))
+    conn = db_session.connection()
+    versions.append(get_dataset_version(conn))
+
+    assert [t["confirmed"] for t in get_daily_totals(conn, country="A")] == [1, 32]
+    assert [t["confirmed"] for t in get_daily_totals(conn, country="B")] == [4]
+    snapshot = "SELECT country_region, observation_date, confirmed FROM latest_location_snapshot ORDER BY 1"
+    incremental = conn.execute(text(snapshot)).all()
+    refresh_rollups(conn, commit=False)
+    assert conn.execute(text(snapshot)).all() == incremental
+    assert versions[1] != versions[0]
+
+def test_single_writes_refresh_rollups_and_data_version(db_session: Session):
+    """Test that create, update and delete each keep the rollups and data version current."""
+    versions = []
+    create_report(db_session, {"sno": 1, "country_region": "A", "observation_date": datetime(2020, 1, 1), "confirmed": 1})
+    versions.append(get_dataset_version(db_session.connection()))
+    update_report(db_session, 1, {"observation_date": datetime(2020, 1, 2), "confirmed": 2})
+    versions.append(get_dataset_version(db_session.connection()))
+    assert [(t["observation_date"], t["confirmed"]) for t in get_daily_totals(db_session.connection())] == [
+        ("2020-01-02 00:00:00.000000", 2)
+    ]
+
+    delete_report(db_session, 1)
+    conn = db_session.connection()
+    versions.append(get_dataset_version(conn))
+    assert get_daily_totals(conn) == []
+    assert conn.execute(text("SELECT COUNT(*) FROM latest_location_snapshot")).scalar() == 0
+    assert versions == ["1", "2", "3"]
+
+def test_iter_reports_streams_objects_and_rows(db_session: Session):
+    """Test that iter_reports yields the same reports as get_reports, as objects or rows."""
+    _seed(db_session)
+
+    objects = list(iter_reports(db_session, country="A", batch_size=2))
+    assert all(isinstance(r, CovidReport) for r in objects)
+    assert [r.sno for r in objects] == [r.sno for r in get_reports(db_session, country="A")]
+
+    rows = list(iter_reports(db_session, start_date=datetime(2020, 1, 5), batch_size=1, as_objects=False))
+    assert [(r.sno, r.country_region) for r in rows] == [(5, "B"), (6, "B")]
+    assert not isinstance(rows[0], CovidReport)
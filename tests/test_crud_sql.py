@@ -2,12 +2,20 @@
 Tests for Raw SQL CRUD operations.
 """
 import pytest
+import pandas as pd
 from datetime import datetime
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 from src.db.engine import get_engine
-from src.db.models import Base
-from src.db.crud_sql import create_report_sql, get_reports_sql, update_report_sql, delete_report_sql
+from src.db.models import Base, CovidReport
+from src.db.crud_sql import (
+    create_report_sql, get_reports_sql, update_report_sql, delete_report_sql, bulk_insert_df,
+    upsert_df, get_high_water_mark, set_high_water_mark, get_reports_frame, sync_locations,
+    bulk_update_sql, bulk_delete_sql, iter_reports_sql, get_reports_page, estimate_reports_count,
+    get_reports_changed_since, count_reports, get_dataset_version,
+)
+from src.db.rollups import refresh_rollups, get_daily_totals
 
 @pytest.fixture
 def db_connection():
@@ -89,3 +97,321 @@ def test_delete_report_sql(db_connection):
     
     result = db_connection.execute(text("SELECT * FROM covid_reports WHERE sno = 1")).first()
     assert result is None
+
+def test_bulk_insert_df_writes_nulls_and_readable_dates(db_connection):
+    """Test the columnar loader across several batches, including missing values."""
+    df = pd.DataFrame({
+        "sno": pd.array([1, 2, 3], dtype="Int64"),
+        "observation_date": pd.to_datetime(["2020-01-22", "2020-01-23", None]),
+        "province_state": ["Anhui", None, float("nan")],
+        "country_region": ["China", "US", "US"],
+        "last_update": pd.to_datetime(["2020-01-22 17:00", "2020-01-23 17:00", "2020-01-24 17:00"]),
+        "confirmed": pd.array([10, None, 3], dtype="Int64"),
+        "deaths": pd.array([0, 1, None], dtype="Int64"),
+        "recovered": pd.array([0, 1, 2], dtype="Int64"),
+    })
+
+    count = bulk_insert_df(db_connection, df, batch_size=2)
+    assert count == 3
+
+    rows = db_connection.execute(text("SELECT * FROM covid_reports ORDER BY sno")).mappings().all()
+    assert [r["sno"] for r in rows] == [1, 2, 3]
+    assert rows[1]["confirmed"] is None
+    assert rows[1]["province_state"] is None
+    assert rows[2]["province_state"] is None
+    assert rows[2]["observation_date"] is None
+    assert rows[2]["deaths"] is None
+
+    # Dates are stored in the layout the ORM DateTime type reads back
+    report = Session(bind=db_connection).get(CovidReport, 1)
+    assert report.observation_date == datetime(2020, 1, 22)
+    assert report.last_update == datetime(2020, 1, 22, 17, 0)
+
+def test_bulk_insert_df_rejects_non_positive_batch_size(db_connection):
+    """Test that a zero batch size is rejected."""
+    with pytest.raises(ValueError):
+        bulk_insert_df(db_connection, pd.DataFrame({"sno": [1]}), batch_size=0)
+
+def test_upsert_df_inserts_new_and_updates_existing_rows(db_connection):
+    """Test that upsert_df overwrites rows with a matching sno."""
+    db_connection.execute(
+        text("INSERT INTO covid_reports (sno, country_region, confirmed) VALUES (1, 'China', 10)")
+    )
+    db_connection.commit()
+
+    df = pd.DataFrame({
+        "sno": pd.array([1, 2], dtype="Int64"),
+        "country_region": ["China", "US"],
+        "confirmed": pd.array([25, 3], dtype="Int64"),
+    })
+    assert upsert_df(db_connection, df) == 2
+
+    rows = db_connection.execute(text("SELECT sno, confirmed FROM covid_reports ORDER BY sno")).all()
+    assert [tuple(r) for r in rows] == [(1, 25), (2, 3)]
+
+def test_high_water_mark_round_trip(db_connection):
+    """Test recording and reading back the ingestion high-water mark."""
+    assert get_high_water_mark(db_connection, "covid_19_data.csv") is None
+
+    set_high_water_mark(db_connection, "covid_19_data.csv", 10, datetime(2020, 3, 1, 12, 30))
+    set_high_water_mark(db_connection, "covid_19_data.csv", 12, pd.Timestamp("2020-03-02 08:00"))
+
+    mark = get_high_water_mark(db_connection, "covid_19_data.csv")
+    assert mark["last_sno"] == 12
+    assert mark["last_update"] == pd.Timestamp("2020-03-02 08:00")
+
+def test_get_reports_frame_returns_typed_columns(db_connection):
+    """Test the columnar fetch path: typed columns, NULLs as NA, and filters."""
+    db_connection.execute(
+        text("INSERT INTO covid_reports (sno, country_region, observation_date, confirmed) VALUES (:sno, :country, :date, :conf)"),
+        [
+            {"sno": 1, "country": "China", "date": "2020-01-01 00:00:00.000000", "conf": 100},
+            {"sno": 2, "country": "US", "date": "2020-01-02 00:00:00", "conf": None},
+            {"sno": 3, "country": "US", "date": "2020-01-03 00:00:00.000000", "conf": 7},
+        ]
+    )
+    db_connection.commit()
+
+    df = get_reports_frame(db_connection, batch_size=2)
+    assert len(df) == 3
+    assert pd.api.types.is_datetime64_any_dtype(df["observation_date"])
+    assert pd.api.types.is_datetime64_any_dtype(df["last_update"])
+    assert str(df["confirmed"].dtype) == "Int64"
+    assert pd.isna(df.loc[1, "confirmed"])
+    assert df.loc[1, "observation_date"] == datetime(2020, 1, 2)
+
+    filtered = get_reports_frame(db_connection, country="US", end_date=datetime(2020, 1, 2))
+    assert filtered["sno"].tolist() == [2]
+
+def test_get_reports_frame_empty_table_keeps_columns(db_connection):
+    """Test that an empty result still has the report columns and dtypes."""
+    df = get_reports_frame(db_connection)
+    assert df.empty
+    assert "country_region" in df.columns
+    assert pd.api.types.is_datetime64_any_dtype(df["observation_date"])
+
+def test_sync_locations_reuses_ids_and_updates_coordinates(db_connection):
+    locations = pd.DataFrame({
+        "province_state": [None, "Hubei"],
+        "country_region": ["Afghanistan", "China"],
+        "lat": [33.0, 30.97],
+        "long": [65.0, 112.27],
+    })
+    ids = sync_locations(db_connection, locations)
+    assert len(set(ids)) == 2
+
+    # Same locations in another order, one new, with revised coordinates
+    again = pd.DataFrame({
+        "province_state": ["Hubei", None, None],
+        "country_region": ["China", "Afghanistan", "Albania"],
+        "lat": [31.0, 33.0, 41.15],
+        "long": [112.0, 65.0, 20.17],
+    })
+    new_ids = sync_locations(db_connection, again)
+    assert new_ids[:2].tolist() == [ids[1], ids[0]]
+    assert new_ids[2] not in ids
+
+    lat = db_connection.execute(text("SELECT lat FROM locations WHERE id = :id"), {"id": int(ids[1])}).scalar()
+    assert lat == 31.0
+
+def test_sync_locations_aligns_ids_when_a_location_is_duplicated(db_connection):
+    db_connection.execute(text("""
+        INSERT INTO locations (country_region, province_state, lat, long)
+        VALUES ('China', 'Hubei', 30.9, 112.2), ('China', 'Hubei', 30.9, 112.2), ('Afghanistan', NULL, 33.0, 65.0)
+    """))
+    db_connection.commit()
+    locations = pd.DataFrame({
+        "province_state": ["Hubei", None],
+        "country_region": ["China", "Afghanistan"],
+        "lat": [31.0, 33.0],
+        "long": [112.0, 65.0],
+    })
+
+    ids = sync_locations(db_connection, locations)
+    assert ids.tolist() == [1, 3]
+
+def _seed_reports(conn):
+    bulk_insert_df(conn, pd.DataFrame({
+        "sno": range(1, 7),
+        "observation_date": pd.date_range("2020-01-01", periods=6),
+        "country_region": ["A", "A", "A", "B", "B", "B"],
+        "confirmed": pd.array(range(1, 7), dtype="Int64"),
+    }))
+
+def test_bulk_update_sql_from_dicts_and_frame(db_connection):
+    _seed_reports(db_connection)
+
+    count = bulk_update_sql(db_connection, [
+        {"sno": 1, "confirmed": 100},
+        {"sno": 2, "confirmed": None, "observation_date": datetime(2020, 2, 1)},
+        {"sno": 99, "confirmed": 1},
+    ])
+    assert count == 2
+
+    frame = pd.DataFrame({"sno": [4, 5], "confirmed": pd.array([40, None], dtype="Int64")})
+    assert bulk_update_sql(db_connection, frame, batch_size=1) == 2
+
+    rows = {r["sno"]: r for r in get_reports_sql(db_connection)}
+    assert rows[1]["confirmed"] == 100
+    assert rows[2]["confirmed"] is None
+    assert rows[2]["observation_date"] == "2020-02-01 00:00:00.000000"
+    assert rows[4]["confirmed"] == 40 and rows[5]["confirmed"] is None
+
+    with pytest.raises(ValueError):
+        bulk_update_sql(db_connection, [{"sno": 1, "confirmed = 0; --": 1}])
+
+def test_bulk_delete_sql_by_snos_and_by_filter(db_connection):
+    _seed_reports(db_connection)
+
+    assert bulk_delete_sql(db_connection, snos=[1, 2, 99], batch_size=2) == 2
+    assert bulk_delete_sql(db_connection, country="B", start_date=datetime(2020, 1, 5), end_date=datetime(2020, 1, 6)) == 2
+    assert sorted(r["sno"] for r in get_reports_sql(db_connection)) == [3, 4]
+
+    with pytest.raises(ValueError):
+        bulk_delete_sql(db_connection)
+
+def test_bulk_update_sql_rolls_back_on_error(db_connection):
+    _seed_reports(db_connection)
+
+    # The first group is applied before the second fails on a value sqlite3 cannot bind
+    with pytest.raises(Exception):
+        bulk_update_sql(db_connection, [{"sno": 1, "confirmed": 100}, {"sno": 2, "deaths": [1]}])
+
+    assert get_reports_sql(db_connection, country="A")[0]["confirmed"] == 1
+
+def _rollup_rows(conn):
+    return {
+        table: sorted(conn.execute(text(f"SELECT {columns} FROM {table}")).all(), key=repr)
+        for table, columns in [
+            ("daily_global_totals", "observation_date, confirmed"),
+            ("daily_country_totals", "country_region, observation_date, confirmed"),
+            ("latest_location_snapshot", "country_region, province_state, observation_date, confirmed"),
+        ]
+    }
+
+def _assert_rollups_current(conn):
+    incremental = _rollup_rows(conn)
+    refresh_rollups(conn)
+    assert incremental == _rollup_rows(conn)
+
+def test_bulk_writes_refresh_rollups_and_data_version(db_connection):
+    _seed_reports(db_connection)
+    refresh_rollups(db_connection)
+    versions = [get_dataset_version(db_connection)]
+
+    assert bulk_delete_sql(db_connection, snos=[1]) == 1
+    assert [t["confirmed"] for t in get_daily_totals(db_connection)] == [2, 3, 4, 5, 6]
+    _assert_rollups_current(db_connection)
+    versions.append(get_dataset_version(db_connection))
+
+    # Moves sno 2 to another day: both days are recomputed
+    bulk_update_sql(db_connection, [{"sno": 2, "observation_date": datetime(2020, 1, 3)}])
+    assert [t["confirmed"] for t in get_daily_totals(db_connection, country="A")] == [5]
+    _assert_rollups_current(db_connection)
+    versions.append(get_dataset_version(db_connection))
+
+    bulk_delete_sql(db_connection, country="B", start_date=datetime(2020, 1, 5))
+    assert [t["confirmed"] for t in get_daily_totals(db_connection, country="B")] == [4]
+    _assert_rollups_current(db_connection)
+    versions.append(get_dataset_version(db_connection))
+
+    assert len(set(versions)) == len(versions)
+
+    # Nothing matched: no new version
+    assert bulk_delete_sql(db_connection, snos=[99]) == 0
+    assert get_dataset_version(db_connection) == versions[-1]
+
+def test_failed_bulk_write_leaves_rollups_and_version(db_connection):
+    _seed_reports(db_connection)
+    refresh_rollups(db_connection)
+    before = _rollup_rows(db_connection), get_dataset_version(db_connection)
+
+    with pytest.raises(Exception):
+        bulk_update_sql(db_connection, [{"sno": 1, "confirmed": 100}, {"sno": 2, "deaths": [1]}])
+
+    assert (_rollup_rows(db_connection), get_dataset_version(db_connection)) == before
+
+def test_iter_reports_sql_streams_same_rows_as_get_reports_sql(db_connection):
+    _seed_reports(db_connection)
+
+    rows = iter_reports_sql(db_connection, country="A", batch_size=2)
+    assert not isinstance(rows, list)
+    assert list(rows) == get_reports_sql(db_connection, country="A")
+
+    tuples = list(iter_reports_sql(db_connection, start_date="2020-01-05", batch_size=1, as_dicts=False))
+    assert [t[0] for t in tuples] == [5, 6]
+    assert tuples[0][3] == "B"
+
+    with pytest.raises(ValueError):
+        iter_reports_sql(db_connection, batch_size=0)
+
+def _all_pages(conn, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page, cursor = get_reports_page(conn, after=cursor, **kwargs)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+def test_get_reports_page_walks_every_row_once(db_connection):
+    bulk_insert_df(db_connection, pd.DataFrame({
+        "sno": range(1, 8),
+        "observation_date": pd.to_datetime(["2020-01-02", "2020-01-01", "2020-01-02", "2020-01-03",
+                                            "2020-01-01", "2020-01-02", "2020-01-03"]),
+        "country_region": ["A", "B", "A", "B", "A", "B", "A"],
+        "confirmed": pd.array([5, None, 3, None, 1, 4, 2], dtype="Int64"),
+    }))
+
+    pages = _all_pages(db_connection, page_size=3)
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert pd.api.types.is_datetime64_any_dtype(pages[0]["observation_date"])
+    assert pd.concat(pages)["sno"].tolist() == [2, 5, 1, 3, 6, 4, 7]
+
+    descending = pd.concat(_all_pages(db_connection, sort_by="observation_date", descending=True, page_size=2))
+    assert descending["sno"].tolist() == [7, 4, 6, 3, 1, 5, 2]
+
+    # NULLs sort first ascending and last descending, and are not skipped
+    by_confirmed = pd.concat(_all_pages(db_connection, sort_by="confirmed", page_size=1))
+    assert by_confirmed["sno"].tolist() == [2, 4, 5, 7, 3, 6, 1]
+    by_confirmed = pd.concat(_all_pages(db_connection, sort_by="confirmed", descending=True, page_size=2))
+    assert by_confirmed["sno"].tolist() == [1, 6, 3, 7, 5, 4, 2]
+
+    filtered = pd.concat(_all_pages(db_connection, country="A", end_date=datetime(2020, 1, 2), page_size=1))
+    assert filtered["sno"].tolist() == [5, 1, 3]
+
+    with pytest.raises(ValueError):
+        get_reports_page(db_connection, sort_by="sno; DROP TABLE covid_reports")
+    with pytest.raises(ValueError):
+        get_reports_page(db_connection, page_size=0)
+
+def test_get_reports_page_empty_result_keeps_columns(db_connection):
+    page, cursor = get_reports_page(db_connection)
+    assert page.empty and cursor is None
+    assert "observation_date" in page.columns
+
+def test_estimate_reports_count(db_connection):
+    _seed_reports(db_connection)
+
+    assert estimate_reports_count(db_connection) == (6, True)
+    assert estimate_reports_count(db_connection, country="A") == (3, True)
+    assert estimate_reports_count(db_connection, country="A", cap=2) == (2, False)
+
+    # After ANALYZE the unfiltered count comes from the planner statistics
+    db_connection.execute(text("ANALYZE"))
+    count, exact = estimate_reports_count(db_connection)
+    assert count == 6 and not exact
+
+def test_get_reports_changed_since(db_connection):
+    bulk_insert_df(db_connection, pd.DataFrame({
+        "sno": [1, 2, 3, 4],
+        "observation_date": pd.date_range("2020-01-01", periods=4),
+        "country_region": ["A", "A", "B", "B"],
+        "last_update": pd.to_datetime(["2020-01-01 10:00", "2020-01-05 10:00", "2020-01-01 10:00", None]),
+    }))
+
+    changed = get_reports_changed_since(db_connection, last_sno=3, last_update=datetime(2020, 1, 1, 10))
+    assert changed["sno"].tolist() == [2, 4]
+    assert pd.api.types.is_datetime64_any_dtype(changed["last_update"])
+
+    assert get_reports_changed_since(db_connection, 4, datetime(2020, 1, 5, 10)).empty
+    assert len(get_reports_changed_since(db_connection, None, None)) == count_reports(db_connection) == 4
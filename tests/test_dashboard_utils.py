@@ -7,7 +7,11 @@ from datetime import datetime
 from src.db.engine import get_engine
 from src.db.models import Base
 from src.db.crud_sql import create_report_sql
-from src.dashboard_utils import load_data_from_db
+from src.dashboard_utils import load_data_from_db, load_dataset, refresh_dataset, DatasetCache
+from src.db.crud_sql import (
+    bump_dataset_version, update_report_sql, delete_report_sql, upsert_df, get_dataset_version
+)
+from src.data_access import write_snapshot
 
 @pytest.fixture
 def db_connection():
@@ -58,3 +62,125 @@ def test_load_data_from_db(db_connection):
     
     # Check values
     assert df[df["country_region"] == "China"]["confirmed"].iloc[0] == 10
+
+def test_load_dataset_prefers_current_snapshot(db_connection, tmp_path):
+    """Test that load_dataset uses the snapshot only when its version matches the database."""
+    create_report_sql(db_connection, {
+        "sno": 1, "observation_date": datetime(2020, 1, 22), "province_state": None,
+        "country_region": "China", "last_update": datetime(2020, 1, 22, 17, 0, 0),
+        "confirmed": 10, "deaths": 0, "recovered": 0
+    })
+    version = bump_dataset_version(db_connection)
+
+    # A snapshot whose contents differ from the DB, to tell the two sources apart
+    snapshot = pd.DataFrame({"country_region": pd.Categorical(["From snapshot"])})
+    write_snapshot(snapshot, str(tmp_path / "snap"), version)
+
+    df = load_dataset(db_connection, str(tmp_path / "snap"))
+    assert df["country_region"].tolist() == ["From snapshot"]
+    assert df.attrs["data_version"] == version
+
+    # After the data changes the snapshot is stale and the database is read instead
+    new_version = bump_dataset_version(db_connection)
+    df = load_dataset(db_connection, str(tmp_path / "snap"))
+    assert df["country_region"].tolist() == ["China"]
+    assert df.attrs["data_version"] == new_version
+    assert isinstance(df["country_region"].dtype, pd.CategoricalDtype)
+
+def _report(sno, country, confirmed, updated=datetime(2020, 1, 22, 17, 0, 0), province=None):
+    return {
+        "sno": sno, "observation_date": datetime(2020, 1, 22), "province_state": province,
+        "country_region": country, "last_update": updated,
+        "confirmed": confirmed, "deaths": 0, "recovered": 0
+    }
+
+def test_refresh_dataset_merges_only_changed_rows(db_connection):
+    """Test that refresh_dataset picks up new and revised rows and matches a full reload."""
+    for sno, country, province in [(1, "China", "Anhui"), (2, "US", None), (3, "Italy", None)]:
+        create_report_sql(db_connection, _report(sno, country, 10, province=province))
+    bump_dataset_version(db_connection)
+    df = load_dataset(db_connection)
+
+    same, how = refresh_dataset(db_connection, df)
+    assert how == "unchanged" and same is df
+
+    # An ingest revises row 2 (later last_update) and adds rows 4 and 5
+    upsert_df(db_connection, pd.DataFrame([
+        _report(2, "US", 20, datetime(2020, 1, 23, 9, 0, 0)),
+        _report(4, "Spain", 5, datetime(2020, 1, 23, 9, 0, 0)),
+        _report(5, "China", 7, datetime(2020, 1, 23, 9, 0, 0)),
+    ]))
+    version = bump_dataset_version(db_connection)
+
+    refreshed, how = refresh_dataset(db_connection, df)
+    assert how == "delta"
+    assert refreshed.attrs["data_version"] == version
+    assert df["sno"].tolist() == [1, 2, 3]  # the old frame is left alone
+
+    expected = load_dataset(db_connection)
+    pd.testing.assert_frame_equal(refreshed, expected)
+    assert refreshed.loc[refreshed["sno"] == 2, "confirmed"].item() == 20
+
+def test_refresh_dataset_merges_rows_without_a_province(db_connection):
+    """Test a delta whose rows all lack a province against a frame that has some."""
+    create_report_sql(db_connection, _report(1, "China", 10, province="Anhui"))
+    create_report_sql(db_connection, _report(2, "US", 10))
+    df = load_dataset(db_connection)
+
+    for sno, country in [(3, "Italy"), (4, "Spain")]:
+        create_report_sql(db_connection, _report(sno, country, 5, datetime(2020, 1, 23)))
+    refreshed, how = refresh_dataset(db_connection, df)
+
+    assert how == "delta"
+    pd.testing.assert_frame_equal(refreshed, load_dataset(db_connection))
+
+def test_refresh_dataset_reloads_after_deletes(db_connection):
+    """Test that rows missing from the database force a full reload."""
+    for sno in [1, 2]:
+        create_report_sql(db_connection, _report(sno, "China", 10))
+    bump_dataset_version(db_connection)
+    df = load_dataset(db_connection)
+
+    delete_report_sql(db_connection, 1)
+    bump_dataset_version(db_connection)
+    refreshed, how = refresh_dataset(db_connection, df)
+    assert how == "full"
+    assert refreshed["sno"].tolist() == [2]
+
+def test_dataset_cache_loads_once_and_refreshes(db_connection):
+    """Test that DatasetCache loads on first use and then follows the data version."""
+    create_report_sql(db_connection, _report(1, "China", 10, province="Anhui"))
+    bump_dataset_version(db_connection)
+
+    cache = DatasetCache()
+    first = cache.get(db_connection)
+    assert cache.get(db_connection) is first
+    assert cache.last_refresh["how"] == "full"
+
+    create_report_sql(db_connection, _report(2, "US", 1, datetime(2020, 1, 23)))
+    assert len(cache.get(db_connection)) == 2
+    assert cache.last_refresh == {"how": "delta", "version": get_dataset_version(db_connection), "rows": 2}
+
+def test_refresh_dataset_follows_crud_writes(db_connection):
+    """Test that single CRUD writes move the data version without an explicit bump."""
+    for sno, country, province in [(1, "China", "Anhui"), (2, "US", None)]:
+        create_report_sql(db_connection, _report(sno, country, 10, province=province))
+    df = load_dataset(db_connection)
+
+    # New rows are merged in
+    create_report_sql(db_connection, _report(3, "Italy", 5, datetime(2020, 1, 23)))
+    df, how = refresh_dataset(db_connection, df)
+    assert how == "delta" and df["sno"].tolist() == [1, 2, 3]
+
+    # An in-place edit leaves last_update alone, so only a reload can see it
+    update_report_sql(db_connection, 1, {"confirmed": 99})
+    df, how = refresh_dataset(db_connection, df)
+    assert how == "full"
+    assert df.loc[df["sno"] == 1, "confirmed"].item() == 99
+
+    # Same row count as before, different rows
+    delete_report_sql(db_connection, 2)
+    create_report_sql(db_connection, _report(4, "Spain", 1))
+    df, how = refresh_dataset(db_connection, df)
+    assert how == "full"
+    pd.testing.assert_frame_equal(df, load_dataset(db_connection))
@@ -5,7 +5,12 @@ import pytest
 import pandas as pd
 from pathlib import Path
 
-from src.data_access import load_csv
+import numpy as np
+
+from src.data_access import (
+    load_csv, iter_csv_chunks, write_snapshot, write_snapshot_batches, load_snapshot, snapshot_dir_for,
+    load_time_series_locations, iter_time_series_blocks
+)
 
 
 class TestLoadCSV:
@@ -95,3 +100,159 @@ class TestLoadCSV:
         # Assert
         assert not result.empty
         assert len(result) > 0
+
+
+class TestIterCSVChunks:
+    """Tests for the iter_csv_chunks function."""
+
+    def test_iter_csv_chunks_splits_rows(self, tmp_path):
+        """Test that chunks respect chunksize and cover every row in order."""
+        # Arrange
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text("col1,col2\n" + "".join(f"{i},{i * 2}\n" for i in range(5)))
+
+        # Act
+        chunks = list(iter_csv_chunks(str(csv_file), chunksize=2))
+
+        # Assert
+        assert [len(c) for c in chunks] == [2, 2, 1]
+        assert pd.concat(chunks)["col1"].tolist() == [0, 1, 2, 3, 4]
+
+    def test_iter_csv_chunks_missing_file_raises_error(self):
+        """Test that the missing file is reported before iteration starts."""
+        # Act & Assert
+        with pytest.raises(FileNotFoundError):
+            iter_csv_chunks("nonexistent_file.csv")
+
+    def test_iter_csv_chunks_rejects_non_positive_chunksize(self, tmp_path):
+        """Test that a zero chunksize is rejected."""
+        # Arrange
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text("col1\n1\n")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            iter_csv_chunks(str(csv_file), chunksize=0)
+
+
+class TestTimeSeriesBlocks:
+    """Tests for reading the wide time-series format."""
+
+    @staticmethod
+    def _write(tmp_path):
+        csv_file = tmp_path / "wide.csv"
+        csv_file.write_text(
+            "Province/State,Country/Region,Lat,Long,1/22/20,1/23/20,1/24/20\n"
+            ",Afghanistan,33.0,65.0,0,1,\n"
+            "Hubei,China,30.97,112.27,444,444,549\n"
+        )
+        return str(csv_file)
+
+    def test_load_time_series_locations_reads_only_location_columns(self, tmp_path):
+        """Test that only the four location columns are loaded, in file order."""
+        # Act
+        result = load_time_series_locations(self._write(tmp_path))
+
+        # Assert
+        assert list(result.columns) == ["Province/State", "Country/Region", "Lat", "Long"]
+        assert result["Country/Region"].tolist() == ["Afghanistan", "China"]
+
+    def test_iter_time_series_blocks_splits_date_columns(self, tmp_path):
+        """Test that date columns come in blocks of at most block_size, in order, as floats."""
+        # Act
+        blocks = list(iter_time_series_blocks(self._write(tmp_path), block_size=2))
+
+        # Assert
+        assert [list(b.columns) for b in blocks] == [["1/22/20", "1/23/20"], ["1/24/20"]]
+        assert all(b.dtypes.eq(np.float64).all() for b in blocks)
+        assert blocks[1]["1/24/20"].isna().tolist() == [True, False]
+
+    def test_iter_time_series_blocks_rejects_missing_location_columns(self, tmp_path):
+        """Test that a file without the location columns is rejected up front."""
+        # Arrange
+        csv_file = tmp_path / "bad.csv"
+        csv_file.write_text("Country/Region,1/22/20\nChina,1\n")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            iter_time_series_blocks(str(csv_file))
+
+
+class TestSnapshot:
+    """Tests for the memory-mapped columnar snapshot."""
+
+    @staticmethod
+    def _frame():
+        return pd.DataFrame({
+            "country_region": pd.Categorical(["China", "US", "China"]),
+            "province_state": ["Hubei", None, "Anhui"],
+            "observation_date": pd.to_datetime(["2020-01-22", "2020-01-23", None]).astype("datetime64[s]"),
+            "confirmed": pd.array([1, None, 3], dtype="Int32"),
+            "deaths": np.array([0, 1, 2], dtype="int32"),
+        })
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test that a snapshot loads back equal to the frame that was written."""
+        # Arrange
+        df = self._frame()
+        write_snapshot(df, str(tmp_path / "snap"), version="3")
+
+        # Act
+        result = load_snapshot(str(tmp_path / "snap"), expected_version="3")
+
+        # Assert
+        expected = df.assign(province_state=df["province_state"].astype("category"))
+        assert result.equals(expected)
+        assert result.dtypes.equals(expected.dtypes)
+
+    def test_snapshot_is_memory_mapped_read_only(self, tmp_path):
+        """Test that columns are backed by read-only memory maps rather than copies."""
+        # Arrange
+        write_snapshot(self._frame(), str(tmp_path / "snap"), version="1")
+
+        # Act
+        result = load_snapshot(str(tmp_path / "snap"))
+
+        # Assert
+        assert not result["deaths"].to_numpy().flags.writeable
+
+    def test_snapshot_with_other_version_is_ignored(self, tmp_path):
+        """Test that a stale or missing snapshot returns None."""
+        # Arrange
+        write_snapshot(self._frame(), str(tmp_path / "snap"), version="1")
+
+        # Act & Assert
+        assert load_snapshot(str(tmp_path / "snap"), expected_version="2") is None
+        assert load_snapshot(str(tmp_path / "missing")) is None
+
+    def test_snapshot_batches_match_whole_frame_snapshot(self, tmp_path):
+        """Test that a snapshot filled batch by batch loads like one written from the whole frame."""
+        # Arrange
+        df = self._frame().assign(province_state=lambda d: d["province_state"].astype("category"))
+        write_snapshot(df, str(tmp_path / "whole"), version="1")
+        batches = [df.iloc[:2].astype(object), df.iloc[2:].astype(object)]
+
+        # Act
+        write_snapshot_batches(batches, df.dtypes, len(df), str(tmp_path / "snap"), version="1")
+
+        # Assert
+        result = load_snapshot(str(tmp_path / "snap"), expected_version="1")
+        expected = load_snapshot(str(tmp_path / "whole"))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_snapshot_batches_must_match_row_count(self, tmp_path):
+        """Test that batches holding fewer or more rows than announced are rejected."""
+        # Arrange
+        df = self._frame()
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            write_snapshot_batches([df], df.dtypes, len(df) + 1, str(tmp_path / "snap"), version="1")
+        with pytest.raises(ValueError):
+            write_snapshot_batches([df, df], df.dtypes, len(df), str(tmp_path / "snap"), version="1")
+        assert load_snapshot(str(tmp_path / "snap")) is None
+
+    def test_snapshot_dir_for_sits_next_to_database(self):
+        """Test the snapshot location derived from the database path."""
+        # Act & Assert
+        assert snapshot_dir_for("data/covid_data.db") == Path("data/covid_data.snapshot")
@@ -4,6 +4,7 @@ Tests for database engine and session creation.
 import pytest
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from src.db.engine import get_engine, get_session_maker
@@ -47,3 +48,33 @@ def test_create_tables(tmp_path):
         # SQLite specific query to check for table existence
         result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='covid_reports'")).scalar()
         assert result == "covid_reports"
+
+def test_get_engine_bulk_load_profile_sets_pragmas(tmp_path):
+    """Test that the bulk-load profile pragmas are applied on connect."""
+    engine = get_engine(str(tmp_path / "test.db"), profile="bulk-load")
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 0
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+
+def test_get_engine_read_serving_profile_is_read_only(tmp_path):
+    """Test that the read-serving profile can read but not write."""
+    db_path = tmp_path / "test.db"
+    writer = get_engine(str(db_path), profile="bulk-load")
+    Base.metadata.create_all(bind=writer)
+    with writer.connect() as conn:
+        conn.execute(text("INSERT INTO covid_reports (sno, country_region) VALUES (1, 'China')"))
+        conn.commit()
+
+    reader = get_engine(str(db_path), profile="read-serving")
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM covid_reports")).scalar() == 1
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO covid_reports (sno, country_region) VALUES (2, 'US')"))
+
+def test_get_engine_unknown_profile_raises(tmp_path):
+    """Test that an unknown profile name is rejected."""
+    with pytest.raises(ValueError):
+        get_engine(str(tmp_path / "test.db"), profile="turbo")
@@ -56,3 +56,170 @@ def test_init_db_process(tmp_path):
         row = conn.execute(text("SELECT country_region, confirmed FROM covid_reports WHERE sno=2")).mappings().first()
         assert row["country_region"] == "Mainland China"
         assert row["confirmed"] == 14
+
+def test_init_db_streaming_ingest(tmp_path):
+    """
+    Streaming ingest should insert every row across chunks, one transaction per chunk.
+    """
+    from init_db import ingest_csv_stream
+
+    csv_path = tmp_path / "dummy_data.csv"
+    csv_path.write_text(
+        "SNo,ObservationDate,Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered\n"
+        "1,01/22/2020,Anhui,Mainland China,1/22/2020 17:00,1.0,0.0,0.0\n"
+        "2,01/22/2020,Beijing,Mainland China,1/22/2020 17:00,14.0,0.0,0.0\n"
+        "3,01/23/2020,,US,1/23/20 17:00,,0.0,0.0\n"
+    )
+
+    engine = get_engine(str(tmp_path / "test_covid.db"))
+    Base.metadata.create_all(engine)
+
+    count = ingest_csv_stream(engine, str(csv_path), chunksize=2)
+    assert count == 3
+
+    # Parallel cleaning writes the same rows (upserted over the first load)
+    assert ingest_csv_stream(engine, str(csv_path), chunksize=2, incremental=True, workers=2) == 0
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM covid_reports")).scalar() == 3
+        row = conn.execute(text("SELECT province_state, confirmed FROM covid_reports WHERE sno=3")).mappings().first()
+        assert row["province_state"] is None
+        assert row["confirmed"] is None
+
+def test_init_db_incremental_ingest_upserts_only_new_and_revised_rows(tmp_path):
+    """
+    A second incremental run should touch only rows past the recorded mark,
+    updating revised rows in place instead of failing on the sno primary key.
+    """
+    from init_db import ingest_csv_stream
+
+    header = "SNo,ObservationDate,Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered\n"
+    csv_path = tmp_path / "daily.csv"
+    csv_path.write_text(
+        header
+        + "1,01/22/2020,Anhui,Mainland China,1/22/2020 17:00,1.0,0.0,0.0\n"
+        + "2,01/22/2020,Beijing,Mainland China,1/22/2020 17:00,14.0,0.0,0.0\n"
+    )
+
+    engine = get_engine(str(tmp_path / "test_covid.db"))
+    Base.metadata.create_all(engine)
+    assert ingest_csv_stream(engine, str(csv_path), chunksize=1) == 2
+
+    # Re-running the same file is a no-op
+    assert ingest_csv_stream(engine, str(csv_path), chunksize=1, incremental=True) == 0
+
+    # Row 2 is revised with a later last_update, row 3 is new
+    csv_path.write_text(
+        header
+        + "1,01/22/2020,Anhui,Mainland China,1/22/2020 17:00,1.0,0.0,0.0\n"
+        + "2,01/22/2020,Beijing,Mainland China,1/23/2020 09:00,15.0,0.0,0.0\n"
+        + "3,01/23/2020,Anhui,Mainland China,1/23/2020 17:00,9.0,0.0,0.0\n"
+    )
+    assert ingest_csv_stream(engine, str(csv_path), chunksize=2, incremental=True) == 2
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM covid_reports")).scalar() == 3
+        assert conn.execute(text("SELECT confirmed FROM covid_reports WHERE sno=2")).scalar() == 15
+        state = conn.execute(text("SELECT last_sno FROM ingest_state WHERE source='daily.csv'")).scalar()
+        assert state == 3
+
+        # Rollups follow the upserted rows
+        daily = conn.execute(text("SELECT confirmed FROM daily_global_totals ORDER BY observation_date")).scalars().all()
+        assert daily == [16, 9]
+        latest = conn.execute(text("SELECT SUM(confirmed) FROM latest_location_snapshot")).scalar()
+        assert latest == 24
+
+def test_init_db_ingest_publishes_versioned_snapshot(tmp_path):
+    """
+    Each ingest that changes data bumps the data version and rewrites the snapshot.
+    """
+    from init_db import ingest_csv_stream
+    from src.data_access import load_snapshot
+    from src.db.crud_sql import get_dataset_version
+
+    csv_path = tmp_path / "daily.csv"
+    csv_path.write_text(
+        "SNo,ObservationDate,Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered\n"
+        "1,01/22/2020,Anhui,Mainland China,1/22/2020 17:00,1.0,0.0,0.0\n"
+    )
+    snapshot_dir = str(tmp_path / "test_covid.snapshot")
+
+    engine = get_engine(str(tmp_path / "test_covid.db"))
+    Base.metadata.create_all(engine)
+    ingest_csv_stream(engine, str(csv_path), snapshot_dir=snapshot_dir)
+
+    with engine.connect() as conn:
+        version = get_dataset_version(conn)
+    snapshot = load_snapshot(snapshot_dir, expected_version=version)
+    assert snapshot["sno"].tolist() == [1]
+
+    # Nothing new: version and snapshot stay as they are
+    ingest_csv_stream(engine, str(csv_path), incremental=True, snapshot_dir=snapshot_dir)
+    with engine.connect() as conn:
+        assert get_dataset_version(conn) == version
+
+def test_write_dataset_snapshot_streams_compact_frame(tmp_path, monkeypatch):
+    """
+    The streamed snapshot should load exactly like compact_types over the whole
+    table: missing counts and provinces, sub-second dates, several batches.
+    """
+    from init_db import write_dataset_snapshot
+    from src.cleaning import compact_types
+    from src.data_access import load_snapshot
+    from src.db import crud_sql
+
+    engine = get_engine(str(tmp_path / "test_covid.db"))
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(text("""
+            INSERT INTO covid_reports
+                (sno, observation_date, province_state, country_region, last_update, confirmed, deaths, recovered)
+            VALUES
+                (1, '2020-01-22 00:00:00.000000', 'Anhui', 'Mainland China', '2020-01-22 17:00:00.000000', 1, 0, 0),
+                (2, '2020-01-22 00:00:00.000000', NULL, 'Japan', '2020-01-22 17:00:00.250000', 2, NULL, 0),
+                (3, '2020-01-23 00:00:00.000000', 'Beijing', 'Mainland China', '2020-01-23 17:00:00', 14, 0, NULL),
+                (4, '2020-01-24 00:00:00.000000', NULL, 'US', '2020-01-24 17:00:00.000000', 5, 0, 0),
+                (5, '2020-01-24 00:00:00.000000', 'Anhui', 'Mainland China', '2020-01-24 17:00:00.000000', 3000000000, 1, 0)
+        """))
+        conn.commit()
+        expected = compact_types(crud_sql.get_reports_frame(conn))
+
+    # Small batches, so the files are filled in several steps
+    monkeypatch.setattr("init_db.iter_reports_frames", lambda conn: crud_sql.iter_reports_frames(conn, batch_size=2))
+    write_dataset_snapshot(engine, str(tmp_path / "snap"), "7")
+
+    result = load_snapshot(str(tmp_path / "snap"), expected_version="7")
+    assert result.equals(expected)
+    assert result.dtypes.equals(expected.dtypes)
+
+def test_init_db_time_series_ingest_melts_wide_file(tmp_path):
+    """
+    The wide time-series file should land in long format, block by block,
+    with one locations row per location and re-runs updating in place.
+    """
+    from init_db import ingest_time_series
+
+    csv_path = tmp_path / "time_series.csv"
+    csv_path.write_text(
+        "Province/State,Country/Region,Lat,Long,1/22/20,1/23/20,1/24/20\n"
+        ",Afghanistan,33.0,65.0,0,1,\n"
+        "Hubei,China,30.97,112.27,444,444,549\n"
+    )
+
+    engine = get_engine(str(tmp_path / "test_covid.db"))
+    Base.metadata.create_all(engine)
+
+    assert ingest_time_series(engine, str(csv_path), block_size=2) == 6
+    assert ingest_time_series(engine, str(csv_path), block_size=2) == 6
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM locations")).scalar() == 2
+        assert conn.execute(text("SELECT COUNT(*) FROM time_series_confirmed")).scalar() == 6
+        rows = conn.execute(text("""
+            SELECT l.country_region, l.lat, t.observation_date, t.confirmed
+            FROM time_series_confirmed t JOIN locations l ON l.id = t.location_id
+            WHERE l.country_region = 'Afghanistan' ORDER BY t.observation_date
+        """)).all()
+        assert [r.confirmed for r in rows] == [0, 1, None]
+        assert rows[0].lat == 33.0
+        assert rows[2].observation_date.startswith("2020-01-24")
@@ -0,0 +1,93 @@
+"""
+Tests for the instrumentation layer (timing spans and SQL statement hooks).
+"""
+import json
+import time
+import pytest
+import pandas as pd
+from sqlalchemy import text
+
+from src import instrumentation
+from src.instrumentation import configure, span, timed
+from src.db.engine import get_engine
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """Enable instrumentation into a temporary directory, and disable it afterwards."""
+    configure(enabled=True, log_dir=str(tmp_path), slow_query_ms=0)
+    yield tmp_path
+    configure(enabled=False, slow_query_ms=instrumentation.DEFAULT_SLOW_QUERY_MS)
+
+
+def _events(log_dir):
+    configure(enabled=True, log_dir=str(log_dir))  # closes the file so everything is flushed
+    path = log_dir / instrumentation.LOG_FILE_NAME
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+@timed
+def _make_frame(n):
+    return pd.DataFrame({"x": range(n)})
+
+
+def test_timed_records_span_with_rows_and_parent(log_dir):
+    with span("outer", stage="test"):
+        _make_frame(3)
+
+    events = _events(log_dir)
+    inner, outer = events
+    assert inner["event"] == "span"
+    assert inner["name"].endswith("_make_frame")
+    assert inner["rows"] == 3
+    assert inner["parent"] == "outer"
+    assert outer["name"] == "outer" and outer["stage"] == "test" and outer["parent"] is None
+    assert outer["ms"] >= inner["ms"]
+
+
+def test_span_records_errors_and_reraises(log_dir):
+    with pytest.raises(KeyError):
+        with span("failing"):
+            raise KeyError("boom")
+
+    assert _events(log_dir)[0]["error"] == "KeyError"
+
+
+def test_query_hooks_record_latency_rowcount_and_slow_flag(log_dir):
+    engine = get_engine(":memory:")
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t (x) VALUES (:x)"), [{"x": 1}, {"x": 2}])
+
+    queries = [e for e in _events(log_dir) if e["event"] == "query"]
+    insert = next(q for q in queries if q["statement"].startswith("INSERT"))
+    assert insert["executemany"] is True
+    assert insert["batch"] == 2
+    assert insert["rowcount"] == 2
+    assert insert["slow"] is True  # threshold is 0 ms in this fixture
+
+
+def test_failed_statement_does_not_skew_later_timings(log_dir):
+    engine = get_engine(":memory:")
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO t (x) VALUES (1)"))
+        with pytest.raises(Exception):
+            conn.execute(text("INSERT INTO t (x) VALUES (1)"))
+        time.sleep(0.2)
+        conn.execute(text("SELECT x FROM t"))
+        # No start time is left behind on the connection
+        assert not conn.info.get("query_start")
+
+    select = next(e for e in _events(log_dir) if e["event"] == "query" and e["statement"].startswith("SELECT"))
+    assert select["ms"] < 100
+
+def test_disabled_instrumentation_writes_nothing(tmp_path):
+    configure(enabled=False, log_dir=str(tmp_path))
+    engine = get_engine(":memory:")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    _make_frame(2)
+
+    assert not (tmp_path / instrumentation.LOG_FILE_NAME).exists()
+    configure(enabled=False)
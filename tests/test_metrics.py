@@ -0,0 +1,100 @@
+"""
+Tests for the derived-metrics module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+
+from src import metrics
+from src.metrics import compute_metrics, get_metrics
+
+
+@pytest.fixture
+def cumulative_df():
+    """Two locations of country A (one starting later, one missing a day) and one of B."""
+    dates = pd.date_range("2020-01-01", periods=10)
+    hubei = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+    rows = [("A", "North", d, c) for d, c in zip(dates, hubei)]
+    rows += [("A", "South", d, 10) for d in dates[5:]]
+    rows += [("B", None, d, 5 * (i + 1)) for i, d in enumerate(dates) if i != 3]
+    df = pd.DataFrame(rows, columns=["country_region", "province_state", "observation_date", "confirmed"])
+    df["sno"] = np.arange(1, len(df) + 1)
+    df["confirmed"] = df["confirmed"].astype("Int64")
+    df["deaths"] = pd.array([0] * len(df), dtype="Int64")
+    df["recovered"] = pd.array([None] * len(df), dtype="Int64")
+    # Shuffled on purpose: the metrics do their own sorting
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+def test_location_metrics(cumulative_df):
+    out = compute_metrics(cumulative_df, window=3)
+    north = out[out["province_state"] == "North"].reset_index(drop=True)
+
+    assert north["new_confirmed"].tolist() == [1, 1, 2, 4, 8, 16, 32, 64, 128, 256]
+    assert np.isnan(north["new_confirmed_avg"][1])
+    assert north["new_confirmed_avg"][2] == pytest.approx(4 / 3)
+    assert north["growth_factor"][3] == pytest.approx((7 / 3) / (4 / 3))
+    # Doubling every day
+    assert north["doubling_time"][5] == pytest.approx(1.0)
+
+    # A missing day is not a missing value: the window is in calendar days
+    b = out[out["country_region"] == "B"].reset_index(drop=True)
+    assert b["observation_date"][3] == pd.Timestamp("2020-01-05")
+    assert b["new_confirmed"][3] == 10
+    assert b["new_confirmed_avg"][3] == pytest.approx(5.0)
+
+    # Constant series never doubles; all-missing counts stay missing
+    south = out[out["province_state"] == "South"]
+    assert south["doubling_time"].isna().all()
+    assert out["new_recovered_avg"].isna().all()
+
+def test_country_and_global_levels(cumulative_df):
+    country = compute_metrics(cumulative_df, level="country", window=3)
+    a = country[country["country_region"] == "A"].set_index("observation_date")
+    assert a.loc["2020-01-06", "confirmed"] == 32 + 10
+    assert a.loc["2020-01-06", "new_confirmed"] == 16 + 10
+    assert "province_state" not in country.columns
+
+    world = compute_metrics(cumulative_df, level="global")
+    assert world["observation_date"].is_monotonic_increasing
+    assert world["confirmed"].iloc[-1] == 512 + 10 + 50
+
+    with pytest.raises(ValueError):
+        compute_metrics(cumulative_df, level="region")
+    with pytest.raises(ValueError):
+        compute_metrics(cumulative_df, window=0)
+
+def test_get_metrics_filters_after_computing(cumulative_df):
+    out = get_metrics(cumulative_df, country="A", start_date=datetime(2020, 1, 9), window=3)
+    assert set(out["country_region"]) == {"A"}
+    assert out["observation_date"].min() == pd.Timestamp("2020-01-09")
+    # The window reaches back before start_date
+    assert out["new_confirmed_avg"].notna().all()
+
+    with pytest.raises(ValueError):
+        get_metrics(cumulative_df, country="A", level="global")
+
+def test_get_metrics_cached_per_data_version(cumulative_df, monkeypatch):
+    metrics._metrics_cache.clear()
+    calls = []
+    compute = metrics.compute_metrics
+    monkeypatch.setattr(metrics, "compute_metrics", lambda *a: calls.append(a) or compute(*a))
+
+    get_metrics(cumulative_df)
+    get_metrics(cumulative_df)
+    assert len(calls) == 2  # no data version: never cached
+
+    cumulative_df.attrs["data_version"] = "1"
+    first = get_metrics(cumulative_df)
+    assert get_metrics(cumulative_df.copy()) is first
+    assert get_metrics(cumulative_df, country="B")["country_region"].eq("B").all()
+    assert len(calls) == 3
+
+    # A filtered frame inherits the version but is not the same dataset
+    subset = cumulative_df[cumulative_df["country_region"] == "B"]
+    assert subset.attrs["data_version"] == "1"
+    assert set(get_metrics(subset)["country_region"]) == {"B"}
+
+    cumulative_df.attrs["data_version"] = "2"
+    get_metrics(cumulative_df)
+    assert len(calls) == 5
@@ -0,0 +1,83 @@
+"""
+Tests for schema upgrades and the composite indexes they add.
+"""
+import pytest
+from sqlalchemy import text, inspect
+
+from src.db.engine import get_engine
+from src.db.migrations import upgrade_schema
+from src.db.analysis_sql import latest_per_location_query
+
+def _query_plan(conn, sql: str) -> str:
+    """Return the EXPLAIN QUERY PLAN details of a statement as one string."""
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+@pytest.fixture
+def engine(tmp_path):
+    """Fixture providing a file database created with the current schema."""
+    engine = get_engine(str(tmp_path / "test.db"))
+    upgrade_schema(engine)
+    return engine
+
+def test_upgrade_schema_adds_indexes_to_existing_database(tmp_path):
+    """Test that a database created with the old schema gains the new indexes."""
+    engine = get_engine(str(tmp_path / "old.db"))
+    with engine.connect() as conn:
+        # Original schema: single-column indexes only
+        conn.execute(text("""
+            CREATE TABLE covid_reports (
+                sno INTEGER PRIMARY KEY, observation_date DATETIME, province_state VARCHAR,
+                country_region VARCHAR, last_update DATETIME,
+                confirmed INTEGER, deaths INTEGER, recovered INTEGER
+            )
+        """))
+        conn.execute(text("CREATE INDEX ix_covid_reports_country_region ON covid_reports (country_region)"))
+        conn.execute(text("CREATE INDEX ix_covid_reports_observation_date ON covid_reports (observation_date)"))
+        conn.execute(text("""
+            INSERT INTO covid_reports (sno, observation_date, country_region, confirmed)
+            VALUES (1, '2020-01-01 00:00:00.000000', 'China', 5)
+        """))
+        conn.commit()
+
+    created = upgrade_schema(engine)
+
+    assert set(created) >= {"ix_covid_reports_country_date", "ix_covid_reports_location_latest"}
+    names = {ix["name"] for ix in inspect(engine).get_indexes("covid_reports")}
+    assert "ix_covid_reports_country_date" in names
+    assert "ix_covid_reports_country_region" not in names
+
+    # Rollup tables are created and back-filled from existing rows
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT confirmed FROM daily_global_totals")).scalar() == 5
+
+    # Running it again is a no-op
+    assert upgrade_schema(engine) == []
+
+def test_country_date_range_aggregate_uses_covering_index(engine):
+    """Test that per-country date-range aggregates are answered from the index alone."""
+    with engine.connect() as conn:
+        plan = _query_plan(conn, """
+            SELECT observation_date, SUM(confirmed) FROM covid_reports
+            WHERE country_region = 'US'
+              AND observation_date >= '2020-03-01' AND observation_date <= '2020-04-01'
+            GROUP BY observation_date
+        """)
+    assert "COVERING INDEX ix_covid_reports_country_date" in plan
+
+def test_country_date_range_filter_uses_composite_index(engine):
+    """Test that get_reports_sql-style filters search the composite index."""
+    with engine.connect() as conn:
+        plan = _query_plan(conn, """
+            SELECT * FROM covid_reports
+            WHERE country_region = 'US' AND observation_date >= '2020-03-01'
+        """)
+    assert "ix_covid_reports_country_date (country_region=? AND observation_date>?)" in plan
+
+@pytest.mark.parametrize("where", ["", "WHERE 1=1 AND country_region = 'US'"])
+def test_latest_per_location_uses_covering_index(engine, where):
+    """Test that the latest-row-per-location query the code runs reads the location index in order."""
+    with engine.connect() as conn:
+        plan = _query_plan(conn, latest_per_location_query(where))
+    assert "COVERING INDEX ix_covid_reports_location_latest" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,82 @@
+"""
+Tests for parallel cleaning: results must be identical to the serial path.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_covid_df
+from src.cleaning import clean_covid_df, clean_covid_chunks
+from src import parallel_cleaning
+from src.parallel_cleaning import clean_covid_df_parallel, clean_covid_chunks_parallel
+
+
+@pytest.fixture
+def force_parallel(monkeypatch):
+    """Take the process-pool path even where the cost model would not."""
+    monkeypatch.setattr(parallel_cleaning.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(parallel_cleaning, "_worth_parallel", lambda n_rows, n_partitions: n_partitions >= 2)
+
+def _assert_identical(result, expected):
+    pd.testing.assert_frame_equal(result, expected, check_exact=True, check_index_type=True)
+    assert result.dtypes.equals(expected.dtypes)
+
+def test_parallel_clean_matches_serial_exactly(force_parallel):
+    raw = generate_covid_df(scale=0.1, seed=3)
+    # Some missing values and a non-default index
+    raw.loc[raw.index[::97], "Confirmed"] = np.nan
+    raw.loc[raw.index[::89], "Last Update"] = None
+    raw.index = raw.index * 2 + 5
+
+    result = clean_covid_df_parallel(raw, workers=3, min_partition_rows=100)
+
+    _assert_identical(result, clean_covid_df(raw))
+
+def test_parallel_clean_falls_back_when_partitions_disagree_on_dtype(force_parallel):
+    raw = generate_covid_df(scale=0.05, seed=1)
+    # The first partition has no Last Update at all, so it would parse to a different unit
+    raw.loc[raw.index[:len(raw) // 2], "Last Update"] = None
+
+    result = clean_covid_df_parallel(raw, workers=2, min_partition_rows=10)
+
+    _assert_identical(result, clean_covid_df(raw))
+
+def test_parallel_clean_small_frame_and_missing_columns():
+    raw = generate_covid_df(scale=0.01, seed=0)
+    _assert_identical(clean_covid_df_parallel(raw, workers=4), clean_covid_df(raw))
+
+    with pytest.raises(ValueError):
+        clean_covid_df_parallel(raw.drop(columns=["Confirmed"]), workers=2, min_partition_rows=1)
+
+def test_parallel_chunks_match_serial_chunks_in_order(force_parallel):
+    raw = generate_covid_df(scale=0.05, seed=2)
+    chunks = [raw.iloc[i:i + 500] for i in range(0, len(raw), 500)]
+
+    result = list(clean_covid_chunks_parallel(iter(chunks), workers=2))
+    expected = list(clean_covid_chunks(chunks))
+
+    assert len(result) == len(expected)
+    for got, want in zip(result, expected):
+        _assert_identical(got, want)
+
+def test_cost_model_keeps_small_frames_and_single_cpus_serial(monkeypatch):
+    monkeypatch.setattr(parallel_cleaning.os, "cpu_count", lambda: 1)
+    assert not parallel_cleaning._worth_parallel(10_000_000, 64)
+
+    monkeypatch.setattr(parallel_cleaning.os, "cpu_count", lambda: 64)
+    # The parent's packing alone costs about as much as cleaning serially
+    assert not parallel_cleaning._worth_parallel(1_000_000, 8)
+    assert not parallel_cleaning._worth_parallel(100_000, 64)
+    assert parallel_cleaning._worth_parallel(10_000_000, 64)
+
+def test_serial_fallback_starts_no_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started")
+    monkeypatch.setattr(parallel_cleaning, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(parallel_cleaning.os, "cpu_count", lambda: 1)
+    raw = generate_covid_df(scale=0.05, seed=4)
+
+    _assert_identical(clean_covid_df_parallel(raw, workers=4, min_partition_rows=10), clean_covid_df(raw))
+    chunks = [raw.iloc[i:i + 500] for i in range(0, len(raw), 500)]
+    for got, want in zip(clean_covid_chunks_parallel(iter(chunks), workers=2), clean_covid_chunks(chunks)):
+        _assert_identical(got, want)
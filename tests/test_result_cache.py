@@ -0,0 +1,84 @@
+"""
+Tests for the per-filter result cache.
+"""
+import pytest
+import pandas as pd
+
+from src.result_cache import ResultCache, estimate_size
+
+
+class TestResultCache:
+    """Tests for the ResultCache class."""
+
+    def test_repeated_key_is_a_hit(self):
+        """Test that a key seen before is served without recomputing."""
+        # Arrange
+        cache = ResultCache(max_bytes=1024 * 1024)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": 42}
+
+        # Act
+        first = cache.get_or_compute((1, "China", None, None), compute)
+        second = cache.get_or_compute((1, "China", None, None), compute)
+
+        # Assert
+        assert first is second
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_new_data_version_misses(self):
+        """Test that the same filter under a new data version is recomputed."""
+        # Arrange
+        cache = ResultCache(max_bytes=1024 * 1024)
+        cache.get_or_compute((1, "China"), lambda: "old")
+
+        # Act
+        result = cache.get_or_compute((2, "China"), lambda: "new")
+
+        # Assert
+        assert result == "new"
+        assert cache.stats()["misses"] == 2
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test that the oldest unused entries are evicted once the byte budget is exceeded."""
+        # Arrange
+        frame = pd.DataFrame({"x": range(1000)})
+        size = estimate_size(frame)
+        cache = ResultCache(max_bytes=int(size * 2.5))
+        cache.get_or_compute("a", lambda: frame.copy())
+        cache.get_or_compute("b", lambda: frame.copy())
+        cache.get_or_compute("a", lambda: frame.copy())  # "a" is now most recent
+
+        # Act
+        cache.get_or_compute("c", lambda: frame.copy())
+
+        # Assert
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+
+    def test_oversized_value_is_not_stored(self):
+        """Test that a value larger than the whole budget is returned but not kept."""
+        # Arrange
+        cache = ResultCache(max_bytes=100)
+
+        # Act
+        result = cache.get_or_compute("big", lambda: pd.DataFrame({"x": range(1000)}))
+
+        # Assert
+        assert len(result) == 1000
+        assert len(cache) == 0
+        assert cache.stats()["bytes"] == 0
+
+    def test_invalid_budget_raises(self):
+        """Test that a non-positive byte budget is rejected."""
+        with pytest.raises(ValueError):
+            ResultCache(max_bytes=0)
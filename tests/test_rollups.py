@@ -0,0 +1,111 @@
+"""
+Tests for the rollup tables maintained at ingest time.
+"""
+import pytest
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import text
+
+from src.db.engine import get_engine
+from src.db.models import Base
+from src.db.crud_sql import create_report_sql, bulk_insert_df
+from src.db.migrations import normalize_datetimes
+from src.db.rollups import (
+    refresh_rollups,
+    get_daily_totals,
+    get_latest_totals,
+    get_latest_country_totals,
+    get_dates_for_snos,
+)
+
+REPORTS = [
+    (1, datetime(2020, 1, 1), "Hubei", "China", 100, 10, 50),
+    (2, datetime(2020, 1, 1), None, "US", 50, 5, None),
+    (3, datetime(2020, 1, 2), "Hubei", "China", 150, 15, 80),
+    (4, datetime(2020, 1, 2), "Anhui", "China", 20, 0, 1),
+    (5, datetime(2020, 1, 2), None, "US", 70, 7, 30),
+]
+
+@pytest.fixture
+def db_connection():
+    """Fixture providing an in-memory database seeded with a few reports."""
+    engine = get_engine(":memory:")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        for sno, date, province, country, confirmed, deaths, recovered in REPORTS:
+            create_report_sql(conn, {
+                "sno": sno, "observation_date": date, "province_state": province,
+                "country_region": country, "last_update": date,
+                "confirmed": confirmed, "deaths": deaths, "recovered": recovered,
+            })
+        refresh_rollups(conn)
+        yield conn
+
+def test_refresh_rollups_builds_daily_totals(db_connection):
+    """Test global and per-country daily sums, with NULL counts treated as 0."""
+    totals = get_daily_totals(db_connection)
+    assert [(t["confirmed"], t["recovered"]) for t in totals] == [(150, 50), (240, 111)]
+
+    china = get_daily_totals(db_connection, country="China")
+    assert [t["confirmed"] for t in china] == [100, 170]
+
+    later = get_daily_totals(db_connection, start_date=datetime(2020, 1, 2))
+    assert len(later) == 1
+
+def test_refresh_rollups_builds_latest_snapshot(db_connection):
+    """Test that only the latest row per location is summed."""
+    assert get_latest_totals(db_connection) == {"confirmed": 240, "deaths": 22, "recovered": 111}
+
+    countries = get_latest_country_totals(db_connection, n=1)
+    assert countries == [{"country_region": "China", "confirmed": 170, "deaths": 15, "recovered": 81}]
+
+def test_refresh_rollups_for_changed_dates_only(db_connection):
+    """Test recomputing a single day after a row changes."""
+    db_connection.execute(text("UPDATE covid_reports SET confirmed = 200 WHERE sno = 3"))
+    db_connection.commit()
+
+    changed = get_dates_for_snos(db_connection, [3])
+    assert len(changed) == 1
+
+    refresh_rollups(db_connection, changed)
+    totals = get_daily_totals(db_connection)
+    assert [t["confirmed"] for t in totals] == [150, 290]
+
+def test_refresh_rollups_with_no_changed_dates_is_a_no_op(db_connection):
+    """Test that an empty set of dates leaves the rollups untouched."""
+    db_connection.execute(text("DELETE FROM covid_reports"))
+    db_connection.commit()
+
+    refresh_rollups(db_connection, [])
+    assert len(get_daily_totals(db_connection)) == 2
+
+def test_latest_snapshot_keeps_first_row_of_a_duplicate_day(db_connection):
+    """Test that two rows for one location and date keep the lowest sno, like analysis._get_latest_data."""
+    create_report_sql(db_connection, {
+        "sno": 6, "observation_date": datetime(2020, 1, 2), "province_state": "Hubei",
+        "country_region": "China", "last_update": datetime(2020, 1, 2),
+        "confirmed": 999, "deaths": 0, "recovered": 0,
+    })
+    refresh_rollups(db_connection)
+    assert get_latest_totals(db_connection)["confirmed"] == 240
+
+def test_one_rollup_row_per_day_across_write_paths(db_connection):
+    """Test that create_report_sql and bulk_insert_df rows for one day share a rollup row."""
+    bulk_insert_df(db_connection, pd.DataFrame({
+        "sno": [7], "observation_date": pd.to_datetime(["2020-01-02"]), "country_region": ["Italy"],
+        "confirmed": pd.array([3], dtype="Int64"),
+    }))
+    refresh_rollups(db_connection, get_dates_for_snos(db_connection, [7]))
+
+    totals = get_daily_totals(db_connection)
+    assert [t["confirmed"] for t in totals] == [150, 243]
+
+def test_normalize_datetimes_rewrites_legacy_values(db_connection):
+    """Test that dates written without a fraction are brought to the common layout."""
+    db_connection.execute(text(
+        "UPDATE covid_reports SET observation_date = '2020-01-02 00:00:00', last_update = '2020-01-02 00:00:00' WHERE sno = 3"
+    ))
+    assert normalize_datetimes(db_connection) == 2
+    stored = db_connection.execute(text("SELECT observation_date FROM covid_reports WHERE sno = 3")).scalar()
+    assert stored == "2020-01-02 00:00:00.000000"
+    assert normalize_datetimes(db_connection) == 0